@@ -19,6 +19,7 @@ import datetime
 import json
 import os
 import shutil
+import threading
 from six import string_types
 
 import numpy as np
@@ -87,6 +88,15 @@ class TensorFlowEstimator(BaseEstimator):
             Defaults to 5 (that is, the 5 most recent checkpoint files are kept.)
         keep_checkpoint_every_n_hours: Number of hours between each checkpoint
             to be saved. The default value of 10,000 hours effectively disables the feature.
+        prefetch_batches: Number of batches of in-memory training data to
+            prepare in a background thread while the current step runs.
+            If 0, batches are prepared between the steps.
+        num_feeder_workers: Number of worker processes that compute and
+            convert the partitions of pandas or dask training data. If 0,
+            it is read on the training thread.
+        fetch_steps: Number of training steps in between fetching the loss
+            to update the monitor and write summaries. The steps in between
+            only run the optimizer. Defaults to 1, i.e. every step.
     """
 
     def __init__(self, model_fn, n_classes, tf_master="", batch_size=32,
@@ -94,7 +104,8 @@ class TensorFlowEstimator(BaseEstimator):
                  learning_rate=0.1, class_weight=None,
                  tf_random_seed=42, continue_training=False,
                  config_addon=None, verbose=1,
-                 max_to_keep=5, keep_checkpoint_every_n_hours=10000):
+                 max_to_keep=5, keep_checkpoint_every_n_hours=10000,
+                 prefetch_batches=0, num_feeder_workers=0, fetch_steps=1):
 
         self.n_classes = n_classes
         self.tf_master = tf_master
@@ -111,6 +122,9 @@ class TensorFlowEstimator(BaseEstimator):
         self.keep_checkpoint_every_n_hours = keep_checkpoint_every_n_hours
         self.class_weight = class_weight
         self.config_addon = config_addon
+        self.prefetch_batches = prefetch_batches
+        self.num_feeder_workers = num_feeder_workers
+        self.fetch_steps = fetch_steps
 
     def _setup_training(self):
         """Sets up graph, model and trainer."""
@@ -203,9 +217,10 @@ class TensorFlowEstimator(BaseEstimator):
             Returns self.
         """
         # Sets up data feeder.
-        self._data_feeder = setup_train_data_feeder(X, y,
-                                                    self.n_classes,
-                                                    self.batch_size)
+        self._data_feeder = setup_train_data_feeder(
+            X, y, self.n_classes, self.batch_size,
+            prefetch_batches=self.prefetch_batches,
+            num_workers=self.num_feeder_workers)
 
         if monitor is None:
             self._monitor = monitors.default_monitor()
@@ -233,14 +248,19 @@ class TensorFlowEstimator(BaseEstimator):
             self._summary_writer = None
 
         # Train model for given number of steps.
-        self._trainer.train(self._session,
-                            self._data_feeder.get_feed_dict_fn(
-                                self._inp, self._out),
-                            self.steps,
-                            self._monitor,
-                            self._summary_writer,
-                            self._summaries,
-                            feed_params_fn=self._data_feeder.get_feed_params)
+        try:
+            self._trainer.train(self._session,
+                                self._data_feeder.get_feed_dict_fn(
+                                    self._inp, self._out),
+                                self.steps,
+                                self._monitor,
+                                self._summary_writer,
+                                self._summaries,
+                                feed_params_fn=self._data_feeder.get_feed_params,
+                                fetch_steps=self.fetch_steps)
+        finally:
+            if hasattr(self._data_feeder, 'stop_prefetching'):
+                self._data_feeder.stop_prefetching()
         return self
 
     def partial_fit(self, X, y):
@@ -267,28 +287,126 @@ class TensorFlowEstimator(BaseEstimator):
         """
         return self.fit(X, y)
 
-    def _predict(self, X, axis=-1, batch_size=-1):
+    def _predict_feed_dict(self):
+        """Returns the feed dict of the model for prediction, without input."""
         if not self._initialized:
             raise NotFittedError()
         self._graph.add_to_collection("IS_TRAINING", False)
+        dropouts = self._graph.get_collection(DROPOUTS)
+        return {prob: 1.0 for prob in dropouts}
+
+    def _predict_batch(self, feed_dict, data, axis):
+        """Returns the predictions for a batch of data."""
+        feed_dict = dict(feed_dict)
+        feed_dict[self._inp] = data
+        predictions_for_batch = self._session.run(
+            self._model_predictions,
+            feed_dict)
+        if self.n_classes > 1 and axis != -1:
+            return predictions_for_batch.argmax(axis=axis)
+        return predictions_for_batch
+
+    def _predict_batch_size(self, batch_size, num_threads, memory_budget):
+        """Returns the batch size that keeps the inputs and predictions of
+        the batches predicted at once within memory_budget bytes."""
+        if batch_size > 0 or not memory_budget:
+            return batch_size
+        input_shape = self._inp.get_shape()[1:]
+        input_bytes = (input_shape.num_elements() or 1) * self._inp.dtype.size
+        output_shape = self._model_predictions.get_shape()[1:]
+        if output_shape.is_fully_defined():
+            output_bytes = ((output_shape.num_elements() or 1) *
+                            self._model_predictions.dtype.size)
+        else:
+            output_bytes = input_bytes
+        row_bytes = num_threads * (input_bytes + output_bytes)
+        return max(1, int(memory_budget // row_bytes))
+
+    def _predict(self, X, axis=-1, batch_size=-1, num_threads=1,
+                 memory_budget=None):
+        feed_dict = self._predict_feed_dict()
+        batch_size = self._predict_batch_size(batch_size, num_threads,
+                                              memory_budget)
         predict_data_feeder = setup_predict_data_feeder(
             X, batch_size=batch_size)
+        if not isinstance(predict_data_feeder, list):
+            # An iterator of unknown length.
+            return np.concatenate(
+                [self._predict_batch(feed_dict, data, axis)
+                 for data in predict_data_feeder], axis=0)
+
+        # Write the predictions of the batches into one array, from
+        # num_threads threads, so that preparing the inputs of a batch and
+        # copying its predictions overlap with running the others.
+        offsets = np.cumsum([0] + [len(data) for data in predict_data_feeder])
+        next_batches = iter(range(len(predict_data_feeder)))
+        lock = threading.Lock()
         preds = []
-        dropouts = self._graph.get_collection(DROPOUTS)
-        feed_dict = {prob: 1.0 for prob in dropouts}
-        for data in predict_data_feeder:
-            feed_dict[self._inp] = data
-            predictions_for_batch = self._session.run(
-                self._model_predictions,
-                feed_dict)
-            if self.n_classes > 1 and axis != -1:
-                preds.append(predictions_for_batch.argmax(axis=axis))
-            else:
-                preds.append(predictions_for_batch)
-
-        return np.concatenate(preds, axis=0)
-
-    def predict(self, X, axis=1, batch_size=-1):
+        errors = []
+
+        def _predict_batches():
+            while True:
+                with lock:
+                    batch = next(next_batches, None)
+                if batch is None or errors:
+                    return
+                try:
+                    predictions = self._predict_batch(
+                        feed_dict, predict_data_feeder[batch], axis)
+                except Exception as e:  # pylint: disable=broad-except
+                    errors.append(e)
+                    return
+                with lock:
+                    if not preds:
+                        preds.append(np.empty(
+                            (offsets[-1],) + predictions.shape[1:],
+                            dtype=predictions.dtype))
+                preds[0][offsets[batch]:offsets[batch + 1]] = predictions
+
+        threads = [threading.Thread(target=_predict_batches)
+                   for _ in range(num_threads - 1)]
+        for thread in threads:
+            thread.start()
+        _predict_batches()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        if not preds:
+            raise ValueError("No data to predict on.")
+        return preds[0]
+
+    def predict_iter(self, X, axis=1, batch_size=-1, memory_budget=None):
+        """Predict class or regression for X, one batch at a time.
+
+        Unlike predict, only one batch of predictions is in memory at once,
+        which suits scoring more data than fits into memory, e.g. from an
+        iterator.
+
+        Args:
+            X: array-like matrix, [n_samples, n_features...] or iterator.
+            axis: Which axis to argmax for classification.
+                  By default axis 1 (next after batch) is used.
+                  Use 2 for sequence predictions, or -1 for the predicted
+                  probabilities of each class.
+            batch_size: Number of samples to predict per batch. If
+                        negative, memory_budget or else the full dataset
+                        decides it.
+            memory_budget: Number of bytes that the inputs and predictions
+                           of a batch may use, which decides the batch size
+                           if batch_size is negative.
+
+        Yields:
+            Arrays of the predicted classes or values of the samples of each
+            batch.
+        """
+        feed_dict = self._predict_feed_dict()
+        batch_size = self._predict_batch_size(batch_size, 1, memory_budget)
+        for data in setup_predict_data_feeder(X, batch_size=batch_size):
+            yield self._predict_batch(feed_dict, data, axis)
+
+    def predict(self, X, axis=1, batch_size=-1, num_threads=1,
+                memory_budget=None):
         """Predict class or regression for X.
 
         For a classification model, the predicted class for each sample in X is
@@ -302,27 +420,41 @@ class TensorFlowEstimator(BaseEstimator):
                   Use 2 for sequence predictions.
             batch_size: If test set is too big, use batch size to split
                         it into mini batches. By default full dataset is used.
+            num_threads: Number of batches to predict at once, from as many
+                         threads. Iterators are predicted one batch at a time.
+            memory_budget: Number of bytes that the inputs and predictions
+                           of the batches predicted at once may use, which
+                           decides the batch size if batch_size is negative.
 
         Returns:
             y: array of shape [n_samples]. The predicted classes or predicted
             value.
         """
-        return self._predict(X, axis=axis, batch_size=batch_size)
+        return self._predict(X, axis=axis, batch_size=batch_size,
+                             num_threads=num_threads,
+                             memory_budget=memory_budget)
 
-    def predict_proba(self, X, batch_size=-1):
+    def predict_proba(self, X, batch_size=-1, num_threads=1,
+                      memory_budget=None):
         """Predict class probability of the input samples X.
 
         Args:
             X: array-like matrix, [n_samples, n_features...] or iterator.
             batch_size: If test set is too big, use batch size to split
                         it into mini batches. By default full dataset is used.
+            num_threads: Number of batches to predict at once, see predict.
+            memory_budget: Number of bytes that the inputs and predictions
+                           of the batches predicted at once may use, see
+                           predict.
 
         Returns:
             y: array of shape [n_samples, n_classes]. The predicted
             probabilities for each class.
 
         """
-        return self._predict(X, batch_size=batch_size)
+        return self._predict(X, batch_size=batch_size,
+                             num_threads=num_threads,
+                             memory_budget=memory_budget)
 
     def get_tensor(self, name):
         """Returns tensor by name.
@@ -16,10 +16,15 @@
 
 from __future__ import division, print_function, absolute_import
 
+import collections
 import itertools
 import math
+import multiprocessing
+import threading
+import traceback
 
 import six
+from six.moves import queue
 from six.moves import xrange   # pylint: disable=redefined-builtin
 
 import numpy as np
@@ -44,6 +49,20 @@ def _get_in_out_shape(x_shape, y_shape, n_classes, batch_size):
     return input_shape, output_shape
 
 
+def _one_hot_encode(labels, out):
+    """Sets out[..., label] to 1.0 for every label, all at once.
+
+    Args:
+        labels: integer array of shape out.shape[:-1], or any shape with as
+            many elements.
+        out: zero-filled C-contiguous array, whose last dimension is the
+            number of classes.
+    """
+    flat_out = out.reshape(-1, out.shape[-1])
+    flat_labels = np.asarray(labels).reshape(-1)
+    flat_out[np.arange(flat_out.shape[0]), flat_labels] = 1.0
+
+
 def _data_type_filter(X, y):
     """Filter data types into acceptable format"""
     if HAS_DASK:
@@ -59,19 +78,54 @@ def _is_iterable(X):
     return hasattr(X, 'next') or hasattr(X, '__next__')
 
 
-def setup_train_data_feeder(X, y, n_classes, batch_size):
+def _is_out_of_core(X):
+    """Returns whether X is a file-backed array, like np.memmap or an h5py
+    Dataset, that should not be read into memory as a whole."""
+    if isinstance(X, np.memmap):
+        return True
+    return type(X).__module__.split('.')[0] == 'h5py'
+
+
+def _is_data_frame(X):
+    """Returns whether X is a pandas or dask DataFrame or Series."""
+    if HAS_PANDAS:
+        import pandas as pd
+        if isinstance(X, (pd.DataFrame, pd.Series)):
+            return True
+    if HAS_DASK:
+        import dask.dataframe as dd
+        if isinstance(X, (dd.DataFrame, dd.Series)):
+            return True
+    return False
+
+
+def setup_train_data_feeder(X, y, n_classes, batch_size, prefetch_batches=0,
+                            num_workers=0):
     """Create data feeder, to sample inputs from dataset.
     If X and y are iterators, use StreamingDataFeeder.
+    If X is a np.memmap or an h5py Dataset, use OutOfCoreDataFeeder.
+    If X and y are pandas or dask data frames and num_workers is positive,
+    use MultiProcessDataFeeder.
 
     Args:
-        X: numpy, pandas or Dask matrix or iterable.
-        y: numpy, pandas or Dask array or iterable.
+        X: numpy, pandas or Dask matrix, file-backed array or iterable.
+        y: numpy, pandas or Dask array, file-backed array or iterable.
         n_classes: number of classes.
         batch_size: size to split data into parts.
+        prefetch_batches: number of batches a DataFeeder or
+            OutOfCoreDataFeeder prepares in a background thread, or a
+            MultiProcessDataFeeder in its worker processes. Other data
+            feeders ignore it.
+        num_workers: number of worker processes that read and convert the
+            partitions of data frames.
 
     Returns:
         DataFeeder object that returns training data.
     """
+    if num_workers > 0 and _is_data_frame(X) and _is_data_frame(y):
+        return MultiProcessDataFeeder(X, y, n_classes, batch_size,
+                                      num_workers=num_workers,
+                                      prefetch_batches=prefetch_batches)
     X, y = _data_type_filter(X, y)
     if HAS_DASK:
         import dask.dataframe as dd
@@ -88,6 +142,11 @@ def setup_train_data_feeder(X, y, n_classes, batch_size):
             raise ValueError("Both X and y should be iterators for "
                              "streaming learning to work.")
         data_feeder_cls = StreamingDataFeeder
+    elif _is_out_of_core(X):
+        data_feeder_cls = OutOfCoreDataFeeder
+    if data_feeder_cls in (DataFeeder, OutOfCoreDataFeeder):
+        return data_feeder_cls(X, y, n_classes, batch_size,
+                               prefetch_batches=prefetch_batches)
     return data_feeder_cls(X, y, n_classes, batch_size)
 
 
@@ -151,6 +210,9 @@ class DataFeeder(object):
         n_classes: number of classes, 0 and 1 are considered regression.
         batch_size: mini batch size to accumulate.
         random_state: numpy RandomState object to reproduce sampling.
+        prefetch_batches: number of batches to prepare in a background
+            thread while the trainer runs the current step. If 0, batches
+            are prepared on the calling thread.
 
     Attributes:
         X: input features.
@@ -163,37 +225,135 @@ class DataFeeder(object):
         output_dtype: dtype of output.
     """
 
-    def __init__(self, X, y, n_classes, batch_size, random_state=None):
-        x_dtype = np.int64 if X.dtype == np.int64 else np.float32
-        y_dtype = np.int64 if n_classes > 1 else np.float32
-        self.X = check_array(X, ensure_2d=False,
-                             allow_nd=True, dtype=x_dtype)
-        self.y = check_array(y, ensure_2d=False, dtype=y_dtype)
+    def __init__(self, X, y, n_classes, batch_size, random_state=None,
+                 prefetch_batches=0):
         self.n_classes = n_classes
         self.batch_size = batch_size
+        self._set_data(X, y)
         self.input_shape, self.output_shape = _get_in_out_shape(
             self.X.shape, self.y.shape, n_classes, batch_size)
-        # Input dtype matches dtype of X.
-        self.input_dtype = self.X.dtype
         # Output dtype always float32 (because for classification we use
         # one-hot vectors.
         self.output_dtype = np.float32
         self.random_state = np.random.RandomState(42) if random_state is None else random_state
-        self.indices = self.random_state.permutation(self.X.shape[0])
+        self.indices = self._permutation()
         self.offset = 0
         self.epoch = 0
+        self.prefetch_batches = prefetch_batches
+        self._prefetch_thread = None
+        # Feed params of the last batch returned while prefetching, since
+        # epoch and offset run ahead of the trainer.
+        self._returned_feed_params = None
 
     def get_feed_params(self):
         """Function returns a dict with data feed params while training.
         Returns:
             A dict with data feed params while training.
         """
+        if self._returned_feed_params is not None:
+            return dict(self._returned_feed_params)
         return {
             'epoch': self.epoch,
             'offset': self.offset,
             'batch_size': self.batch_size
         }
 
+    def _set_data(self, X, y):
+        """Sets X, y and the input dtype from the given features and
+        targets."""
+        x_dtype = np.int64 if X.dtype == np.int64 else np.float32
+        y_dtype = np.int64 if self.n_classes > 1 else np.float32
+        self.X = check_array(X, ensure_2d=False,
+                             allow_nd=True, dtype=x_dtype)
+        self.y = check_array(y, ensure_2d=False, dtype=y_dtype)
+        # Input dtype matches dtype of X.
+        self.input_dtype = self.X.dtype
+
+    def _permutation(self):
+        """Returns the order in which to sample the rows in an epoch."""
+        return self.random_state.permutation(self.X.shape[0])
+
+    def _read_batch(self, batch_indices, inp, out):
+        """Reads the rows at batch_indices into inp and their labels into
+        out, which are buffers of exactly as many rows."""
+        np.take(self.X, batch_indices, axis=0,
+                out=inp.reshape((inp.shape[0],) + self.X.shape[1:]))
+        self._set_labels(np.take(self.y, batch_indices, axis=0), out)
+
+    def _set_labels(self, labels, out):
+        """Sets out to the targets for labels, one-hot encoded for
+        classification."""
+        if self.n_classes > 1:
+            out.fill(0.0)
+            _one_hot_encode(labels, out)
+        else:
+            out[...] = np.reshape(labels, out.shape)
+
+    def _new_buffers(self):
+        """Returns zeroed input and output arrays of a full batch."""
+        input_shape = [self.batch_size] + list(self.X.shape[1:] or [1])
+        output_shape = [self.batch_size] + self.output_shape[1:]
+        return (np.zeros(input_shape, dtype=self.input_dtype),
+                np.zeros(output_shape, dtype=self.output_dtype))
+
+    def _fill_next_batch(self, inp, out):
+        """Samples the next batch into preallocated buffers.
+
+        Args:
+            inp: input buffer of a full batch, from _new_buffers.
+            out: output buffer of a full batch, from _new_buffers.
+
+        Returns:
+            Views of inp and out holding the batch, which is smaller than a
+            full batch at the end of an epoch.
+        """
+        # take random indices
+        batch_indices = self.indices[self.offset: self.offset+self.batch_size]
+        size = batch_indices.shape[0]
+        inp = inp[:size]
+        out = out[:size]
+
+        # assign input features and labels from random indices
+        self._read_batch(batch_indices, inp, out)
+
+        # move offset and reset it if necessary
+        self.offset += self.batch_size
+        if self.offset >= self.X.shape[0]:
+            self.indices = self._permutation()
+            self.offset = 0
+            self.epoch += 1
+        return inp, out
+
+    def _prefetch(self, free_buffers, ready_batches, stop):
+        """Fills free buffers with batches until stop is set.
+
+        An exception is passed on to the feed function, which raises it.
+        """
+        while True:
+            buffers = free_buffers.get()
+            if stop.is_set():
+                return
+            try:
+                inp, out = self._fill_next_batch(*buffers)
+            except Exception as e:  # pylint: disable=broad-except
+                ready_batches.put(e)
+                return
+            feed_params = {'epoch': self.epoch, 'offset': self.offset,
+                           'batch_size': self.batch_size}
+            ready_batches.put((buffers, inp, out, feed_params))
+
+    def stop_prefetching(self):
+        """Stops the background thread started by a prefetching feed
+        function, if any. Batches it prepared but did not return are lost.
+        """
+        if self._prefetch_thread is None:
+            return
+        thread, free_buffers, stop = self._prefetch_thread
+        self._prefetch_thread = None
+        stop.set()
+        free_buffers.put(None)
+        thread.join()
+
     def get_feed_dict_fn(self, input_placeholder, output_placeholder):
         """Returns a function, that will sample data and provide it to given
         placeholders.
@@ -205,37 +365,111 @@ class DataFeeder(object):
             A function that when called samples a random subset of batch size
             from X and y.
         """
-        def _feed_dict_fn():
-            # take random indices
-            batch_indices = self.indices[self.offset: self.offset+self.batch_size]
+        if self.prefetch_batches <= 0:
+            def _feed_dict_fn():
+                inp, out = self._fill_next_batch(*self._new_buffers())
+                return {input_placeholder.name: inp,
+                        output_placeholder.name: out}
+            return _feed_dict_fn
+
+        # A ring of prefetch_batches + 1 buffers: the background thread fills
+        # the free ones, while the trainer feeds the one returned last. It is
+        # free again once the trainer asks for the next batch.
+        self.stop_prefetching()
+        free_buffers = queue.Queue()
+        ready_batches = queue.Queue()
+        for _ in xrange(self.prefetch_batches + 1):
+            free_buffers.put(self._new_buffers())
+        stop = threading.Event()
+        thread = threading.Thread(target=self._prefetch,
+                                  args=(free_buffers, ready_batches, stop))
+        thread.daemon = True
+        thread.start()
+        self._prefetch_thread = (thread, free_buffers, stop)
+        in_use = []
+
+        def _prefetching_feed_dict_fn():
+            if in_use:
+                free_buffers.put(in_use.pop())
+            batch = ready_batches.get()
+            if isinstance(batch, Exception):
+                raise batch
+            buffers, inp, out, feed_params = batch
+            in_use.append(buffers)
+            self._returned_feed_params = feed_params
+            return {input_placeholder.name: inp, output_placeholder.name: out}
+        return _prefetching_feed_dict_fn
 
-            # assign input features from random indices
-            inp = np.array(self.X[batch_indices]).reshape((batch_indices.shape[0], 1)) \
-                if len(self.X.shape) == 1 else self.X[batch_indices]
 
-            # assign labels from random indices
-            self.output_shape[0] = batch_indices.shape[0]
-            out = np.zeros(self.output_shape, dtype=self.output_dtype)
-            for i in xrange(out.shape[0]):
-                sample = batch_indices[i]
-                if self.n_classes > 1:
-                    if len(self.output_shape) == 2:
-                        out.itemset((i, self.y[sample]), 1.0)
-                    else:
-                        for idx, value in enumerate(self.y[sample]):
-                            out.itemset(tuple([i, idx, value]), 1.0)
-                else:
-                    out[i] = self.y[sample]
-
-            # move offset and reset it if necessary
-            self.offset += self.batch_size
-            if self.offset >= self.X.shape[0]:
-                self.indices = self.random_state.permutation(self.X.shape[0])
-                self.offset = 0
-                self.epoch += 1
+class OutOfCoreDataFeeder(DataFeeder):
+    """Data feeder that samples from file-backed arrays, such as np.memmap
+    or h5py Datasets, without reading them into memory as a whole.
 
-            return {input_placeholder.name: inp, output_placeholder.name: out}
-        return _feed_dict_fn
+    Rows are sampled in block-shuffled order: an epoch visits blocks of
+    block_size consecutive rows in random order, and the rows of each block
+    in random order. A batch thus comes from one or two blocks, and is read
+    with sorted indices, so that reads stay mostly sequential. Each batch is
+    cast to the input and output dtypes as it is read.
+
+    Parameters:
+        X: feature Nd array of shape [n_samples, n_features, ...], whose
+            rows can be read with a sorted list of indices.
+        y: target array, either floats for regression or class id for
+            classification, in memory or file-backed like X.
+        n_classes: number of classes, 0 and 1 are considered regression.
+        batch_size: mini batch size to accumulate.
+        random_state: numpy RandomState object to reproduce sampling.
+        prefetch_batches: number of batches to prepare in a background
+            thread, see DataFeeder.
+        block_size: number of consecutive rows in a block. By default 16
+            batches.
+
+    Attributes:
+        X: input features.
+        y: input target.
+        n_classes: number of classes.
+        batch_size: mini batch size to accumulate.
+        block_size: number of consecutive rows in a block.
+        input_shape: shape of the input.
+        output_shape: shape of the output.
+        input_dtype: dtype of input.
+        output_dtype: dtype of output.
+    """
+
+    def __init__(self, X, y, n_classes, batch_size, random_state=None,
+                 prefetch_batches=0, block_size=None):
+        # Used by _permutation, which the DataFeeder constructor calls.
+        self.block_size = block_size or 16 * batch_size
+        super(OutOfCoreDataFeeder, self).__init__(
+            X, y, n_classes, batch_size, random_state=random_state,
+            prefetch_batches=prefetch_batches)
+
+    def _set_data(self, X, y):
+        if X.shape[0] != y.shape[0]:
+            raise ValueError("X and y must have the same number of samples, "
+                             "got %d and %d." % (X.shape[0], y.shape[0]))
+        self.X = X
+        self.y = y
+        self.input_dtype = np.int64 if X.dtype == np.int64 else np.float32
+
+    def _permutation(self):
+        n_samples = self.X.shape[0]
+        n_blocks = int(math.ceil(float(n_samples) / self.block_size))
+        blocks = []
+        for block in self.random_state.permutation(n_blocks):
+            start = block * self.block_size
+            stop = min(start + self.block_size, n_samples)
+            blocks.append(start + self.random_state.permutation(stop - start))
+        return np.concatenate(blocks)
+
+    def _read_batch(self, batch_indices, inp, out):
+        # h5py requires increasing indices, and they make reads sequential.
+        batch_indices = np.sort(batch_indices)
+        inp[...] = np.reshape(self.X[batch_indices], inp.shape)
+        labels = np.asarray(self.y[batch_indices])
+        if self.n_classes > 1:
+            labels = labels.astype(np.int64)
+        self._set_labels(labels, out)
 
 
 class StreamingDataFeeder(object):
@@ -303,17 +537,14 @@ class StreamingDataFeeder(object):
         def _feed_dict_fn():
             inp = np.zeros(self.input_shape, dtype=self.input_dtype)
             out = np.zeros(self.output_shape, dtype=self.output_dtype)
+            labels = []
             for i in xrange(self.batch_size):
                 inp[i, :] = six.next(self.X)
-                y = six.next(self.y)
-                if self.n_classes > 1:
-                    if len(self.output_shape) == 2:
-                        out.itemset((i, y), 1.0)
-                    else:
-                        for idx, value in enumerate(y):
-                            out.itemset(tuple([i, idx, value]), 1.0)
-                else:
-                    out[i] = y
+                labels.append(six.next(self.y))
+            if self.n_classes > 1:
+                _one_hot_encode(np.array(labels, dtype=np.int64), out)
+            else:
+                out[...] = np.reshape(labels, out.shape)
             return {input_placeholder.name: inp, output_placeholder.name: out}
         return _feed_dict_fn
 
@@ -411,3 +642,242 @@ class DaskDataFeeder(object):
             encoded_out[np.arange(out.size), out] = 1
             return {input_placeholder.name: inp, output_placeholder.name: encoded_out}
         return _feed_dict_fn
+
+
+def _frame_values(frame):
+    """Returns the values of a pandas DataFrame or Series as a 2d array."""
+    values = np.asarray(frame.values)
+    return values.reshape((values.shape[0], -1))
+
+
+def _read_partition(X, y, input_dtype):
+    """Returns the features and targets of a partition as arrays, computing
+    them first for dask."""
+    if hasattr(X, 'compute'):
+        X = X.compute()
+        y = y.compute()
+    X = np.ascontiguousarray(_frame_values(X), dtype=input_dtype)
+    y = _frame_values(y)
+    if y.shape[1] == 1:
+        y = y[:, 0]
+    return X, y
+
+
+# Everything a worker process of a MultiProcessDataFeeder uses. It is
+# picklable, so that workers can be spawned as well as forked, and holds only
+# the partitions of one worker: pairs of pandas slices or dask partitions of
+# X and y.
+_WorkerSpec = collections.namedtuple('_WorkerSpec', [
+    'partitions', 'n_classes', 'batch_size', 'slots', 'input_shape',
+    'output_shape', 'input_dtype', 'output_dtype', 'free_slots',
+    'ready_batches'])
+
+
+def _slot_arrays(spec, slot):
+    """Returns the input and output arrays of a slot, which share its
+    memory."""
+    inp_memory, out_memory = spec.slots[slot]
+    inp = np.frombuffer(inp_memory, dtype=spec.input_dtype)
+    out = np.frombuffer(out_memory, dtype=spec.output_dtype)
+    return inp.reshape(spec.input_shape), out.reshape(spec.output_shape)
+
+
+def _feeder_worker(spec, seed):
+    """Runs in a worker process of a MultiProcessDataFeeder, and fills its
+    free slots with batches from the partitions of the worker, forever.
+
+    An exception is passed on to the feed function as its traceback.
+    """
+    try:
+        random_state = np.random.RandomState(seed)
+        while True:
+            for partition in random_state.permutation(len(spec.partitions)):
+                X, y = _read_partition(*spec.partitions[partition],
+                                       input_dtype=spec.input_dtype)
+                order = random_state.permutation(X.shape[0])
+                for start in xrange(0, len(order), spec.batch_size):
+                    rows = order[start:start + spec.batch_size]
+                    slot = spec.free_slots.get()
+                    inp, out = _slot_arrays(spec, slot)
+                    inp = inp[:len(rows)]
+                    out = out[:len(rows)]
+                    np.take(X, rows, axis=0, out=inp.reshape(
+                        (len(rows),) + X.shape[1:]))
+                    labels = np.take(y, rows, axis=0)
+                    if spec.n_classes > 1:
+                        out.fill(0.0)
+                        _one_hot_encode(labels.astype(np.int64), out)
+                    else:
+                        out[...] = labels.reshape(out.shape)
+                    spec.ready_batches.put((slot, len(rows)))
+    except Exception:  # pylint: disable=broad-except
+        spec.ready_batches.put(traceback.format_exc())
+
+
+class MultiProcessDataFeeder(object):
+    """Data feeder for TF trainer that reads pandas or dask data frames in
+    worker processes.
+
+    The partitions of the data frames (of partition_size rows for pandas)
+    are split among the workers. Each worker computes its partitions in
+    random order, converts them to NumPy, and writes shuffled batches of
+    them into a ring of slots in shared memory, which it takes from a
+    queue of free slots. The trainer reads a batch from a slot without
+    copying it, and frees the slot when it asks for the next batch. Thus
+    computing and converting the partitions does not block the training
+    loop, and at most prefetch_batches batches wait in memory.
+
+    Batches contain rows of a single partition, so a batch at the end of a
+    partition may be smaller than batch_size. The trainer gets the batches
+    in the order the workers finish them, so a worker whose partitions are
+    faster to compute contributes more of them.
+
+    Each worker is passed only its own partitions, together with the slots
+    and queues, so the workers can be started with any multiprocessing
+    start method.
+
+    Parameters:
+        X: pandas or dask DataFrame or Series of features.
+        y: pandas or dask DataFrame or Series of targets, with a single
+            column. A dask y must have as many partitions as X.
+        n_classes: number of classes, 0 and 1 are considered regression.
+        batch_size: mini batch size to accumulate.
+        num_workers: number of worker processes.
+        prefetch_batches: number of batches prepared ahead, by default 2 per
+            worker.
+        partition_size: number of rows in the partitions of pandas data.
+        random_state: int seed of the sampling of the workers.
+
+    Attributes:
+        X: input features.
+        y: input target.
+        n_classes: number of classes.
+        batch_size: mini batch size to accumulate.
+        num_workers: number of worker processes.
+        n_partitions: number of partitions of the data.
+        input_shape: shape of the input.
+        output_shape: shape of the output.
+        input_dtype: dtype of input.
+        output_dtype: dtype of output.
+    """
+
+    def __init__(self, X, y, n_classes, batch_size, num_workers=2,
+                 prefetch_batches=0, partition_size=100000,
+                 random_state=None):
+        self.X = X
+        self.y = y
+        self.n_classes = n_classes
+        self.batch_size = batch_size
+        self._is_dask = hasattr(X, 'npartitions')
+        if self._is_dask:
+            if getattr(y, 'npartitions', None) != X.npartitions:
+                raise ValueError("A dask y must have as many partitions as X.")
+            self.n_partitions = X.npartitions
+        else:
+            if len(X) != len(y):
+                raise ValueError("X and y must have the same number of "
+                                 "samples, got %d and %d." % (len(X), len(y)))
+            self._partition_size = partition_size
+            self.n_partitions = max(
+                1, int(math.ceil(float(len(X)) / partition_size)))
+        self.num_workers = max(1, min(num_workers, self.n_partitions))
+        n_columns = len(X.columns) if hasattr(X, 'columns') else 1
+        if hasattr(y, 'columns'):
+            y_shape = (batch_size, len(y.columns))
+        else:
+            y_shape = (batch_size,)
+        self.input_shape, self.output_shape = _get_in_out_shape(
+            (batch_size, n_columns), y_shape, n_classes, batch_size)
+        self.input_dtype = np.float32
+        self.output_dtype = np.float32
+        self._seed = 42 if random_state is None else random_state
+        self._n_slots = (prefetch_batches or 2 * self.num_workers) + 1
+        self._spec = None
+        self._workers = []
+
+    def get_feed_params(self):
+        """Function returns a dict with data feed params while training.
+        Returns:
+            A dict with data feed params while training.
+        """
+        return {'batch_size': self.batch_size}
+
+    def _partition(self, partition):
+        """Returns the pandas slices or dask partitions of X and y of a
+        partition."""
+        if self._is_dask:
+            return (self.X.get_partition(partition),
+                    self.y.get_partition(partition))
+        start = partition * self._partition_size
+        return (self.X.iloc[start:start + self._partition_size],
+                self.y.iloc[start:start + self._partition_size])
+
+    def _start_workers(self):
+        """Allocates the slots and starts the worker processes."""
+        self.stop_prefetching()
+        slots = []
+        for _ in xrange(self._n_slots):
+            slots.append((
+                multiprocessing.RawArray(
+                    'b', int(np.prod(self.input_shape)) *
+                    np.dtype(self.input_dtype).itemsize),
+                multiprocessing.RawArray(
+                    'b', int(np.prod(self.output_shape)) *
+                    np.dtype(self.output_dtype).itemsize)))
+        free_slots = multiprocessing.Queue()
+        for slot in xrange(self._n_slots):
+            free_slots.put(slot)
+        self._spec = _WorkerSpec(
+            partitions=(), n_classes=self.n_classes,
+            batch_size=self.batch_size, slots=slots,
+            input_shape=self.input_shape, output_shape=self.output_shape,
+            input_dtype=self.input_dtype, output_dtype=self.output_dtype,
+            free_slots=free_slots, ready_batches=multiprocessing.Queue())
+        for worker_id in xrange(self.num_workers):
+            partitions = [self._partition(partition) for partition in
+                          xrange(worker_id, self.n_partitions,
+                                 self.num_workers)]
+            worker = multiprocessing.Process(
+                target=_feeder_worker,
+                args=(self._spec._replace(partitions=partitions),
+                      self._seed + worker_id))
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def stop_prefetching(self):
+        """Terminates the worker processes, if any."""
+        for worker in self._workers:
+            worker.terminate()
+            worker.join()
+        self._workers = []
+
+    def get_feed_dict_fn(self, input_placeholder, output_placeholder):
+        """Returns a function, that will sample data and provide it to given
+        placeholders.
+
+        Starts the worker processes, which run until stop_prefetching is
+        called.
+
+        Args:
+            input_placeholder: tf.Placeholder for input features mini batch.
+            output_placeholder: tf.Placeholder for output targets.
+        Returns:
+            A function that when called returns the next batch from the
+            workers.
+        """
+        self._start_workers()
+        in_use = []
+
+        def _feed_dict_fn():
+            if in_use:
+                self._spec.free_slots.put(in_use.pop())
+            batch = self._spec.ready_batches.get()
+            if isinstance(batch, six.string_types):
+                raise RuntimeError("A data feeder worker failed:\n" + batch)
+            slot, size = batch
+            in_use.append(slot)
+            inp, out = _slot_arrays(self._spec, slot)
+            return {input_placeholder.name: inp[:size],
+                    output_placeholder.name: out[:size]}
+        return _feed_dict_fn
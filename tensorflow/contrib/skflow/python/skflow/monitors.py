@@ -87,7 +87,9 @@ class BaseMonitor(object):
 
     def report(self):
         """Checks whether to report, and prints loss information if appropriate"""
-        if self.verbose and (self.steps % self.print_steps == 0):
+        # Uses the trainer's step index, on which it decides to fetch the loss,
+        # since the global step is offset when training continues.
+        if self.verbose and (self.global_step % self.print_steps == 0):
             self._set_training_summary()
             print(self._summary_str)
 
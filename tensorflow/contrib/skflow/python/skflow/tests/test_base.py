@@ -15,7 +15,9 @@
 from __future__ import division, print_function, absolute_import
 
 import random
+import sys
 
+from six.moves import StringIO
 from sklearn import datasets
 from sklearn.metrics import accuracy_score, mean_squared_error, log_loss
 
@@ -97,6 +99,66 @@ class BaseTest(tf.test.TestCase):
                                          "match score {1} from full "
                                          "data.".format(score2, score1))
 
+    def testIrisBatchedPredict(self):
+        iris = datasets.load_iris()
+        classifier = skflow.TensorFlowLinearClassifier(n_classes=3, steps=100)
+        classifier.fit(iris.data, iris.target)
+        predictions = classifier.predict(iris.data)
+        self.assertAllEqual(predictions, classifier.predict(
+            iris.data, batch_size=7, num_threads=4))
+        self.assertAllEqual(predictions, np.concatenate(list(
+            classifier.predict_iter(iris.data, batch_size=20))))
+        probabilities = classifier.predict_proba(iris.data)
+        # 4 float32 inputs and 3 probabilities per sample take 28 bytes.
+        self.assertEqual(10, classifier._predict_batch_size(-1, 2, 560))
+        self.assertAllClose(probabilities, classifier.predict_proba(
+            iris.data, num_threads=2, memory_budget=560))
+
+    def testIrisFetchSteps(self):
+        iris = datasets.load_iris()
+        monitor = skflow.monitors.BaseMonitor(print_steps=50)
+        classifier = skflow.TensorFlowEstimator(
+            model_fn=skflow.models.logistic_regression, n_classes=3,
+            steps=100, fetch_steps=20)
+        classifier.fit(iris.data, iris.target, monitor)
+        # Steps 0, 20, 40, 50, 60, 80 and the last step 99.
+        self.assertEqual(7, len(monitor.all_train_loss_buffer))
+        # The trainer passes its step index as the monitor's global_step.
+        self.assertEqual(99, monitor.global_step)
+        score = accuracy_score(iris.target, classifier.predict(iris.data))
+        self.assertGreater(score, 0.5, "Failed with score = {0}".format(score))
+
+    def testIrisFetchStepsPrinting(self):
+        iris = datasets.load_iris()
+
+        def iris_data():
+            while True:
+                for x in iris.data:
+                    yield x
+
+        def iris_target():
+            while True:
+                for y in iris.target:
+                    yield y
+
+        classifier = skflow.TensorFlowEstimator(
+            model_fn=skflow.models.logistic_regression, n_classes=3,
+            steps=110, fetch_steps=20, continue_training=True)
+        classifier.fit(iris_data(), iris_target())
+        # The global step now starts at 110, which is not a multiple of
+        # print_steps.
+        monitor = skflow.monitors.BaseMonitor(print_steps=50)
+        stdout = sys.stdout
+        sys.stdout = output = StringIO()
+        try:
+            classifier.fit(iris_data(), iris_target(), monitor)
+        finally:
+            sys.stdout = stdout
+        self.assertGreaterEqual(monitor.steps, 219)
+        self.assertEqual(["Step #0", "Step #50", "Step #100"],
+                         [line.split(",")[0]
+                          for line in output.getvalue().splitlines()])
+
     def testIris_proba(self):
         random.seed(42)
         iris = datasets.load_iris()
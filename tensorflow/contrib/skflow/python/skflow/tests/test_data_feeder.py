@@ -14,6 +14,7 @@
 
 from __future__ import division, print_function, absolute_import
 
+import os
 from struct import Struct
 import numpy as np
 import six
@@ -70,6 +71,73 @@ class DataFeederTest(tf.test.TestCase):
                                                    [0, 1, 0, 0, 0],
                                                    [0, 0, 1, 0, 0]]])
 
+    def test_data_feeder_classification(self):
+        X = np.array([1, 2, 3])
+        y = np.array([2, 0, 1])
+        df = data_feeder.DataFeeder(X, y, n_classes=3, batch_size=2)
+        feed_dict_fn = df.get_feed_dict_fn(
+            MockPlaceholder(name='input'),
+            MockPlaceholder(name='output'))
+        feed_dict = feed_dict_fn()
+        self.assertAllClose(feed_dict['input'], [[1], [2]])
+        self.assertAllClose(feed_dict['output'], [[0, 0, 1], [1, 0, 0]])
+        # The last batch of an epoch is smaller.
+        feed_dict = feed_dict_fn()
+        self.assertAllClose(feed_dict['input'], [[3]])
+        self.assertAllClose(feed_dict['output'], [[0, 1, 0]])
+        self.assertEqual(1, df.get_feed_params()['epoch'])
+
+    def test_prefetching_data_feeder(self):
+        X = np.arange(20).reshape(10, 2)
+        y = np.arange(10) % 4
+        df = data_feeder.DataFeeder(X, y, n_classes=4, batch_size=3)
+        prefetching_df = data_feeder.DataFeeder(X, y, n_classes=4,
+                                                batch_size=3,
+                                                prefetch_batches=2)
+        placeholders = (MockPlaceholder(name='input'),
+                        MockPlaceholder(name='output'))
+        feed_dict_fn = df.get_feed_dict_fn(*placeholders)
+        prefetching_feed_dict_fn = prefetching_df.get_feed_dict_fn(
+            *placeholders)
+        for _ in range(10):
+            feed_dict = feed_dict_fn()
+            prefetched_feed_dict = prefetching_feed_dict_fn()
+            self.assertAllClose(feed_dict['input'],
+                                prefetched_feed_dict['input'])
+            self.assertAllClose(feed_dict['output'],
+                                prefetched_feed_dict['output'])
+            self.assertEqual(df.get_feed_params(),
+                             prefetching_df.get_feed_params())
+        prefetching_df.stop_prefetching()
+
+    def test_out_of_core_data_feeder(self):
+        path = os.path.join(self.get_temp_dir(), 'X.dat')
+        X = np.memmap(path, dtype=np.float64, mode='w+', shape=(10, 2))
+        X[:, 0] = np.arange(10)
+        X[:, 1] = 2 * np.arange(10)
+        X.flush()
+        X = np.memmap(path, dtype=np.float64, mode='r', shape=(10, 2))
+        y = np.arange(10) % 3
+        df = data_feeder.setup_train_data_feeder(X, y, n_classes=3,
+                                                 batch_size=2)
+        self.assertIsInstance(df, data_feeder.OutOfCoreDataFeeder)
+        df = data_feeder.OutOfCoreDataFeeder(X, y, n_classes=3, batch_size=2,
+                                             block_size=4)
+        feed_dict_fn = df.get_feed_dict_fn(
+            MockPlaceholder(name='input'),
+            MockPlaceholder(name='output'))
+        rows = []
+        while df.get_feed_params()['epoch'] == 0:
+            feed_dict = feed_dict_fn()
+            inp, out = feed_dict['input'], feed_dict['output']
+            self.assertEqual(np.float32, inp.dtype)
+            # Each batch comes from a single block of 4 rows.
+            self.assertEqual(1, len(set(inp[:, 0] // 4)))
+            self.assertAllClose(inp[:, 1], 2 * inp[:, 0])
+            self.assertAllClose(out.argmax(axis=1), inp[:, 0] % 3)
+            rows.extend(inp[:, 0])
+        self.assertEqual(list(range(10)), sorted(rows))
+
     def test_streaming_data_feeder(self):
         def X_iter():
             yield np.array([1, 2])
@@ -107,6 +175,35 @@ class DataFeederTest(tf.test.TestCase):
                                                      [ 0., 1., 0.]])
 
 
+    def test_multi_process_data_feeder(self):
+        if HAS_PANDAS:
+            X = pd.DataFrame(dict(a=np.arange(10) * 1.0,
+                                  b=np.arange(10) * 2.0))
+            y = pd.Series(np.arange(10) % 3)
+            df = data_feeder.setup_train_data_feeder(X, y, n_classes=3,
+                                                     batch_size=4,
+                                                     num_workers=2)
+            self.assertIsInstance(df, data_feeder.MultiProcessDataFeeder)
+            df = data_feeder.MultiProcessDataFeeder(X, y, n_classes=3,
+                                                    batch_size=4,
+                                                    num_workers=2,
+                                                    partition_size=5)
+            feed_dict_fn = df.get_feed_dict_fn(
+                MockPlaceholder(name='input'),
+                MockPlaceholder(name='output'))
+            try:
+                for _ in range(10):
+                    feed_dict = feed_dict_fn()
+                    inp, out = feed_dict['input'], feed_dict['output']
+                    # Batches come from a single partition of 5 rows.
+                    self.assertLessEqual(len(inp), 4)
+                    self.assertEqual(1, len(set(inp[:, 0] // 5)))
+                    self.assertAllClose(inp[:, 1], 2 * inp[:, 0])
+                    self.assertAllClose(out.argmax(axis=1), inp[:, 0] % 3)
+            finally:
+                df.stop_prefetching()
+
+
 class SetupPredictDataFeederTest(tf.test.TestCase):
 
     def test_iterable_data(self):
@@ -105,7 +105,7 @@ class TensorFlowTrainer(object):
 
     def train(self, sess, feed_dict_fn, steps, monitor,
               summary_writer=None, summaries=None,
-              feed_params_fn=None):
+              feed_params_fn=None, fetch_steps=1):
         """Trains a model for given number of steps, given feed_dict function.
 
         Args:
@@ -115,12 +115,22 @@ class TensorFlowTrainer(object):
             steps: Number of steps to run.
             monitor: Monitor object to track training progress and induce early stopping
             summaries: Joined object of all summaries that should be ran.
+            fetch_steps: Number of steps in between fetching the loss and
+                summaries and updating the monitor. The other steps only run
+                the optimizer, without fetching anything. The loss is also
+                fetched on the steps the monitor prints and on the last
+                step, so early stopping is checked every fetch_steps steps.
 
         Returns:
             List of losses for each step.
         """
+        print_steps = getattr(monitor, 'print_steps', None)
         for step in xrange(steps):
             feed_dict = feed_dict_fn()
+            if not (step % fetch_steps == 0 or step == steps - 1 or
+                    (print_steps and step % print_steps == 0)):
+                sess.run(self.trainer, feed_dict=feed_dict)
+                continue
             if summaries is not None:
                 global_step, loss, summ, _ = sess.run(
                     [self.global_step, self.loss, summaries, self.trainer],
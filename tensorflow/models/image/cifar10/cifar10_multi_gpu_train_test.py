@@ -0,0 +1,80 @@
+# Copyright 2015 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Benchmark for building the multi-tower graph of cifar10_multi_gpu_train."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+
+from six.moves import xrange  # pylint: disable=redefined-builtin
+import tensorflow as tf
+
+from tensorflow.models.image.cifar10 import cifar10
+from tensorflow.models.image.cifar10 import cifar10_multi_gpu_train
+
+FLAGS = tf.app.flags.FLAGS
+
+
+def _tower_loss(scope):
+  """Like cifar10_multi_gpu_train.tower_loss(), but on random inputs."""
+  images = tf.random_uniform(
+      [FLAGS.batch_size, cifar10.IMAGE_SIZE, cifar10.IMAGE_SIZE, 3])
+  labels = tf.random_uniform([FLAGS.batch_size], maxval=cifar10.NUM_CLASSES,
+                             dtype=tf.int32)
+  logits = cifar10.inference(images)
+  _ = cifar10.loss(logits, labels)
+  losses = tf.get_collection('losses', scope)
+  return tf.add_n(losses, name='total_loss')
+
+
+class MultiGpuTrainBenchmark(tf.test.Benchmark):
+
+  def _benchmarkTowerGradients(self, num_towers):
+    gradient_times = []
+    with tf.Graph().as_default() as g:
+      opt = tf.train.GradientDescentOptimizer(0.1)
+      start_time = time.time()
+      tower_grads = []
+      for i in xrange(num_towers):
+        with tf.name_scope('%s_%d' % (cifar10.TOWER_NAME, i)) as scope:
+          loss = _tower_loss(scope)
+          tf.get_variable_scope().reuse_variables()
+          gradient_start_time = time.time()
+          tower_grads.append(opt.compute_gradients(loss))
+          gradient_times.append(time.time() - gradient_start_time)
+      grads = cifar10_multi_gpu_train.average_gradients(tower_grads)
+      opt.apply_gradients(grads)
+      wall_time = time.time() - start_time
+      num_ops = len(g.get_operations())
+    gradient_time = sum(gradient_times)
+    print('%d towers: %d ops, %.3f s total, %.3f s in compute_gradients '
+          '(%.3f s for the last tower)' % (num_towers, num_ops, wall_time,
+                                           gradient_time, gradient_times[-1]))
+    self.report_benchmark(
+        name='cifar10_multi_gpu_train_%d_tower_graph' % num_towers, iters=1,
+        wall_time=wall_time,
+        extras={'num_ops': num_ops,
+                'compute_gradients_time': gradient_time,
+                'last_tower_compute_gradients_time': gradient_times[-1]})
+
+  def benchmarkEightTowerGradients(self):
+    self._benchmarkTowerGradients(8)
+
+
+if __name__ == '__main__':
+  tf.test.main()
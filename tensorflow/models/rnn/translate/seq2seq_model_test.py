@@ -0,0 +1,82 @@
+# Copyright 2015 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Memory benchmark for the graph of the sequence-to-sequence model."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import resource
+import sys
+import time
+
+import tensorflow as tf
+
+from tensorflow.models.rnn.translate import seq2seq_model
+
+
+def _object_bytes(obj):
+  """Returns the size of `obj` and of its instance dict, if it has one."""
+  size = sys.getsizeof(obj)
+  if hasattr(obj, "__dict__"):
+    size += sys.getsizeof(obj.__dict__)
+  return size
+
+
+def _graph_object_bytes(graph):
+  """Returns the bytes used by the ops, tensors and shapes of `graph`."""
+  total = 0
+  for op in graph.get_operations():
+    total += _object_bytes(op)
+    for tensor in op.outputs:
+      total += _object_bytes(tensor) + sys.getsizeof(tensor.consumers())
+      shape = tensor.get_shape()
+      total += _object_bytes(shape)
+      if shape.dims is not None:
+        total += sum(_object_bytes(dim) for dim in shape.dims)
+  return total
+
+
+class Seq2SeqModelMemoryBenchmark(tf.test.Benchmark):
+
+  def benchmarkGraphBytesPerOp(self):
+    buckets = [(5, 10), (10, 15), (20, 25), (40, 50)]
+    with tf.Graph().as_default() as g:
+      start_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+      start_time = time.time()
+      seq2seq_model.Seq2SeqModel(
+          source_vocab_size=1000, target_vocab_size=1000, buckets=buckets,
+          size=64, num_layers=2, max_gradient_norm=5.0, batch_size=16,
+          learning_rate=0.5, learning_rate_decay_factor=0.99,
+          num_samples=256)
+      wall_time = time.time() - start_time
+      end_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+      num_ops = len(g.get_operations())
+      object_bytes_per_op = _graph_object_bytes(g) / num_ops
+      # ru_maxrss is reported in kilobytes on Linux.
+      rss_bytes_per_op = (end_rss_kb - start_rss_kb) * 1024.0 / num_ops
+    print("Seq2SeqModel graph: %d ops, %.1f object bytes/op, "
+          "%.1f peak RSS bytes/op" % (num_ops, object_bytes_per_op,
+                                      rss_bytes_per_op))
+    self.report_benchmark(
+        name="seq2seq_model_graph_bytes_per_op", iters=1, wall_time=wall_time,
+        extras={"num_ops": num_ops,
+                "object_bytes_per_op": object_bytes_per_op,
+                "peak_rss_bytes_per_op": rss_bytes_per_op})
+
+
+if __name__ == "__main__":
+  tf.test.main()
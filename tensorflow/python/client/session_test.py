@@ -29,6 +29,7 @@ from tensorflow.core.lib.core import error_codes_pb2
 from tensorflow.core.protobuf import config_pb2
 from tensorflow.python.client import session
 from tensorflow.python.framework import dtypes
+from tensorflow.python.framework import errors
 from tensorflow.python.framework import ops
 from tensorflow.python.framework import tensor_util
 from tensorflow.python.framework import test_util
@@ -432,6 +433,26 @@ class SessionTest(test_util.TensorFlowTestCase):
       v_val = v.eval()
       self.assertAllEqual([[6.0, 6.0, 6.0]], v_val)
 
+  def testExtendWithControlFlow(self):
+    with session.Session() as s:
+      x = constant_op.constant(2.0)
+      y = control_flow_ops.cond(math_ops.less(x, 3.0),
+                                lambda: math_ops.add(x, 1.0),
+                                lambda: math_ops.mul(x, 2.0))
+      n = control_flow_ops.While(lambda i: math_ops.less(i, 10),
+                                 lambda i: math_ops.add(i, 1),
+                                 [constant_op.constant(0)])
+      self.assertEqual(3.0, s.run(y))
+      self.assertEqual(10, s.run(n))
+      # Extend will happen here, with more control flow ops.
+      z = control_flow_ops.cond(math_ops.less(y, 3.0),
+                                lambda: math_ops.add(y, 1.0),
+                                lambda: math_ops.mul(y, 2.0))
+      m = control_flow_ops.While(lambda i: math_ops.less(i, 20),
+                                 lambda i: math_ops.add(i, 2),
+                                 [n])
+      self.assertEqual([6.0, 20], s.run([z, m]))
+
   def testExtendWithGroupBy(self):
     with session.Session() as s:
       a = constant_op.constant(1.0, shape=[1, 2])
@@ -965,6 +986,198 @@ class SessionTest(test_util.TensorFlowTestCase):
       with self.assertRaisesRegexp(ValueError, 'may not be fed'):
         sess.run(reshaped_tensor, feed_dict={new_shape: [3, 7]})
 
+  def testMakeCallable(self):
+    with session.Session() as sess:
+      a = array_ops.placeholder(dtypes.float32, shape=[])
+      b = array_ops.placeholder(dtypes.float32, shape=[])
+      c = math_ops.add(a, b)
+      d = math_ops.mul(c, b)
+
+      single_fetch = sess.make_callable(c, [a, b])
+      self.assertEqual(3.0, single_fetch(1.0, 2.0))
+      self.assertEqual(7.0, single_fetch(3.0, 4.0))
+
+      list_fetch = sess.make_callable([c, d, c], [a, b])
+      self.assertAllEqual([3.0, 6.0, 3.0], list_fetch(1.0, 2.0))
+
+      with self.assertRaisesRegexp(ValueError, 'Expected 2 feed values'):
+        single_fetch(1.0)
+      with self.assertRaisesRegexp(ValueError, 'Cannot feed value of shape'):
+        single_fetch([1.0, 2.0], 2.0)
+
+  def testMakeCallableWithTargetsAndNoFeeds(self):
+    with session.Session() as sess:
+      v = variables.Variable(1.0)
+      inc = state_ops.assign_add(v, 1.0)
+      sess.run(v.initializer)
+
+      step = sess.make_callable(inc.op)
+      self.assertEqual(None, step())
+      step()
+      self.assertEqual(3.0, sess.run(v))
+
+  def testMakeCallableSparseTensor(self):
+    with session.Session() as sess:
+      indices = np.array([[3, 2, 0], [4, 5, 1]]).astype(np.int64)
+      values = np.array([1.0, 2.0]).astype(np.float32)
+      shape = np.array([7, 9, 2]).astype(np.int64)
+      sp = ops.SparseTensor(
+          array_ops.placeholder(dtype=np.int64, shape=(2, 3)),
+          array_ops.placeholder(dtype=np.float32, shape=(2,)),
+          array_ops.placeholder(dtype=np.int64, shape=(3,)),)
+      sp2 = ops.SparseTensor(array_ops.identity(sp.indices),
+                             array_ops.identity(sp.values),
+                             array_ops.identity(sp.shape))
+      step = sess.make_callable(sp2, [sp])
+      sp2_out = step(ops.SparseTensorValue(indices, values, shape))
+      self.assertAllEqual(sp2_out.indices, indices)
+      self.assertAllEqual(sp2_out.values, values)
+      self.assertAllEqual(sp2_out.shape, shape)
+
+  def testMakeCallableInvalidFeeds(self):
+    with session.Session() as sess:
+      some_tensor = constant_op.constant([2.0, 2.0, 2.0, 2.0])
+      new_shape = constant_op.constant([2, 2])
+      reshaped_tensor = array_ops.reshape(some_tensor, new_shape)
+
+      with self.assertRaisesRegexp(ValueError, 'may not be fed'):
+        sess.make_callable(reshaped_tensor, [new_shape])
+      with self.assertRaisesRegexp(TypeError, 'Cannot interpret feed_list'):
+        sess.make_callable(reshaped_tensor, ['nonexistent:0'])
+
+  def testFeedBytesCopied(self):
+    with session.Session() as sess:
+      a = array_ops.placeholder(dtypes.float32, shape=[2, 3])
+      b = array_ops.identity(a)
+      self.assertEqual(0, sess.feed_bytes_copied)
+
+      # A C-contiguous array of the right dtype is fed without copying.
+      contiguous = np.ones([2, 3], dtype=np.float32)
+      self.assertAllEqual(contiguous, sess.run(b, {a: contiguous}))
+      self.assertEqual(0, sess.feed_bytes_copied)
+
+      # Arrays of another dtype or layout, and lists, are copied.
+      self.assertAllEqual(contiguous,
+                          sess.run(b, {a: np.ones([2, 3], dtype=np.float64)}))
+      self.assertEqual(24, sess.feed_bytes_copied)
+      transposed = np.arange(6, dtype=np.float32).reshape([3, 2]).T
+      self.assertAllEqual(transposed, sess.run(b, {a: transposed}))
+      self.assertEqual(24, sess.feed_bytes_copied)
+      self.assertAllEqual(contiguous, sess.run(b, {a: [[1.0] * 3] * 2}))
+      self.assertEqual(24, sess.feed_bytes_copied)
+
+      step = sess.make_callable(b, [a])
+      self.assertAllEqual(contiguous, step(contiguous))
+      self.assertEqual(0, sess.feed_bytes_copied)
+
+  def testRunAsync(self):
+    with session.Session() as sess:
+      a = array_ops.placeholder(dtypes.float32, shape=[])
+      b = math_ops.mul(a, 2.0)
+
+      futures = [sess.run_async(b, {a: float(i)}) for i in xrange(20)]
+      for i, future in enumerate(futures):
+        self.assertEqual(2.0 * i, future.result())
+        self.assertTrue(future.done())
+        self.assertEqual(None, future.exception())
+
+      # Invalid arguments are reported on the calling thread.
+      with self.assertRaisesRegexp(ValueError, 'Cannot feed value of shape'):
+        sess.run_async(b, {a: [1.0, 2.0]})
+
+      # Errors raised while running the step are reported by the future.
+      future = sess.run_async(b)
+      with self.assertRaisesOpError('You must feed a value'):
+        future.result()
+      self.assertTrue(isinstance(future.exception(), errors.OpError))
+
+  def testRunAsyncDoneCallback(self):
+    with session.Session() as sess:
+      a = constant_op.constant(6.0)
+      results = []
+      done = threading.Event()
+      def _callback(future):
+        results.append(future.result())
+        done.set()
+      sess.run_async(a).add_done_callback(_callback)
+      done.wait(10.0)
+      self.assertEqual([6.0], results)
+      # Callbacks added after the step finished run immediately.
+      future = sess.run_async(a)
+      future.result()
+      future.add_done_callback(lambda f: results.append(f.result()))
+      self.assertEqual([6.0, 6.0], results)
+
+  def testRunAsyncExtendsGraph(self):
+    with session.Session() as sess:
+      c = constant_op.constant(5.0)
+      futures = []
+      for i in xrange(10):
+        # Each step needs the graph to be extended with a new node.
+        c = math_ops.add(c, 1.0)
+        futures.append((i, sess.run_async(c)))
+      for i, future in futures:
+        self.assertEqual(6.0 + i, future.result())
+
+  def testRunAsyncCopiesFeeds(self):
+    with session.Session() as sess:
+      a = array_ops.placeholder(dtypes.float32, shape=[2, 3])
+      b = array_ops.identity(a)
+      batch = np.ones([2, 3], dtype=np.float32)
+      futures = []
+      for i in xrange(10):
+        # Reuse the same buffer for every step, like a ring of batches.
+        batch.fill(i)
+        futures.append((i, sess.run_async(b, {a: batch})))
+        self.assertEqual(24, sess.feed_bytes_copied)
+      for i, future in futures:
+        self.assertAllEqual(np.full([2, 3], i, dtype=np.float32),
+                            future.result())
+
+  def testRunAsyncAfterClose(self):
+    sess = session.Session()
+    c = constant_op.constant(1.0)
+    future = sess.run_async(c)
+    sess.close()
+    # Steps that were started before close() finish.
+    self.assertTrue(future.done())
+    self.assertEqual(1.0, future.result())
+    with self.assertRaisesRegexp(RuntimeError, 'closed Session'):
+      sess.run_async(c)
+
+
+class SessionBenchmark(googletest.Benchmark):
+
+  def _benchmarkStepOverhead(self, name, make_step, iters=1000):
+    with ops.Graph().as_default(), ops.device('/cpu:0'):
+      a = array_ops.placeholder(dtypes.float32, shape=[1])
+      b = array_ops.placeholder(dtypes.float32, shape=[1])
+      c = math_ops.add(a, b)
+      d = math_ops.mul(c, b)
+      with session.Session() as sess:
+        step = make_step(sess, [c, d], [a, b])
+        a_val = np.ones([1], dtype=np.float32)
+        b_val = np.ones([1], dtype=np.float32)
+        # Warm up, so that graph extension is not measured.
+        step(a_val, b_val)
+        start_time = time.time()
+        for _ in xrange(iters):
+          step(a_val, b_val)
+        wall_time = (time.time() - start_time) / iters
+    print('%s: %f us/step' % (name, wall_time * 1e6))
+    self.report_benchmark(name=name, iters=iters, wall_time=wall_time)
+
+  def benchmarkRunStepOverhead(self):
+    def _make_run_step(sess, fetches, feed_list):
+      return lambda *args: sess.run(fetches, dict(zip(feed_list, args)))
+    self._benchmarkStepOverhead('session_run_step_overhead', _make_run_step)
+
+  def benchmarkCallableStepOverhead(self):
+    def _make_callable_step(sess, fetches, feed_list):
+      return sess.make_callable(fetches, feed_list)
+    self._benchmarkStepOverhead('session_callable_step_overhead',
+                                _make_callable_step)
+
 
 if __name__ == '__main__':
   googletest.main()
@@ -19,6 +19,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import bisect
 import collections
 import contextlib
 import copy
@@ -41,30 +42,45 @@ from tensorflow.python.util import compat
 from tensorflow.python.platform import logging
 
 
+# The tag of the `node` field (field number 1, length-delimited) of `GraphDef`.
+_GRAPH_DEF_NODE_TAG = b"\x0a"
+
+
+def _varint_bytes(value):
+  """Encodes a non-negative integer as a protocol buffer varint."""
+  encoded = bytearray()
+  while value > 0x7f:
+    encoded.append((value & 0x7f) | 0x80)
+    value >>= 7
+  encoded.append(value)
+  return bytes(encoded)
+
+
 def _convert_stack(stack):
   """Converts a stack extracted using _extract_stack() to a traceback stack.
 
   Args:
-    stack: A list of n 4-tuples, (filename, lineno, name, frame_globals).
+    stack: A sequence of n triples, (code, lineno, f_globals).
 
   Returns:
     A list of n 4-tuples (filename, lineno, name, code), where the code tuple
     element is calculated from the corresponding elements of the input tuple.
   """
   ret = []
-  for filename, lineno, name, frame_globals in stack:
+  for code, lineno, f_globals in stack:
+    filename = code.co_filename
     linecache.checkcache(filename)
-    line = linecache.getline(filename, lineno, frame_globals)
+    line = linecache.getline(filename, lineno, f_globals)
     if line:
       line = line.strip()
     else:
       line = None
-    ret.append((filename, lineno, name, line))
+    ret.append((filename, lineno, code.co_name, line))
   return ret
 
 
 # pylint: disable=line-too-long
-def _extract_stack():
+def _extract_stack(limit=None):
   """A lightweight re-implementation of traceback.extract_stack.
 
   NOTE(mrry): traceback.extract_stack eagerly retrieves the line of code for
@@ -73,26 +89,33 @@ def _extract_stack():
     should apply _convert_stack to the result to obtain a traceback that can
     be formatted etc. using traceback methods.
 
+  Each frame is stored as a (code, lineno, f_globals) triple, which
+  references the code object and module globals of the frame (shared by
+  every call of a function) rather than the frame itself. linecache needs
+  the globals to find the source of modules imported through a
+  `__loader__`, e.g. from a zip file.
+
+  Args:
+    limit: (Optional.) If not None, extract at most this many of the
+      innermost frames.
+
   Returns:
-    A list of 4-tuples (filename, lineno, name, frame_globals) corresponding to
-    the call stack of the current thread.
+    A tuple of triples (code, lineno, f_globals) corresponding to the call stack of the
+    current thread, outermost frame first.
   """
   # pylint: enable=line-too-long
+  if limit == 0:
+    return ()
   try:
     raise ZeroDivisionError
   except ZeroDivisionError:
     f = sys.exc_info()[2].tb_frame.f_back
   ret = []
-  while f is not None:
-    lineno = f.f_lineno
-    co = f.f_code
-    filename = co.co_filename
-    name = co.co_name
-    frame_globals = f.f_globals
-    ret.append((filename, lineno, name, frame_globals))
+  while f is not None and (limit is None or len(ret) < limit):
+    ret.append((f.f_code, f.f_lineno, f.f_globals))
     f = f.f_back
   ret.reverse()
-  return ret
+  return tuple(ret)
 
 
 def _as_graph_element(obj):
@@ -111,6 +134,10 @@ def _as_graph_element(obj):
   return None
 
 
+# The shape of every `Tensor` whose shape has not been set.
+_UNKNOWN_SHAPE = tensor_shape.unknown_shape()
+
+
 class Tensor(object):
   """Represents a value produced by an `Operation`.
 
@@ -163,6 +190,9 @@ class Tensor(object):
 
   """
 
+  # Graphs may contain millions of tensors, so tensors have no instance dict.
+  __slots__ = ["_op", "_value_index", "_dtype", "_shape", "_consumers"]
+
   # List of Python operators that we allow to override.
   OVERLOADABLE_OPERATORS = {
       # Binary.
@@ -216,7 +246,9 @@ class Tensor(object):
     self._op = op
     self._value_index = value_index
     self._dtype = dtypes.as_dtype(dtype)
-    self._shape = tensor_shape.unknown_shape()
+    # TensorShape objects are immutable, so all tensors whose shape has not
+    # been set share the same unknown shape.
+    self._shape = _UNKNOWN_SHAPE
     # List of operations that use this Tensor as input.  We maintain this list
     # to easily navigate a computation graph.
     self._consumers = []
@@ -1033,6 +1065,12 @@ class Operation(object):
   @@traceback
   """
 
+  # Graphs may contain millions of operations, so operations have no
+  # instance dict.
+  __slots__ = ["_node_def", "_graph", "_inputs", "_output_types", "_outputs",
+               "_input_types", "_control_inputs", "_original_op", "_op_def",
+               "_traceback", "_control_flow_context", "_id_value"]
+
   def __init__(self, node_def, g, inputs=None, output_types=None,
                control_inputs=None, input_types=None, original_op=None,
                op_def=None):
@@ -1124,7 +1162,7 @@ class Operation(object):
 
     self._original_op = original_op
     self._op_def = op_def
-    self._traceback = _extract_stack()
+    self._traceback = _extract_stack(g._traceback_limit)
     # Add this op to the current control flow context:
     self._control_flow_context = g._get_control_flow_context()
     if self._control_flow_context is not None:
@@ -1202,6 +1240,7 @@ class Operation(object):
       device: string or device..  The device to set.
     """
     self._node_def.device = _device_string(device)
+    self._graph._invalidate_serialized_node(self)
 
   def _add_input(self, tensor, dtype=None):
     """Add a new input to this operation.
@@ -1230,6 +1269,7 @@ class Operation(object):
     self._inputs.append(tensor)
     self._input_types.append(dtype)
     tensor._add_consumer(self)  # pylint: disable=protected-access
+    self._graph._input_update_count += 1
     self._recompute_node_def()
 
   def _update_input(self, index, tensor, dtype=None):
@@ -1264,6 +1304,7 @@ class Operation(object):
     self._inputs[index] = tensor
     self._input_types[index] = dtype
     tensor._add_consumer(self)  # pylint: disable=protected-access
+    self._graph._input_update_count += 1
     self._recompute_node_def()
 
   def _add_control_input(self, op):
@@ -1289,6 +1330,7 @@ class Operation(object):
     if self._control_inputs:
       self._node_def.input.extend(["^%s" % op.name for op in
                                    self._control_inputs])
+    self._graph._invalidate_serialized_node(self)
 
   def __str__(self):
     return str(self._node_def)
@@ -1302,6 +1344,8 @@ class Operation(object):
   class _InputList(object):
     """Immutable input list wrapper."""
 
+    __slots__ = ["_op"]
+
     def __init__(self, op):
       self._op = op
 
@@ -1380,7 +1424,12 @@ class Operation(object):
 
   @property
   def traceback(self):
-    """Returns the call stack from when this operation was constructed."""
+    """Returns the call stack from when this operation was constructed.
+
+    The number of frames recorded is limited by the
+    [`traceback_limit`](#Graph.traceback_limit) of the graph at the time the
+    operation was constructed.
+    """
     return _convert_stack(self._traceback)
 
   def get_attr(self, name):
@@ -1729,6 +1778,114 @@ def get_stats_for_node_def(graph, node, statistic_type):
   return result
 
 
+class _CollectionList(list):
+  """The list of the items of a graph collection.
+
+  `Graph.get_collection()` returns the list itself, which callers may change
+  in place. The list counts in `changes` how often it was changed other than
+  by appending items, so that a `_CollectionScopeIndex` can tell in constant
+  time whether to rebuild.
+  """
+
+  def __init__(self, *args):
+    super(_CollectionList, self).__init__(*args)
+    self.changes = 0
+
+
+def _counting_changes(name):
+  """Returns a `_CollectionList` method that counts a change to the list."""
+  method = getattr(list, name)
+
+  def _changing_method(self, *args):
+    self.changes += 1
+    return method(self, *args)
+  _changing_method.__name__ = name
+  return _changing_method
+
+
+# The methods of lists that can replace or remove items. `__setslice__` and
+# `__delslice__` only exist, and need to be counted, in Python 2.
+for _name in ["__setitem__", "__delitem__", "__setslice__", "__delslice__",
+              "__imul__", "insert", "remove", "pop", "sort", "reverse",
+              "clear"]:
+  if hasattr(list, _name):
+    setattr(_CollectionList, _name, _counting_changes(_name))
+del _name
+
+
+class _CollectionScopeIndex(object):
+  """An index of the items of a graph collection, sorted by name.
+
+  The items whose name starts with a given scope are contiguous in the index,
+  so finding them takes time logarithmic in the size of the collection, and
+  the result of each lookup is cached until the collection changes.
+
+  The index is brought up to date lazily, by `update()`. Items appended to
+  the collection are inserted into the index, and any other change to the
+  `_CollectionList`, as counted by its `changes`, rebuilds the index.
+  """
+
+  def __init__(self):
+    # The names of the indexed items, sorted, and the positions of the
+    # corresponding items in the collection.
+    self._names = []
+    self._positions = []
+    # The number of items of the collection that have been indexed, and its
+    # `changes` when they were.
+    self._size = 0
+    self._changes = 0
+    # Maps scopes to the sorted positions of the items in that scope.
+    self._lookup_cache = {}
+
+  def update(self, collection):
+    """Indexes the items that were added to `collection` since the last call.
+
+    Args:
+      collection: The `_CollectionList` of items in the collection.
+    """
+    changed = collection.changes != self._changes
+    if not changed and len(collection) == self._size:
+      return
+    self._lookup_cache.clear()
+    new_items = len(collection) - self._size
+    if changed or new_items > len(self._names) // 8:
+      # Re-sorting the whole collection is cheaper than inserting many items.
+      entries = sorted(
+          (item.name, position) for position, item in enumerate(collection)
+          if isinstance(getattr(item, "name", None), six.string_types))
+      self._names = [name for name, _ in entries]
+      self._positions = [position for _, position in entries]
+    else:
+      for position in range(self._size, len(collection)):
+        name = getattr(collection[position], "name", None)
+        if isinstance(name, six.string_types):
+          i = bisect.bisect_right(self._names, name)
+          self._names.insert(i, name)
+          self._positions.insert(i, position)
+    self._size = len(collection)
+    self._changes = collection.changes
+
+  def lookup(self, scope):
+    """Returns the sorted positions of the items whose name starts with `scope`.
+
+    Args:
+      scope: A string.
+
+    Returns:
+      A list of positions in the collection.
+    """
+    positions = self._lookup_cache.get(scope)
+    if positions is None:
+      positions = []
+      for i in range(bisect.bisect_left(self._names, scope), len(self._names)):
+        if not self._names[i].startswith(scope):
+          break
+        positions.append(self._positions[i])
+      positions.sort()
+      self._lookup_cache[scope] = positions
+    return positions
+
+
 class Graph(object):
   """A TensorFlow computation, represented as a dataflow graph.
 
@@ -1793,6 +1950,7 @@ class Graph(object):
   @@get_operations
 
   @@seed
+  @@traceback_limit
   @@unique_name
   @@version
   @@graph_def_versions
@@ -1807,6 +1965,13 @@ class Graph(object):
     self._next_node_id = [dict()]
     self._next_id_counter = 0
     self._nodes_by_name = dict()
+    # The ids of the ops in this graph, in increasing order.
+    self._op_ids = []
+    # Maps op ids to the serialized `NodeDef` of the op, framed as a
+    # `GraphDef.node` field. Filled in lazily by `_as_serialized_graph_def()`.
+    self._serialized_nodes = {}
+    # The number of times the inputs of an existing op have been changed.
+    self._input_update_count = 0
     # Current name stack: uniquified names
     self._name_stack = ""
     # Maps a name used in the graph to the next id to use for that name.
@@ -1822,8 +1987,13 @@ class Graph(object):
     self._control_dependencies_stack = []
     # Arbritrary collections of objects.
     self._collections = {}
+    # Maps collection names to a _CollectionScopeIndex of their items, used
+    # by get_collection() to filter collections by scope.
+    self._collection_scope_indices = {}
     # The graph-level random seed
     self._seed = None
+    # The maximum number of stack frames recorded per op, or None for all.
+    self._traceback_limit = None
     # A map from op type to the kernel label that should be used.
     self._op_to_kernel_label_map = {}
     # A map from op type to an alternative op type that should be used when
@@ -1874,6 +2044,10 @@ class Graph(object):
                        "is already used" % op.name)
     self._nodes_by_id[op._id] = op
     self._nodes_by_name[op.name] = op
+    if not self._op_ids or op._id > self._op_ids[-1]:
+      self._op_ids.append(op._id)
+    else:
+      bisect.insort(self._op_ids, op._id)
 
   @property
   def version(self):
@@ -1904,6 +2078,37 @@ class Graph(object):
   def seed(self, seed):
     self._seed = seed
 
+  @property
+  def traceback_limit(self):
+    """The number of stack frames recorded for each new operation.
+
+    When an `Operation` is constructed, the call stack is recorded so that
+    [`Operation.traceback`](#Operation.traceback) and error messages can
+    show where the op was created. Walking and storing the stack is a
+    noticeable part of the cost of building a large graph, so it can be
+    limited:
+
+    ```python
+    g = tf.Graph()
+    g.traceback_limit = 0  # Record no frames.
+    g.traceback_limit = 5  # Record the 5 innermost frames.
+    g.traceback_limit = None  # Record the full stack (the default).
+    ```
+
+    The limit applies to operations created after it is set.
+
+    Returns:
+      A non-negative integer, or None if the full stack is recorded.
+    """
+    return self._traceback_limit
+
+  @traceback_limit.setter
+  def traceback_limit(self, limit):
+    if limit is not None and limit < 0:
+      raise ValueError("traceback_limit must be None or non-negative: %r"
+                       % (limit,))
+    self._traceback_limit = limit
+
   @property
   def finalized(self):
     """True if this graph has been finalized."""
@@ -1979,6 +2184,70 @@ class Graph(object):
       graph.library.function.extend(self._functions.values())
     return graph
 
+  def _as_serialized_graph_def(self, from_version, to_version):
+    """Returns a serialized `GraphDef` of the nodes added between two versions.
+
+    The result parses to the same `GraphDef` as
+    `self.as_graph_def(from_version=from_version)`, restricted to the nodes
+    that were added before `version` had the value `to_version`. The
+    serialized form of each `NodeDef` is cached, and the ops are kept in id
+    order, so the cost of this method is proportional to the number of
+    nodes it returns, rather than to the size of the graph.
+
+    NOTE: The cached form of an op is discarded when the op's device or
+    inputs change, but not if its `node_def` is modified directly.
+
+    Args:
+      from_version: Only nodes added after `version` had this value are
+        returned.
+      to_version: Only nodes added before `version` had this value (inclusive)
+        are returned.
+
+    Returns:
+      A serialized
+      [`GraphDef`](https://www.tensorflow.org/code/tensorflow/core/framework/graph.proto)
+      protocol buffer.
+
+    Raises:
+      ValueError: If the `graph_def` would be too large.
+    """
+    start = bisect.bisect_right(self._op_ids, from_version)
+    end = bisect.bisect_right(self._op_ids, to_version)
+    chunks = []
+    bytesize = 0
+    for op_id in self._op_ids[start:end]:
+      serialized_node = self._serialized_nodes.get(op_id)
+      if serialized_node is None:
+        node_def = self._nodes_by_id[op_id].node_def.SerializeToString()
+        serialized_node = (_GRAPH_DEF_NODE_TAG + _varint_bytes(len(node_def)) +
+                           node_def)
+        self._serialized_nodes[op_id] = serialized_node
+      chunks.append(serialized_node)
+      bytesize += len(serialized_node)
+      if bytesize >= (1 << 31):
+        raise ValueError("GraphDef cannot be larger than 2GB.")
+
+    # The versions and the function library are serialized as a separate
+    # `GraphDef`; concatenating serialized messages merges them.
+    graph = graph_pb2.GraphDef()
+    graph.versions.CopyFrom(self._graph_def_versions)
+    if self._functions:
+      for f in self._functions.values():
+        bytesize += f.ByteSize()
+        if bytesize >= (1 << 31) or bytesize < 0:
+          raise ValueError("GraphDef cannot be larger than 2GB.")
+      graph.library.function.extend(self._functions.values())
+    chunks.append(graph.SerializeToString())
+    return b"".join(chunks)
+
+  def _invalidate_serialized_node(self, op):
+    """Discards the cached serialized `NodeDef` of `op`, if any."""
+    # A control flow context changes the inputs of an op while it is being
+    # constructed, before it has an id and hence a cached `NodeDef`.
+    op_id = getattr(op, "_id_value", None)
+    if op_id is not None:
+      self._serialized_nodes.pop(op_id, None)
+
   def _is_function(self, name):
     """Tests whether 'name' is registered in this graph's function library.
 
@@ -2362,7 +2631,7 @@ class Graph(object):
     """
     self._check_not_finalized()
     if name not in self._collections:
-      self._collections[name] = [value]
+      self._collections[name] = _CollectionList([value])
     else:
       self._collections[name].append(value)
 
@@ -2389,7 +2658,9 @@ class Graph(object):
       name: The key for the collection. For example, the `GraphKeys` class
         contains many standard names for collections.
       scope: (Optional.) If supplied, the resulting list is filtered to include
-        only items whose name begins with this string.
+        only items whose name begins with this string. Filtering uses an
+        index of the collection sorted by name, so it takes time logarithmic
+        in the size of the collection plus linear in the size of the result.
 
     Returns:
       The list of values in the collection with the given `name`, or
@@ -2400,11 +2671,15 @@ class Graph(object):
     if scope is None:
       return self._collections.get(name, list())
     else:
-      c = []
-      for item in self._collections.get(name, list()):
-        if hasattr(item, "name") and item.name.startswith(scope):
-          c.append(item)
-      return c
+      collection = self._collections.get(name)
+      if not collection:
+        return []
+      index = self._collection_scope_indices.get(name)
+      if index is None:
+        index = _CollectionScopeIndex()
+        self._collection_scope_indices[name] = index
+      index.update(collection)
+      return [collection[position] for position in index.lookup(scope)]
 
   def get_all_collection_keys(self):
     """Returns a list of collections used in this graph."""
@@ -18,6 +18,14 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import os
+import sys
+import time
+import zipfile
+
+from six.moves import xrange  # pylint: disable=redefined-builtin
+
+from tensorflow.core.framework import graph_pb2
 from tensorflow.python.framework import device as pydev
 from tensorflow.python.framework import dtypes
 from tensorflow.python.framework import ops
@@ -54,6 +62,25 @@ class TensorTest(test_util.TensorFlowTestCase):
       for _ in t:
         pass
 
+  def testConsumers(self):
+    g = ops.Graph()
+    a = _apply_op(g, "const", [], [dtypes.float32])
+    self.assertEqual([], a.consumers())
+    b = _apply_op(g, "add", [a, a], [dtypes.float32])
+    c = _apply_op(g, "identity", [a], [dtypes.float32])
+    self.assertEqual([b.op, b.op, c.op], a.consumers())
+    self.assertEqual([], b.consumers())
+
+  def testNoInstanceDict(self):
+    op = ops.Operation(
+        ops._NodeDef("noop", "myop"), ops.Graph(), [], [dtypes.float32])
+    t = op.outputs[0]
+    t.set_shape([1, None])
+    for obj in [op, t, t.get_shape(), t.get_shape()[0]]:
+      self.assertFalse(hasattr(obj, "__dict__"))
+      with self.assertRaises(AttributeError):
+        obj.some_attribute = None
+
 
 class SparseTensorTest(test_util.TensorFlowTestCase):
 
@@ -757,6 +784,40 @@ class CollectionTest(test_util.TensorFlowTestCase):
     self.assertEqual([27, blank1, blank2], g.get_collection("blah"))
     self.assertEqual([blank1], g.get_collection("blah", "prefix"))
 
+  def testScopedCollection(self):
+    g = ops.Graph()
+    items = [ObjectWithName(name) for name in
+             ["b/x", "a/y", "ab/z", "a/x", "b/a/x", "a"]]
+    for item in items:
+      g.add_to_collection("key", item)
+    g.add_to_collection("key", 12)
+
+    # Results keep the order in which the items were collected.
+    self.assertEqual([items[1], items[2], items[3], items[5]],
+                     g.get_collection("key", "a"))
+    self.assertEqual([items[1], items[3]], g.get_collection("key", "a/"))
+    self.assertEqual([items[0], items[4]], g.get_collection("key", "b"))
+    self.assertEqual([], g.get_collection("key", "c"))
+    self.assertEqual(items, g.get_collection("key", ""))
+
+    # Items added after a lookup are found by later lookups.
+    late = ObjectWithName("a/late")
+    g.add_to_collection("key", late)
+    self.assertEqual([items[1], items[3], late], g.get_collection("key", "a/"))
+    self.assertEqual([items[0], items[4]], g.get_collection("key", "b"))
+
+    # The returned lists are copies.
+    g.get_collection("key", "b").append(late)
+    self.assertEqual([items[0], items[4]], g.get_collection("key", "b"))
+
+    # Changes to the collection list in place are seen by later lookups.
+    collection = g.get_collection("key")
+    replacement = ObjectWithName("b/replacement")
+    collection[0] = replacement
+    self.assertEqual([replacement, items[4]], g.get_collection("key", "b"))
+    del collection[1]
+    self.assertEqual([items[3], late], g.get_collection("key", "a/"))
+
   def testDefaulGraph(self):
     with ops.Graph().as_default():
       ops.add_to_collection("key", 90)
@@ -1104,6 +1165,48 @@ class GraphTest(test_util.TensorFlowTestCase):
     with self.assertRaises(TypeError):
       g.as_graph_element(NonConvertibleObj())
 
+  def testTracebackLimit(self):
+    g = ops.Graph()
+    self.assertEqual(None, g.traceback_limit)
+    a = _apply_op(g, "const", [], [dtypes.float32])
+    full_traceback = a.op.traceback
+    # The innermost frame is the op constructor, and the stack includes this
+    # test.
+    _, _, name, line = full_traceback[-1]
+    self.assertEqual("__init__", name)
+    self.assertTrue(line)
+    self.assertIn("testTracebackLimit",
+                  [name for _, _, name, _ in full_traceback])
+
+    g.traceback_limit = 3
+    b = _apply_op(g, "const", [], [dtypes.float32])
+    self.assertEqual([name for _, _, name, _ in full_traceback[-3:]],
+                     [name for _, _, name, _ in b.op.traceback])
+
+    g.traceback_limit = 0
+    c = _apply_op(g, "const", [], [dtypes.float32])
+    self.assertEqual([], c.op.traceback)
+    # Ops created before the limit changed keep their traceback.
+    self.assertEqual(full_traceback, a.op.traceback)
+
+    with self.assertRaises(ValueError):
+      g.traceback_limit = -1
+
+  def testTracebackOfZipImportedModule(self):
+    path = os.path.join(self.get_temp_dir(), "zipped_module.zip")
+    with zipfile.ZipFile(path, "w") as archive:
+      archive.writestr("zipped_module.py",
+                       "def extract(ops):\n"
+                       "  return ops._extract_stack()  # In the zip file.\n")
+    sys.path.insert(0, path)
+    try:
+      import zipped_module  # pylint: disable=g-import-not-at-top
+    finally:
+      sys.path.remove(path)
+    _, _, name, line = ops._convert_stack(zipped_module.extract(ops))[-1]
+    self.assertEqual("extract", name)
+    self.assertEqual("return ops._extract_stack()  # In the zip file.", line)
+
 ops.RegisterShape("KernelLabel")(common_shapes.scalar_shape)
 
 
@@ -1175,6 +1278,61 @@ class AsGraphDefTest(test_util.TensorFlowTestCase):
       }
       """, gd)
 
+  def testSerializedGraphDefMatchesAsGraphDef(self):
+    with ops.Graph().as_default() as g:
+      a = _apply_op(g, "const", [], [dtypes.float32], name="A")
+      b = _apply_op(g, "const", [], [dtypes.float32], name="B")
+      v1 = g.version
+      c = _apply_op(g, "add", [a, b], [dtypes.float32], name="C")
+      v2 = g.version
+      d = _apply_op(g, "mul", [c, a], [dtypes.float32], name="D")
+      v3 = g.version
+
+      for from_version, to_version in [(0, v1), (0, v3), (v1, v2), (v1, v3),
+                                       (v3, v3)]:
+        gd = graph_pb2.GraphDef()
+        gd.ParseFromString(g._as_serialized_graph_def(from_version, to_version))
+        expected = g.as_graph_def(from_version=from_version)
+        del expected.node[len(gd.node):]
+        self.assertProtoEquals(expected, gd)
+
+      # Changes to the device or inputs of an op are reflected after it has
+      # been serialized.
+      d.op._set_device("/cpu:0")
+      d.op._update_input(1, b)
+      gd = graph_pb2.GraphDef()
+      gd.ParseFromString(g._as_serialized_graph_def(v2, v3))
+      self.assertEqual("/cpu:0", gd.node[0].device)
+      self.assertEqual(["C", "B"], list(gd.node[0].input))
+
+
+class ExtendGraphBenchmark(googletest.Benchmark):
+
+  def benchmarkIncrementalSerialization(self):
+    num_nodes = 100000
+    num_extensions = 100
+    with ops.Graph().as_default() as g:
+      for _ in xrange(num_nodes):
+        _apply_op(g, "const", [], [dtypes.float32])
+      for name, serialize_fn in [
+          ("as_graph_def", lambda v: g.as_graph_def(
+              from_version=v).SerializeToString()),
+          ("serialized_graph_def", lambda v: g._as_serialized_graph_def(
+              v, g.version))]:
+        # Serialize the whole graph once, as a session does when it first
+        # runs a step, and then time extensions by a single node.
+        version = g.version
+        serialize_fn(0)
+        start_time = time.time()
+        for _ in xrange(num_extensions):
+          _apply_op(g, "const", [], [dtypes.float32])
+          serialize_fn(version)
+          version = g.version
+        wall_time = (time.time() - start_time) / num_extensions
+        print("%s: %f s/extension with %d nodes" % (name, wall_time, num_nodes))
+        self.report_benchmark(name="extend_%s_%d_nodes" % (name, num_nodes),
+                              iters=num_extensions, wall_time=wall_time)
+
 
 # NOTE(petewarden): Dummy stats registrations for ops used in the tests.
 @ops.RegisterStatistics("a", "weight_parameters")
@@ -24,6 +24,8 @@ from tensorflow.core.framework import tensor_shape_pb2
 class Dimension(object):
   """Represents the value of one dimension in a TensorShape."""
 
+  __slots__ = ["_value"]
+
   def __init__(self, value):
     """Creates a new Dimension with the given value."""
     if value is None:
@@ -400,6 +402,8 @@ class TensorShape(object):
   @@assert_is_fully_defined
   """
 
+  __slots__ = ["_dims"]
+
   def __init__(self, dims):
     """Creates a new TensorShape with the given dimensions.
 
@@ -18,11 +18,15 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import bisect
 import collections
 import contextlib
+import math
 import warnings
+import weakref
 
 import numpy as np
+import six
 from six.moves import xrange  # pylint: disable=redefined-builtin
 
 from tensorflow.python.framework import dtypes
@@ -141,6 +145,146 @@ def _GatherInputs(to_ops, reached_ops):
   return inputs
 
 
+# Maps each Graph to a dict from a tuple of op ids to the _ForwardReachability
+# of those ops.
+_FORWARD_REACHABILITY_CACHE = weakref.WeakKeyDictionary()
+
+# The maximum number of lists of ops whose reachability is cached per graph.
+_MAX_CACHED_REACHABILITIES = 32
+
+
+class _ForwardReachability(object):
+  """The ids of all ops reachable from a list of ops, kept up to date.
+
+  An op is reachable if it is one of the starting ops, or if it consumes an
+  output of a reachable op. The set is computed once, and then extended with
+  the reachable ops among those added to the graph since the last call to
+  `update()`, so that taking gradients repeatedly w.r.t. the same ops does not
+  walk the whole graph each time.
+
+  The set may also contain ops that are no longer reachable, because an op's
+  input was replaced. It never misses a reachable op: if the inputs of an op
+  that was already in the graph are changed, the set is recomputed.
+  """
+
+  def __init__(self):
+    self.reached_ids = set()
+    self._version = 0
+    self._input_update_count = -1
+
+  def update(self, graph, from_ops):
+    """Brings `reached_ids` up to date with `graph`.
+
+    Args:
+      graph: a Graph.
+      from_ops: list of Operations, which must be the ones this reachability
+        was created for.
+    """
+    # pylint: disable=protected-access
+    version = graph.version
+    if graph._input_update_count != self._input_update_count:
+      self.reached_ids = set()
+      _MarkReachedOpIds(from_ops, self.reached_ids)
+    elif version > self._version:
+      reached_ids = self.reached_ids
+      start = bisect.bisect_right(graph._op_ids, self._version)
+      for op_id in graph._op_ids[start:]:
+        if op_id in reached_ids:
+          continue
+        op = graph._nodes_by_id[op_id]
+        if any(inp.op._id in reached_ids for inp in op.inputs):
+          _MarkReachedOpIds([op], reached_ids)
+    self._version = version
+    self._input_update_count = graph._input_update_count
+    # pylint: enable=protected-access
+
+
+def _MarkReachedOpIds(from_ops, reached_ids):
+  """Add the ids of all ops reached from "from_ops" to "reached_ids".
+
+  Args:
+    from_ops: list of Operations.
+    reached_ids: set of operation ids.
+  """
+  queue = collections.deque()
+  queue.extend(from_ops)
+  while queue:
+    op = queue.popleft()
+    if op._id not in reached_ids:
+      reached_ids.add(op._id)
+      for output in op.outputs:
+        queue.extend(output.consumers())
+
+
+def _ForwardReachableOpIds(graph, from_ops):
+  """Returns the set of ids of all ops reachable from "from_ops".
+
+  The result is cached per graph, and must not be modified.
+
+  Args:
+    graph: a Graph.
+    from_ops: list of Operations.
+
+  Returns:
+    A set of operation ids, which may contain ids of ops that are no longer
+    reachable.
+  """
+  key = tuple(sorted(set(op._id for op in from_ops)))
+  reachabilities = _FORWARD_REACHABILITY_CACHE.get(graph)
+  if reachabilities is None:
+    reachabilities = {}
+    _FORWARD_REACHABILITY_CACHE[graph] = reachabilities
+  reachability = reachabilities.get(key)
+  if reachability is None:
+    if len(reachabilities) >= _MAX_CACHED_REACHABILITIES:
+      reachabilities.clear()
+    reachability = _ForwardReachability()
+    reachabilities[key] = reachability
+  reachability.update(graph, from_ops)
+  return reachability.reached_ids
+
+
+def _MarkReachedOpsBetween(graph, to_ops, from_ops, reached_ops):
+  """Mark the ops reached from "from_ops" that may lead to "to_ops".
+
+  Marks the same ops as `_MarkReachedOps(from_ops, reached_ops)` among the
+  inputs of "to_ops", but only visits ops that are both reachable from
+  "from_ops" and inputs of "to_ops", using the cached forward reachability of
+  "from_ops". As in `_MarkReachedOps`, ops already marked in "reached_ops"
+  are not traversed.
+
+  Args:
+    graph: a Graph.
+    to_ops: list of Operations.
+    from_ops: list of Operations.
+    reached_ops: list of booleans, indexed by operation id.
+  """
+  reachable_ids = _ForwardReachableOpIds(graph, from_ops)
+
+  # Find the inputs of to_ops that are reachable from from_ops. Every path
+  # from from_ops to one of to_ops only goes through such ops.
+  candidate_ids = set()
+  queue = collections.deque()
+  queue.extend(to_ops)
+  while queue:
+    op = queue.popleft()
+    if op._id not in candidate_ids:
+      candidate_ids.add(op._id)
+      for inp in op.inputs:
+        if inp.op._id in reachable_ids:
+          queue.append(inp.op)
+
+  queue.extend(from_ops)
+  while queue:
+    op = queue.popleft()
+    if not reached_ops[op._id]:
+      reached_ops[op._id] = True
+      for output in op.outputs:
+        for consumer in output.consumers():
+          if consumer._id in candidate_ids:
+            queue.append(consumer)
+
+
 def _PendingCount(graph, to_ops, from_ops):
   """Initialize the pending count for ops between two lists of Operations.
 
@@ -162,7 +306,7 @@ def _PendingCount(graph, to_ops, from_ops):
   reached_ops = [False] * (graph._last_id + 1)
   for op in to_ops:
     reached_ops[op._id] = True
-  _MarkReachedOps(from_ops, reached_ops)
+  _MarkReachedOpsBetween(graph, to_ops, from_ops, reached_ops)
 
   # Mark between ops.
   between_ops = [False] * (graph._last_id + 1)
@@ -310,7 +454,8 @@ def gradients(ys,
               name="gradients",
               colocate_gradients_with_ops=False,
               gate_gradients=False,
-              aggregation_method=None):
+              aggregation_method=None,
+              checkpoints=None):
   """Constructs symbolic partial derivatives of `ys` w.r.t. x in `xs`.
 
   `ys` and `xs` are each a `Tensor` or a list of tensors.  `grad_ys`
@@ -330,6 +475,14 @@ def gradients(ys,
   one wanted to weight the gradient differently for each value in
   each y).
 
+  By default, every activation computed between `xs` and `ys` is kept in
+  memory until backprop reaches it. When `checkpoints` is set, only the
+  checkpoint tensors are kept: backprop from one checkpoint to the previous
+  ones recomputes the activations in between, which trades compute for
+  memory. `checkpoints` can be a list of tensors, or a `CheckpointSelection`
+  method to choose them automatically. Use `estimate_activation_bytes()` to
+  compare the memory kept with and without checkpoints.
+
   Args:
     ys: A `Tensor` or list of tensors to be differentiated.
     xs: A `Tensor` or list of tensors to be used for differentiation.
@@ -343,6 +496,9 @@ def gradients(ys,
       for an operations.  This avoids some race conditions.
     aggregation_method: Specifies the method used to combine gradient terms.
       Accepted values are constants defined in the class `AggregationMethod`.
+    checkpoints: Optional. A list of tensors between `xs` and `ys` to keep
+      for backprop, or a constant defined in the class `CheckpointSelection`.
+      If None, no activations are recomputed.
 
   Returns:
     A list of `sum(dy/dx)` for each x in `xs`.
@@ -350,7 +506,9 @@ def gradients(ys,
   Raises:
     LookupError: if one of the operations between `x` and `y` does not
       have a registered gradient function.
-    ValueError: if the arguments are invalid.
+    ValueError: if the arguments are invalid, or if `checkpoints` is set and
+      one of the operations between `x` and `y` is in a control flow
+      construct.
 
   """
   ys = _AsList(ys)
@@ -362,6 +520,10 @@ def gradients(ys,
   with ops.op_scope(ys + xs + grad_ys, name, "gradients"):
     ys = ops.convert_n_to_tensor_or_indexed_slices(ys, name="y")
     xs = ops.convert_n_to_tensor_or_indexed_slices(xs, name="x")
+    if checkpoints is not None:
+      return _GradientsWithRecompute(ys, xs, grad_ys, checkpoints,
+                                     colocate_gradients_with_ops,
+                                     gate_gradients, aggregation_method)
     grad_ys = _DefaultGradYs(grad_ys, ys, colocate_gradients_with_ops)
 
     # The approach we take here is as follows: Create a list of all ops in the
@@ -596,6 +758,326 @@ class AggregationMethod(object):
   EXPERIMENTAL_ACCUMULATE_N = 2
 
 
+class CheckpointSelection(object):
+  """A class listing methods to choose the checkpoints of `gradients()`.
+
+  With checkpoints, backprop recomputes the activations between consecutive
+  checkpoints instead of keeping them in memory. This class lists the
+  methods that can be passed as `checkpoints` to choose them automatically:
+
+  *  `SQRT_N`: Keeps about `sqrt(N)` of the `N` activations between `xs` and
+     `ys`, evenly spaced in the order the ops were created. For a chain of
+     ops, this keeps `O(sqrt(N))` activations in memory, at the cost of one
+     extra forward pass.
+  """
+  SQRT_N = "sqrt_n"
+
+
+def _HasRefInputs(op):
+  """Returns True if `op` reads a variable through a reference input."""
+  return any(t.dtype.is_ref_dtype for t in op.inputs)
+
+
+def _IsRecomputable(op):
+  """Returns True if recomputing `op` in backprop gives its forward values.
+
+  Stateful ops could produce different values. So could ops that read a
+  variable, since the copies only wait for the incoming gradients, and an
+  optimizer may already have updated the variable when they run. These are
+  the ops with reference inputs, like the snapshot of a variable, and the
+  ops reading such a snapshot, which may share the memory of the variable.
+  """
+  if op.op_def is not None and op.op_def.is_stateful:
+    return False
+  return not (_HasRefInputs(op) or
+              any(_HasRefInputs(t.op) for t in op.inputs))
+
+
+def _ForwardOps(graph, ys, xs):
+  """Returns the ops between `xs` and `ys`, sorted by id."""
+  to_ops = [t.op for t in ys]
+  from_ops = [t.op for t in xs]
+  # pylint: disable=protected-access
+  reached_ops = [False] * (graph._last_id + 1)
+  for op in to_ops:
+    reached_ops[op._id] = True
+  _MarkReachedOpsBetween(graph, to_ops, from_ops, reached_ops)
+  fwd_ops = _GatherInputs(to_ops, reached_ops)
+  fwd_ops.sort(key=lambda op: op._id)
+  # pylint: enable=protected-access
+  return fwd_ops
+
+
+def _SelectCheckpoints(checkpoints, fwd_ops, ys, xs):
+  """Returns the checkpoints to keep between `xs` and `ys`, sorted by id.
+
+  Args:
+    checkpoints: A list of tensors, or a `CheckpointSelection` method.
+    fwd_ops: The ops between `xs` and `ys`, sorted by id.
+    ys: List of tensors.
+    xs: List of tensors.
+
+  Returns:
+    The list of checkpoint tensors output by ops in `fwd_ops`, excluding
+    `xs`, `ys` and reference tensors.
+
+  Raises:
+    TypeError: If `checkpoints` is not a list of tensors.
+    ValueError: If `checkpoints` is not a known `CheckpointSelection`.
+  """
+  # pylint: disable=protected-access
+  excluded = set(ys) | set(xs)
+  fwd_op_ids = set(op._id for op in fwd_ops)
+  if isinstance(checkpoints, six.string_types):
+    if checkpoints != CheckpointSelection.SQRT_N:
+      raise ValueError("Unknown checkpoint selection method: %s" %
+                       checkpoints)
+    excluded_op_ids = set(t.op._id for t in excluded)
+    candidates = [op.outputs[0] for op in fwd_ops
+                  if len(op.outputs) == 1 and _IsFloat(op.outputs[0])
+                  and not op.outputs[0].dtype.is_ref_dtype
+                  and op._id not in excluded_op_ids and _IsRecomputable(op)]
+    stride = int(math.ceil(math.sqrt(len(candidates)))) if candidates else 1
+    return candidates[stride - 1::stride]
+  selected = []
+  for t in _AsList(checkpoints):
+    if not isinstance(t, ops.Tensor):
+      raise TypeError("checkpoints must be a list of Tensors: %s" % t)
+    if (t.op._id in fwd_op_ids and t not in excluded and
+        not t.dtype.is_ref_dtype and t not in selected):
+      selected.append(t)
+  selected.sort(key=lambda t: (t.op._id, t.value_index))
+  # pylint: enable=protected-access
+  return selected
+
+
+def _RecomputedOps(targets, fwd_op_ids, checkpoints, stop_op_ids):
+  """Returns the ops recomputed to backprop from `targets`, sorted by id.
+
+  These are the ops between `xs` or `checkpoints` and `targets`, stopping at
+  (and excluding) the checkpoints and `xs`. Ops that are not recomputable,
+  such as stateful ops and ops that read variables, are not recomputed:
+  their outputs are kept instead.
+
+  Args:
+    targets: List of tensors.
+    fwd_op_ids: Set of the ids of the ops between `xs` and `ys`.
+    checkpoints: Set of checkpoint tensors.
+    stop_op_ids: Set of the ids of the ops of `xs`.
+
+  Returns:
+    A list of Operations.
+  """
+  # pylint: disable=protected-access
+  recomputed = []
+  visited = set()
+  queue = collections.deque(t.op for t in targets)
+  while queue:
+    op = queue.popleft()
+    if op._id in visited:
+      continue
+    visited.add(op._id)
+    if (not _IsRecomputable(op) or op._id not in fwd_op_ids or
+        op._id in stop_op_ids):
+      continue
+    recomputed.append(op)
+    for inp in op.inputs:
+      if (inp not in checkpoints and inp.op._id in fwd_op_ids and
+          inp.op._id not in stop_op_ids):
+        queue.append(inp.op)
+  recomputed.sort(key=lambda op: op._id)
+  # pylint: enable=protected-access
+  return recomputed
+
+
+def _CopyOps(op_list, replacements, gate_ops):
+  """Adds copies of the ops in `op_list` to the graph.
+
+  Args:
+    op_list: List of Operations, sorted by id.
+    replacements: Dict from tensors to the tensors used instead as inputs of
+      the copies.
+    gate_ops: List of Operations that the copies that do not depend on other
+      copies wait for, so that they are not computed before they are needed.
+
+  Returns:
+    A dict from the outputs of the ops in `op_list` to their copies.
+  """
+  copies = {}
+  copied_ops = {}
+  graph = ops.get_default_graph()
+  with ops.name_scope("recompute"):
+    for op in op_list:
+      inputs = [copies.get(t, replacements.get(t, t)) for t in op.inputs]
+      # pylint: disable=protected-access
+      new_op = graph.create_op(
+          op.type, inputs, [t.dtype for t in op.outputs],
+          input_types=list(op._input_types), name=op.name,
+          attrs=dict(op.node_def.attr), op_def=op.op_def)
+      new_op._set_device(op.device)
+      control_inputs = [copied_ops.get(c, c) for c in op.control_inputs]
+      if not any(t in copies for t in op.inputs) and not any(
+          c in copied_ops for c in op.control_inputs):
+        control_inputs.extend(gate_ops)
+      for control_input in control_inputs:
+        new_op._add_control_input(control_input)
+      # pylint: enable=protected-access
+      for t, new_t in zip(op.outputs, new_op.outputs):
+        new_t.set_shape(t.get_shape())
+        copies[t] = new_t
+      copied_ops[op] = new_op
+  return copies
+
+
+def _SumGrads(grads):
+  """Returns the sum of a list of gradients, or None if there are none."""
+  grads = [g for g in grads if g is not None]
+  if not grads:
+    return None
+  if len(grads) == 1:
+    return grads[0]
+  if all(isinstance(g, ops.IndexedSlices) for g in grads):
+    return ops.IndexedSlices(
+        array_ops.concat(0, [g.values for g in grads]),
+        array_ops.concat(0, [g.indices for g in grads]),
+        grads[0].dense_shape)
+  return math_ops.add_n([ops.convert_to_tensor(g) for g in grads])
+
+
+def _TensorBytes(tensor):
+  """Returns the size of `tensor` in bytes, or 0 if its shape is unknown."""
+  shape = tensor.get_shape()
+  if not shape.is_fully_defined() or tensor.dtype.is_ref_dtype:
+    return 0
+  return shape.num_elements() * tensor.dtype.size
+
+
+def _ActivationBytes(fwd_ops, ys, xs, checkpoints):
+  """Implements `estimate_activation_bytes()` on converted arguments."""
+  # pylint: disable=protected-access
+  stop_op_ids = set(t.op._id for t in xs)
+  all_bytes = sum(_TensorBytes(t) for op in fwd_ops
+                  if op._id not in stop_op_ids for t in op.outputs)
+  if checkpoints is None:
+    return all_bytes, all_bytes
+  fwd_op_ids = set(op._id for op in fwd_ops)
+  checkpoint_set = set(checkpoints)
+  segment_bytes = 0
+  for targets in [ys] + [[c] for c in checkpoints]:
+    recomputed = _RecomputedOps(targets, fwd_op_ids, checkpoint_set,
+                                stop_op_ids)
+    segment_bytes = max(segment_bytes, sum(_TensorBytes(t)
+                                           for op in recomputed
+                                           for t in op.outputs))
+  # pylint: enable=protected-access
+  checkpoint_bytes = sum(_TensorBytes(t) for t in checkpoints)
+  return all_bytes, checkpoint_bytes + segment_bytes
+
+
+def estimate_activation_bytes(ys, xs, checkpoints=None):
+  """Estimates the bytes of activations `gradients()` keeps for backprop.
+
+  Without checkpoints, every output of the ops between `xs` and `ys` is kept
+  until backprop reaches it. With checkpoints, only the checkpoints are kept,
+  plus the activations recomputed between two checkpoints at any one time.
+  Tensors whose shape is not fully defined are not counted.
+
+  Args:
+    ys: A `Tensor` or list of tensors to be differentiated.
+    xs: A `Tensor` or list of tensors to be used for differentiation.
+    checkpoints: Optional. The `checkpoints` argument of `gradients()`.
+
+  Returns:
+    A pair of the estimated peak bytes of activations without checkpoints,
+    and with `checkpoints`.
+  """
+  ys = ops.convert_n_to_tensor_or_indexed_slices(_AsList(ys))
+  xs = ops.convert_n_to_tensor_or_indexed_slices(_AsList(xs))
+  fwd_ops = _ForwardOps(ops.get_default_graph(), ys, xs)
+  if checkpoints is not None:
+    checkpoints = _SelectCheckpoints(checkpoints, fwd_ops, ys, xs)
+  return _ActivationBytes(fwd_ops, ys, xs, checkpoints)
+
+
+def _GradientsWithRecompute(ys, xs, grad_ys, checkpoints,
+                            colocate_gradients_with_ops, gate_gradients,
+                            aggregation_method):
+  """Implements `gradients()` when `checkpoints` is set.
+
+  Backprop is split into segments: from `ys` to the checkpoints, and then
+  from each checkpoint, in reverse order, to the previous checkpoints and
+  `xs`. Each segment copies the forward ops it needs, reading the kept
+  checkpoints through `stop_gradient()`, and computes the gradients of the
+  copies. The copies wait for the gradients flowing into the segment, so
+  that they are only computed when backprop reaches them.
+
+  Args:
+    ys: List of tensors.
+    xs: List of tensors.
+    grad_ys: List of tensors or None, one for each of `ys`.
+    checkpoints: A list of tensors, or a `CheckpointSelection` method.
+    colocate_gradients_with_ops: See `gradients()`.
+    gate_gradients: See `gradients()`.
+    aggregation_method: See `gradients()`.
+
+  Returns:
+    A list of `sum(dy/dx)` for each x in `xs`.
+
+  Raises:
+    ValueError: If one of the operations between `xs` and `ys` is in a
+      control flow construct.
+  """
+  # pylint: disable=protected-access
+  fwd_ops = _ForwardOps(ops.get_default_graph(), ys, xs)
+  for op in fwd_ops:
+    if op._get_control_flow_context() is not None:
+      raise ValueError("Cannot recompute operation '%s' for gradients: ops "
+                       "in control flow constructs are not supported." %
+                       op.name)
+  checkpoints = _SelectCheckpoints(checkpoints, fwd_ops, ys, xs)
+  all_bytes, kept_bytes = _ActivationBytes(fwd_ops, ys, xs, checkpoints)
+  logging.info("Recomputing gradients with %d checkpoints: estimated peak "
+               "activation bytes %d -> %d", len(checkpoints), all_bytes,
+               kept_bytes)
+
+  fwd_op_ids = set(op._id for op in fwd_ops)
+  stop_op_ids = set(t.op._id for t in xs)
+  # pylint: enable=protected-access
+  checkpoint_set = set(checkpoints)
+  stopped = [array_ops.stop_gradient(c) for c in checkpoints]
+  replacements = dict(zip(checkpoints, stopped))
+  x_grads = [[] for _ in xs]
+  checkpoint_grads = dict((c, []) for c in checkpoints)
+
+  def _Backprop(targets, target_grads, name):
+    """Accumulates the gradients of `targets` into x_grads, checkpoint_grads."""
+    gate_ops = []
+    for g in target_grads:
+      if isinstance(g, ops.IndexedSlices):
+        gate_ops.append(g.values.op)
+      elif g is not None:
+        gate_ops.append(g.op)
+    recomputed = _RecomputedOps(targets, fwd_op_ids, checkpoint_set,
+                                stop_op_ids)
+    copies = _CopyOps(recomputed, replacements, gate_ops)
+    grads = gradients([copies.get(t, t) for t in targets], xs + stopped,
+                      grad_ys=target_grads, name=name,
+                      colocate_gradients_with_ops=colocate_gradients_with_ops,
+                      gate_gradients=gate_gradients,
+                      aggregation_method=aggregation_method)
+    for i, g in enumerate(grads[:len(xs)]):
+      x_grads[i].append(g)
+    for c, g in zip(checkpoints, grads[len(xs):]):
+      checkpoint_grads[c].append(g)
+
+  _Backprop(ys, grad_ys, "segment")
+  for c in reversed(checkpoints):
+    grad = _SumGrads(checkpoint_grads.pop(c))
+    if grad is not None:
+      _Backprop([c], [grad], "segment")
+  return [_SumGrads(g) for g in x_grads]
+
+
 def _AggregatedGrads(grads, op, loop_state, aggregation_method=None):
   """Get the aggregated gradients for op.
 
@@ -21,6 +21,7 @@ from __future__ import print_function
 import warnings
 
 import numpy as np
+from six.moves import xrange  # pylint: disable=redefined-builtin
 import tensorflow as tf
 
 from tensorflow.python.framework import dtypes
@@ -131,6 +132,38 @@ class GradientsTest(test_util.TensorFlowTestCase):
     self._assertOpListEqual([t6.op, t5.op, t4.op, t3.op, t2.op],
                             _OpsBetween(g, [t6.op], [t2.op, t5.op]))
 
+  def _CachedOpsBetween(self, graph, to_ops, from_ops):
+    reached_ops = [False] * (graph._last_id + 1)
+    for op in to_ops:
+      reached_ops[op._id] = True
+    gradients._MarkReachedOpsBetween(graph, to_ops, from_ops, reached_ops)
+    between_ops = gradients._GatherInputs(to_ops, reached_ops)
+    between_ops.sort(key=lambda x: -x._id)
+    return between_ops
+
+  def testCachedOpsBetween(self):
+    with ops.Graph().as_default() as g:
+      t1 = constant(1.0)
+      t2 = constant(2.0)
+      t3 = array_ops.pack([t1, t2])
+      t4 = array_ops.concat(0, [t3, t3])
+      self._assertOpListEqual(_OpsBetween(g, [t4.op], [t1.op]),
+                              self._CachedOpsBetween(g, [t4.op], [t1.op]))
+      # New ops that consume reachable ops are picked up by the cache.
+      t5 = constant([3.0])
+      t6 = array_ops.concat(0, [t4, t5])
+      t7 = array_ops.concat(0, [t5, t5])
+      for to_ops, from_ops in [([t6.op], [t1.op]),
+                               ([t7.op], [t1.op]),
+                               ([t6.op], [t3.op]),
+                               ([t6.op, t7.op], [t1.op, t5.op])]:
+        self._assertOpListEqual(_OpsBetween(g, to_ops, from_ops),
+                                self._CachedOpsBetween(g, to_ops, from_ops))
+      # Rewiring an existing op invalidates the cache.
+      t7.op._update_input(1, t6)
+      self._assertOpListEqual(_OpsBetween(g, [t7.op], [t1.op]),
+                              self._CachedOpsBetween(g, [t7.op], [t1.op]))
+
   def testGradients(self):
     with ops.Graph().as_default():
       inp = constant(1.0, shape=[32, 100], name="in")
@@ -307,6 +340,109 @@ class StopGradientTest(test_util.TensorFlowTestCase):
     assert igrad is None
 
 
+class RecomputeGradientsTest(test_util.TensorFlowTestCase):
+
+  def _BuildChain(self, num_layers):
+    rng = np.random.RandomState([1, 2, 3])
+    x = constant_op.constant(rng.randn(8, 4).astype("float32"), name="x")
+    w = constant_op.constant(rng.randn(4, 4).astype("float32"), name="w")
+    layers = []
+    h = x
+    for _ in xrange(num_layers):
+      h = math_ops.tanh(math_ops.matmul(h, w))
+      layers.append(h)
+    y = math_ops.reduce_sum(h * h)
+    return x, w, layers, y
+
+  def testCheckpointsMatchGradients(self):
+    with self.test_session():
+      x, w, layers, y = self._BuildChain(9)
+      expected = [g.eval() for g in gradients.gradients(y, [x, w])]
+      for checkpoints in [[layers[2], layers[5]],
+                          gradients.CheckpointSelection.SQRT_N,
+                          []]:
+        actual = gradients.gradients(y, [x, w], checkpoints=checkpoints)
+        for e, a in zip(expected, actual):
+          self.assertAllClose(e, a.eval())
+
+  def testCheckpointsWithGradYs(self):
+    with self.test_session():
+      x, w, layers, _ = self._BuildChain(4)
+      grad_y = constant_op.constant(2.0, shape=[8, 4])
+      expected = gradients.gradients(layers[-1], w, grad_ys=grad_y)[0]
+      actual = gradients.gradients(layers[-1], w, grad_ys=grad_y,
+                                   checkpoints=[layers[1]])[0]
+      self.assertAllClose(expected.eval(), actual.eval())
+
+  def testRecomputedOpsWaitForGradients(self):
+    with ops.Graph().as_default() as g:
+      x, w, layers, y = self._BuildChain(4)
+      grad_y = constant_op.constant(1.0)
+      num_ops = len(g.get_operations())
+      gradients.gradients(y, [x, w], grad_ys=grad_y, checkpoints=[layers[1]])
+      copies = [op for op in g.get_operations()[num_ops:]
+                if "/recompute/" in op.name]
+      self.assertTrue(copies)
+      # The first recomputed op of each segment reads only kept tensors, and
+      # waits for the gradients flowing into the segment.
+      for op in copies:
+        if not any("/recompute/" in t.op.name for t in op.inputs):
+          self.assertTrue(op.control_inputs)
+
+  def testVariableReadsAreNotRecomputed(self):
+    rng = np.random.RandomState([1, 2, 3])
+    x_value = rng.randn(8, 4).astype("float32")
+    w_values = [rng.randn(4, 4).astype("float32") for _ in xrange(4)]
+    results = []
+    for checkpoints in [None, gradients.CheckpointSelection.SQRT_N]:
+      with self.test_session(graph=ops.Graph()) as sess:
+        h = constant_op.constant(x_value)
+        ws = [tf.Variable(w_value) for w_value in w_values]
+        for w in ws:
+          h = math_ops.tanh(math_ops.matmul(h, w))
+        loss = math_ops.reduce_sum(h * h)
+        num_ops = len(sess.graph.get_operations())
+        train_op = tf.train.GradientDescentOptimizer(0.1).minimize(
+            loss, gate_gradients=tf.train.Optimizer.GATE_NONE,
+            checkpoints=checkpoints)
+        copies = [op for op in sess.graph.get_operations()[num_ops:]
+                  if "/recompute/" in op.name]
+        self.assertEqual(checkpoints is not None, bool(copies))
+        # The copies neither read a variable nor its snapshot, which the
+        # updates may already have changed.
+        for op in copies:
+          for t in op.inputs:
+            self.assertFalse(t.dtype.is_ref_dtype)
+            self.assertFalse(any(u.dtype.is_ref_dtype for u in t.op.inputs))
+        tf.initialize_all_variables().run()
+        train_op.run()
+        results.append([w.eval() for w in ws])
+    for expected, actual in zip(*results):
+      self.assertAllClose(expected, actual)
+
+  def testInvalidCheckpoints(self):
+    with ops.Graph().as_default():
+      x, w, _, y = self._BuildChain(2)
+      with self.assertRaisesRegexp(ValueError, "Unknown checkpoint"):
+        gradients.gradients(y, [x, w], checkpoints="all")
+      with self.assertRaisesRegexp(TypeError, "list of Tensors"):
+        gradients.gradients(y, [x, w], checkpoints=[1.0])
+
+  def testEstimateActivationBytes(self):
+    with ops.Graph().as_default():
+      x, _, layers, y = self._BuildChain(16)
+      all_bytes, same_bytes = gradients.estimate_activation_bytes(y, x)
+      self.assertEqual(all_bytes, same_bytes)
+      # Each layer has a MatMul and a Tanh output of 8 * 4 floats.
+      self.assertGreaterEqual(all_bytes, 16 * 2 * 8 * 4 * 4)
+      _, kept_bytes = gradients.estimate_activation_bytes(
+          y, x, checkpoints=gradients.CheckpointSelection.SQRT_N)
+      self.assertLess(kept_bytes, all_bytes)
+      _, kept_bytes = gradients.estimate_activation_bytes(
+          y, x, checkpoints=layers)
+      self.assertLess(kept_bytes, all_bytes)
+
+
 class HessianVectorProductTest(test_util.TensorFlowTestCase):
 
   def testHessianVectorProduct(self):
@@ -18,7 +18,12 @@ from __future__ import division
 from __future__ import print_function
 
 import collections
+import functools
+import re
 import threading
+import time
+
+import numpy as np
 
 from tensorflow.core.framework import graph_pb2
 from tensorflow.core.util.event_pb2 import SessionLog
@@ -26,13 +31,18 @@ from tensorflow.python.platform import gfile
 from tensorflow.python.platform import logging
 from tensorflow.python.summary.impl import directory_watcher
 from tensorflow.python.summary.impl import event_file_loader
+from tensorflow.python.summary.impl import event_parser
 from tensorflow.python.summary.impl import gcs
 from tensorflow.python.summary.impl import gcs_file_loader
 from tensorflow.python.summary.impl import reservoir
+from tensorflow.python.summary.impl import state_cache
 
 namedtuple = collections.namedtuple
 ScalarEvent = namedtuple('ScalarEvent', ['wall_time', 'step', 'value'])
 
+## The dtypes of the wall_time, step and value of scalars stored in columns.
+SCALAR_COLUMN_DTYPES = (np.float64, np.int64, np.float32)
+
 CompressedHistogramEvent = namedtuple('CompressedHistogramEvent',
                                       ['wall_time', 'step',
                                        'compressed_histogram_values'])
@@ -47,10 +57,14 @@ HistogramValue = namedtuple('HistogramValue',
                             ['min', 'max', 'num', 'sum', 'sum_squares',
                              'bucket_limit', 'bucket'])
 
+## The `encoded_image_string` of the `ImageEvent`s of accumulators created
+## with `lazy_images` is an `ImageLocation`. See `EventAccumulator.EncodedImage`.
 ImageEvent = namedtuple('ImageEvent',
                         ['wall_time', 'step', 'encoded_image_string', 'width',
                          'height'])
 
+ImageLocation = event_parser.ImageLocation
+
 ## Different types of summary events handled by the event_accumulator
 SUMMARY_TYPES = ('_scalars', '_histograms', '_compressed_histograms', '_images')
 
@@ -81,6 +95,9 @@ STORE_EVERYTHING_SIZE_GUIDANCE = {
     HISTOGRAMS: 0,
 }
 
+## The minimum number of seconds between two saves of `Reload` to the cache.
+_CACHE_SAVE_INTERVAL_SECS = 60
+
 
 def IsTensorFlowEventsFile(path):
   """Check the path name to see if it is probably a TF Events file."""
@@ -123,7 +140,13 @@ class EventAccumulator(object):
                path,
                size_guidance=DEFAULT_SIZE_GUIDANCE,
                compression_bps=NORMAL_HISTOGRAM_BPS,
-               purge_orphaned_data=True):
+               purge_orphaned_data=True,
+               columnar_scalars=False,
+               directory_monitor=None,
+               cache_path=None,
+               gcs_client=None,
+               tag_filter=None,
+               lazy_images=False):
     """Construct the `EventAccumulator`.
 
     Args:
@@ -140,6 +163,30 @@ class EventAccumulator(object):
         `ProcessCompressedHistogram`).
       purge_orphaned_data: Whether to discard any events that were "orphaned" by
         a TensorFlow restart.
+      columnar_scalars: Whether to store the wall times, steps and values of
+        scalars in NumPy arrays, rather than as one `ScalarEvent` per value.
+        This uses much less memory for long runs, and makes `ScalarColumns`
+        cheap. `Scalars` returns the same events either way.
+      directory_monitor: An optional directory monitor (see
+        `directory_monitor.NewDirectoryMonitor`). If `path` is a local
+        directory, `Reload` uses it to only list the directory and read its
+        files after they change.
+      cache_path: An optional local file to save the accumulated data to, with
+        the position in the event files that it was loaded up to. `Reload`
+        saves it when it loaded new events, at most once a minute, and
+        `SaveCache` saves any remaining events. If it holds data saved with
+        the same arguments, the first `Reload` restores that data and resumes
+        loading at the saved position, unless the event file at that position
+        was truncated or rewritten since. Not supported for GCS paths.
+      gcs_client: An optional `gcs_client.GCSClient` to read event files on
+        GCS with. If None, they are read with gsutil.
+      tag_filter: An optional dict from `tagType`s to regular expressions.
+        If given, only the data of those tag types whose tags match (see
+        `re.search`) their expression is loaded, and only if `GRAPH` is a key
+        is the graph loaded. The summary values and graphs of the event files
+        that are not loaded are skipped without being parsed.
+      lazy_images: Whether to only keep the locations of images in the event
+        files, rather than the encoded images. `EncodedImage` reads them.
     """
     sizes = {}
     for key in DEFAULT_SIZE_GUIDANCE:
@@ -148,15 +195,36 @@ class EventAccumulator(object):
       else:
         sizes[key] = DEFAULT_SIZE_GUIDANCE[key]
 
-    self._scalars = reservoir.Reservoir(size=sizes[SCALARS])
+    if columnar_scalars:
+      self._scalars = reservoir.ColumnarReservoir(
+          size=sizes[SCALARS], item_type=ScalarEvent,
+          column_dtypes=SCALAR_COLUMN_DTYPES)
+    else:
+      self._scalars = reservoir.Reservoir(size=sizes[SCALARS])
     self._graph = None
     self._histograms = reservoir.Reservoir(size=sizes[HISTOGRAMS])
     self._compressed_histograms = reservoir.Reservoir(
         size=sizes[COMPRESSED_HISTOGRAMS])
     self._images = reservoir.Reservoir(size=sizes[IMAGES])
 
+    if tag_filter is None:
+      self._tag_filter = None
+    else:
+      self._tag_filter = {tag_type: re.compile(regex)
+                          for tag_type, regex in tag_filter.items()}
+    self._event_parser = None
+    if tag_filter is not None or lazy_images:
+      self._event_parser = event_parser.EventParser(
+          self._WantsValue, wants_graph=self._Wants(GRAPH),
+          lazy_images=lazy_images)
+    self._parse_fn = self._event_parser and self._event_parser.Parse
+
     self._generator_mutex = threading.Lock()
-    self._generator = _GeneratorFromPath(path)
+    self._generator = _GeneratorFromPath(path, directory_monitor, gcs_client,
+                                         parse_fn=self._parse_fn)
+    self._path = path
+    self._directory_monitor = directory_monitor
+    self._gcs_client = gcs_client
 
     self._compression_bps = compression_bps
     self.purge_orphaned_data = purge_orphaned_data
@@ -165,6 +233,36 @@ class EventAccumulator(object):
     self.most_recent_step = -1
     self.most_recent_wall_time = -1
     self.file_version = None
+    # _generation counts the changes to the accumulated data, and
+    # _tag_generations maps each tag to the value of _generation after the
+    # last change to its data. See `Generation`.
+    self._generation = 0
+    self._tag_generations = {}
+    # The number of events loaded by all calls to `Reload`. It is incremented
+    # after each event is processed, so data read after reading it includes
+    # at least that many events.
+    self.num_loaded_events = 0
+
+    if cache_path and gcs.IsGCSPath(path):
+      logging.warn('Not caching the data of %s, since it is on GCS.', path)
+      cache_path = None
+    self._cache_path = cache_path
+    # The arguments that data saved to the cache must have been loaded with.
+    self._cache_key = {'path': path,
+                       'sizes': sizes,
+                       'compression_bps': tuple(compression_bps),
+                       'purge_orphaned_data': purge_orphaned_data,
+                       'columnar_scalars': columnar_scalars,
+                       'tag_filter': tag_filter,
+                       'lazy_images': lazy_images}
+    self._cache_restored = False
+    # Serializes the writes to the cache, which happen outside of
+    # _generator_mutex.
+    self._cache_mutex = threading.Lock()
+    # The value of num_loaded_events when the cache was last saved, and the
+    # time at which `Reload` last collected the data to save.
+    self._cached_num_loaded_events = 0
+    self._cache_save_time = 0
 
   def Reload(self):
     """Loads all events added since the last call to `Reload`.
@@ -176,8 +274,15 @@ class EventAccumulator(object):
       The `EventAccumulator`.
     """
     self._activated = True
+    cache_state = None
     with self._generator_mutex:
+      if self._cache_path and not self._cache_restored:
+        self._cache_restored = True
+        self._RestoreFromCache()
       for event in self._generator.Load():
+        image_locations = {}
+        if self._event_parser is not None:
+          event, image_locations = event
         if event.HasField('file_version'):
           new_file_version = _ParseFileVersion(event.file_version)
           if self.file_version and self.file_version != new_file_version:
@@ -192,25 +297,56 @@ class EventAccumulator(object):
 
         ## Process the event
         if event.HasField('graph_def'):
-          if self._graph is not None:
-            logging.warn(('Found more than one graph event per run.'
-                          'Overwritting the graph with the newest event.'))
-          self._graph = event.graph_def
+          if self._Wants(GRAPH):
+            if self._graph is not None:
+              logging.warn(('Found more than one graph event per run.'
+                            'Overwritting the graph with the newest event.'))
+            self._graph = event.graph_def
+            self._generation += 1
         elif event.HasField('summary'):
-          for value in event.summary.value:
+          for index, value in enumerate(event.summary.value):
             if value.HasField('simple_value'):
-              self._ProcessScalar(value.tag, event.wall_time, event.step,
-                                  value.simple_value)
+              if self._Wants(SCALARS, value.tag):
+                self._ProcessScalar(value.tag, event.wall_time, event.step,
+                                    value.simple_value)
             elif value.HasField('histo'):
-              self._ProcessHistogram(value.tag, event.wall_time, event.step,
-                                     value.histo)
-              self._ProcessCompressedHistogram(value.tag, event.wall_time,
-                                               event.step, value.histo)
+              if self._Wants(HISTOGRAMS, value.tag):
+                self._ProcessHistogram(value.tag, event.wall_time, event.step,
+                                       value.histo)
+              if self._Wants(COMPRESSED_HISTOGRAMS, value.tag):
+                self._ProcessCompressedHistogram(value.tag, event.wall_time,
+                                                 event.step, value.histo)
             elif value.HasField('image'):
-              self._ProcessImage(value.tag, event.wall_time, event.step,
-                                 value.image)
+              if self._Wants(IMAGES, value.tag):
+                self._ProcessImage(value.tag, event.wall_time, event.step,
+                                   value.image, image_locations.get(index))
+        self.num_loaded_events += 1
+      if (self._cache_path and
+          self.num_loaded_events != self._cached_num_loaded_events and
+          time.time() - self._cache_save_time >= _CACHE_SAVE_INTERVAL_SECS):
+        self._cache_save_time = time.time()
+        cache_state = self._CacheState()
+    # Pickling and compressing the data takes a while, so it happens without
+    # blocking the next `Reload`.
+    if cache_state is not None:
+      self._SaveToCache(cache_state)
     return self
 
+  def SaveCache(self):
+    """Saves the accumulated data to the cache, if `Reload` did not yet.
+
+    `Reload` saves new events at most once a minute, so this should be called
+    before exiting. Does nothing if the accumulator has no `cache_path`.
+    """
+    if not self._cache_path:
+      return
+    with self._generator_mutex:
+      if self.num_loaded_events == self._cached_num_loaded_events:
+        return
+      cache_state = self._CacheState()
+    if cache_state is not None:
+      self._SaveToCache(cache_state)
+
   def Tags(self):
     """Return all tags found in the value stream.
 
@@ -243,6 +379,54 @@ class EventAccumulator(object):
     self._VerifyActivated()
     return self._scalars.Items(tag)
 
+  def ScalarColumns(self, tag, sample=None):
+    """Given a summary tag, return its scalars as arrays.
+
+    Args:
+      tag: A string tag associated with the events.
+      sample: If not None, a function that takes the number of scalars of the
+        tag and returns the indices of the ones to return, e.g. to sample them.
+
+    Raises:
+      KeyError: If the tag is not found.
+      RuntimeError: If the `EventAccumulator` has not been activated.
+
+    Returns:
+      A tuple `(wall_times, steps, values)` of 1-D arrays with the fields of
+      the events that `Scalars(tag)` returns, with the dtypes in
+      `SCALAR_COLUMN_DTYPES`.
+    """
+    self._VerifyActivated()
+    if isinstance(self._scalars, reservoir.ColumnarReservoir):
+      columns = self._scalars.Columns(tag)
+      if sample is not None:
+        indices = sample(len(columns[0]))
+        columns = tuple(column[indices] for column in columns)
+      return columns
+    events = self._scalars.Items(tag)
+    if sample is not None:
+      # Only the sampled events are converted.
+      events = [events[i] for i in sample(len(events))]
+    return tuple(np.array([event[i] for event in events], dtype=dtype)
+                 for i, dtype in enumerate(SCALAR_COLUMN_DTYPES))
+
+  def Generation(self, tag=None):
+    """Returns a number that increases whenever the data of a tag changes.
+
+    Data derived from the accumulator while `Generation(tag)` returned some
+    number is still up to date as long as it returns the same number.
+
+    Args:
+      tag: A string tag. If None, the number increases whenever any data of
+        the accumulator changes, including the graph.
+
+    Returns:
+      A nonnegative integer. It is 0 for tags that have no data.
+    """
+    if tag is None:
+      return self._generation
+    return self._tag_generations.get(tag, 0)
+
   def Graph(self):
     """Return the graph definition, if there is one.
 
@@ -303,11 +487,120 @@ class EventAccumulator(object):
       RuntimeError: If the `EventAccumulator` has not been activated.
 
     Returns:
-      An array of `ImageEvent`s.
+      An array of `ImageEvent`s. If the accumulator was created with
+      `lazy_images`, pass them to `EncodedImage` to get their images.
     """
     self._VerifyActivated()
     return self._images.Items(tag)
 
+  def EncodedImage(self, image_event):
+    """Returns the encoded image of an `ImageEvent` returned by `Images`.
+
+    Reads the image from its event file if only its location was kept.
+
+    Args:
+      image_event: An `ImageEvent`.
+
+    Raises:
+      IOError: If the image cannot be read from its event file.
+
+    Returns:
+      The encoded image string.
+    """
+    location = image_event.encoded_image_string
+    if not isinstance(location, ImageLocation):
+      return location
+    if gcs.IsGCSPath(location.path):
+      if self._gcs_client is None:
+        read_contents = gcs.ReadContents
+      else:
+        read_contents = self._gcs_client.ReadContents
+      data = read_contents(location.path, location.offset, location.length)
+    else:
+      with gfile.GFile(location.path, 'rb') as f:
+        f.seek(location.offset)
+        data = f.read(location.length)
+    if len(data) != location.length:
+      raise IOError('The image at offset %d of %s was truncated' %
+                    (location.offset, location.path))
+    return data
+
+  def _CacheState(self):
+    """Returns the accumulated data and the loading position to save.
+
+    Must be called with `_generator_mutex` held. Returns None if the position
+    is unknown.
+    """
+    position = self._generator.Position()
+    if position is None:
+      return None
+    return {
+        'key': self._cache_key,
+        'position': position,
+        'reservoirs': {name: getattr(self, name).GetState()
+                       for name in SUMMARY_TYPES},
+        'graph': self._graph,
+        'file_version': self.file_version,
+        'most_recent_step': self.most_recent_step,
+        'most_recent_wall_time': self.most_recent_wall_time,
+        'num_loaded_events': self.num_loaded_events,
+    }
+
+  def _SaveToCache(self, state):
+    """Saves a state returned by `_CacheState` to the cache.
+
+    Does nothing if a state with at least as many events was already saved.
+    """
+    with self._cache_mutex:
+      if state['num_loaded_events'] <= self._cached_num_loaded_events:
+        return
+      event_file_path, offset = state['position']
+      fingerprint = state_cache.Fingerprint(event_file_path, offset)
+      if fingerprint is None:
+        return
+      state['position'] = (event_file_path, offset, fingerprint)
+      try:
+        state_cache.Save(self._cache_path, state)
+      except (IOError, OSError) as e:
+        logging.warn('Could not save the data of %s to %s: %s', self._path,
+                     self._cache_path, e)
+        return
+      self._cached_num_loaded_events = state['num_loaded_events']
+
+  def _RestoreFromCache(self):
+    """Restores the data saved to the cache, if it is still valid."""
+    state = state_cache.Load(self._cache_path)
+    if state is None:
+      return
+    if state['key'] != self._cache_key:
+      logging.info('Not restoring the data of %s from %s, since it was loaded '
+                   'with different arguments.', self._path, self._cache_path)
+      return
+    event_file_path, offset, fingerprint = state['position']
+    if state_cache.Fingerprint(event_file_path, offset) != fingerprint:
+      logging.warn('Not restoring the data of %s from %s, since %s was '
+                   'truncated or rewritten.', self._path, self._cache_path,
+                   event_file_path)
+      return
+    self._generator = _GeneratorFromPath(self._path, self._directory_monitor,
+                                         position=(event_file_path, offset),
+                                         parse_fn=self._parse_fn)
+    for name in SUMMARY_TYPES:
+      getattr(self, name).SetState(state['reservoirs'][name])
+    self._graph = state['graph']
+    self.file_version = state['file_version']
+    self.most_recent_step = state['most_recent_step']
+    self.most_recent_wall_time = state['most_recent_wall_time']
+    self.num_loaded_events = state['num_loaded_events']
+    self._cached_num_loaded_events = self.num_loaded_events
+    self._generation += 1
+    for name in SUMMARY_TYPES:
+      for tag in getattr(self, name).Keys():
+        self._DataChanged(tag)
+    logging.info('Restored %d events of %s from %s; resuming at offset %d of '
+                 '%s.', self.num_loaded_events, self._path, self._cache_path,
+                 offset, event_file_path)
+
   def _MaybePurgeOrphanedData(self, event):
     """Maybe purge orphaned data due to a TensorFlow crash.
 
@@ -427,23 +720,13 @@ class EventAccumulator(object):
       histo: proto2 histogram Object
     """
 
-    def _CumulativeSum(arr):
-      return [sum(arr[:i + 1]) for i in range(len(arr))]
-
     # Convert from proto repeated field into a Python list.
     bucket = list(histo.bucket)
     bucket_limit = list(histo.bucket_limit)
 
-    bucket_total = sum(bucket)
-    if bucket_total == 0:
-      bucket_total = 1
-    fraction_weights = [10000 * x / bucket_total for x in bucket]
-    cumsum_weights = _CumulativeSum(fraction_weights)
-
-    percentiles = [
-        self._Percentile(bps, bucket_limit, cumsum_weights, histo.min,
-                         histo.max, histo.num) for bps in self._compression_bps
-    ]
+    percentiles = _CompressedPercentiles(self._compression_bps, bucket_limit,
+                                         bucket, histo.min, histo.max,
+                                         histo.num)
 
     compressed_histogram_values = [CompressedHistogramValue(
         basis_point=bps,
@@ -454,6 +737,7 @@ class EventAccumulator(object):
         compressed_histogram_values=compressed_histogram_values)
 
     self._compressed_histograms.AddItem(tag, histogram_event)
+    self._DataChanged(tag)
 
   def _ProcessHistogram(self, tag, wall_time, step, histo):
     """Processes a histogram by adding it to accumulated state."""
@@ -469,20 +753,57 @@ class EventAccumulator(object):
                                      step=step,
                                      histogram_value=histogram_value,)
     self._histograms.AddItem(tag, histogram_event)
+    self._DataChanged(tag)
 
-  def _ProcessImage(self, tag, wall_time, step, image):
-    """Processes an image by adding it to accumulated state."""
+  def _ProcessImage(self, tag, wall_time, step, image, location=None):
+    """Processes an image by adding it to accumulated state.
+
+    Args:
+      tag: A string name of the tag of the image.
+      wall_time: Time in seconds since epoch
+      step: Number of steps that have passed
+      image: proto2 image Object
+      location: The `ImageLocation` of the encoded image, if it was left out
+        of `image`.
+    """
     event = ImageEvent(wall_time=wall_time,
                        step=step,
-                       encoded_image_string=image.encoded_image_string,
+                       encoded_image_string=(location or
+                                             image.encoded_image_string),
                        width=image.width,
                        height=image.height)
     self._images.AddItem(tag, event)
+    self._DataChanged(tag)
 
   def _ProcessScalar(self, tag, wall_time, step, scalar):
     """Processes a simple value by adding it to accumulated state."""
     sv = ScalarEvent(wall_time=wall_time, step=step, value=scalar)
     self._scalars.AddItem(tag, sv)
+    self._DataChanged(tag)
+
+  def _Wants(self, tag_type, tag=None):
+    """Returns whether to load the data of a tag, according to tag_filter."""
+    if self._tag_filter is None:
+      return True
+    if tag_type not in self._tag_filter:
+      return False
+    return tag is None or bool(self._tag_filter[tag_type].search(tag))
+
+  def _WantsValue(self, kind, tag):
+    """Returns whether to parse a summary value, for the event parser."""
+    if kind == event_parser.SCALAR:
+      return self._Wants(SCALARS, tag)
+    elif kind == event_parser.HISTOGRAM:
+      return (self._Wants(HISTOGRAMS, tag) or
+              self._Wants(COMPRESSED_HISTOGRAMS, tag))
+    elif kind == event_parser.IMAGE:
+      return self._Wants(IMAGES, tag)
+    return False
+
+  def _DataChanged(self, tag):
+    """Records that the data of `tag` changed. See `Generation`."""
+    self._generation += 1
+    self._tag_generations[tag] = self._generation
 
   def _Purge(self, event, by_tags):
     """Purge all events that have occurred after the given event.step.
@@ -527,6 +848,12 @@ class EventAccumulator(object):
                                    self.most_recent_wall_time, event.step,
                                    event.wall_time, *expired_per_type)
       logging.warn(purge_msg)
+      if by_tags:
+        changed_tags = [value.tag for value in event.summary.value]
+      else:
+        changed_tags = list(self._tag_generations)
+      for tag in changed_tags:
+        self._DataChanged(tag)
 
   def _VerifyActivated(self):
     if not self._activated:
@@ -547,22 +874,51 @@ def _GetPurgeMessage(most_recent_step, most_recent_wall_time, event_step,
               num_expired_comp_histos, num_expired_images)
 
 
-def _GeneratorFromPath(path):
-  """Create an event generator for file or directory at given path string."""
+def _GeneratorFromPath(path, directory_monitor=None, gcs_client=None,
+                       position=None, parse_fn=None):
+  """Create an event generator for file or directory at given path string.
+
+  Args:
+    path: The path of an event file, or of a directory of event files.
+    directory_monitor: An optional directory monitor for local directories.
+    gcs_client: An optional `gcs_client.GCSClient` for GCS paths.
+    position: An optional `(event_file_path, offset)` pair returned by the
+      `Position` method of a generator for the same local path. The new
+      generator starts loading there.
+    parse_fn: An optional function that the loaders parse records with. See
+      `event_file_loader.EventFileLoader`.
+
+  Returns:
+    An object with a `Load` method that yields the new events, and a
+    `Position` method for local paths.
+  """
   if gcs.IsGCSPath(path):
     provider = directory_watcher.SequentialGCSProvider(
         path,
         path_filter=IsTensorFlowEventsFile)
-    return directory_watcher.DirectoryWatcher(provider,
-                                              gcs_file_loader.GCSFileLoader)
+    return directory_watcher.DirectoryWatcher(
+        provider,
+        functools.partial(gcs_file_loader.GCSFileLoader, client=gcs_client,
+                          parse_fn=parse_fn))
   elif gfile.IsDirectory(path):
     provider = directory_watcher.SequentialGFileProvider(
         path,
-        path_filter=IsTensorFlowEventsFile)
-    return directory_watcher.DirectoryWatcher(provider,
-                                              event_file_loader.EventFileLoader)
+        path_filter=IsTensorFlowEventsFile,
+        directory_monitor=directory_monitor)
+    watcher = directory_watcher.DirectoryWatcher(
+        provider,
+        functools.partial(event_file_loader.EventFileLoader,
+                          parse_fn=parse_fn),
+        directory=path,
+        directory_monitor=directory_monitor)
+    if position is not None:
+      watcher.Seek(*position)
+    return watcher
+  elif position is not None:
+    return event_file_loader.EventFileLoader(path, start_offset=position[1],
+                                             parse_fn=parse_fn)
   else:
-    return event_file_loader.EventFileLoader(path)
+    return event_file_loader.EventFileLoader(path, parse_fn=parse_fn)
 
 
 def _ParseFileVersion(file_version):
@@ -585,6 +941,67 @@ def _ParseFileVersion(file_version):
     return -1
 
 
+def _CompressedPercentiles(compression_bps, bucket_limit, bucket, histo_min,
+                           histo_max, histo_num):
+  """Computes `EventAccumulator._Percentile` at each of `compression_bps`.
+
+  This computes the cumulative weights of the buckets once, and finds the
+  bucket of every basis point with a single binary search, instead of
+  scanning the buckets once per basis point. It returns the same values as
+  `_Percentile` for histograms whose bucket counts are nonnegative.
+
+  Args:
+    compression_bps: The basis points at which to estimate the weight.
+    bucket_limit: The RHS histogram bucket limits.
+    bucket: The number of items in each histogram bucket.
+    histo_min: The minimum weight observed in the weight histogram
+    histo_max: The maximum weight observed in the weight histogram
+    histo_num: The number of items in the weight histogram
+
+  Returns:
+    A list with the linearly interpolated weight estimate at each of
+    `compression_bps`.
+  """
+  if histo_num == 0:
+    return [0] * len(compression_bps)
+  if not bucket:
+    return [histo_max] * len(compression_bps)
+
+  bucket = np.asarray(bucket, dtype=np.float64)
+  bucket_limit = np.asarray(bucket_limit, dtype=np.float64)
+  # np.cumsum adds the buckets in order, so its last element is the same as
+  # sum(bucket).
+  bucket_total = np.cumsum(bucket)[-1]
+  if bucket_total == 0:
+    bucket_total = 1
+  cumsum_weights = np.cumsum(10000 * bucket / bucket_total)
+  cumsum_prev = np.concatenate(([0], cumsum_weights[:-1]))
+
+  # `_Percentile` skips the buckets that hold no weight. The cumulative weights
+  # of the other buckets are strictly increasing, so the bucket of each basis
+  # point is the first of them whose cumulative weight is not less than it.
+  nonempty = np.flatnonzero(cumsum_weights != cumsum_prev)
+  if not len(nonempty):
+    return [histo_max] * len(compression_bps)
+  bps = np.asarray(compression_bps, dtype=np.float64)
+  found = np.searchsorted(cumsum_weights[nonempty], bps, side='left')
+  i = nonempty[np.minimum(found, len(nonempty) - 1)]
+
+  cumsum = cumsum_weights[i]
+  prev = cumsum_prev[i]
+  # Calculate the lower bound of interpolation
+  lhs = np.where((i > 0) & (prev > 0), bucket_limit[np.maximum(i - 1, 0)],
+                 histo_min)
+  lhs = np.maximum(lhs, histo_min)
+  # Calculate the upper bound of interpolation
+  rhs = np.minimum(bucket_limit[i], histo_max)
+  # The same arithmetic as _Remap, so that the results are identical.
+  weights = lhs + (bps - prev) * (rhs - lhs) / (cumsum - prev)
+
+  ## Basis points that exceed all cumulative weights get the max observed.
+  return np.where(found < len(nonempty), weights, histo_max).tolist()
+
+
 def _Remap(x, x0, x1, y0, y1):
   """Linearly map from [x0, x1] unto [y0, y1]."""
   return y0 + (x - x0) * float(y1 - y0) / (x1 - x0)
@@ -18,7 +18,9 @@ from __future__ import division
 from __future__ import print_function
 
 import os
+import time
 
+import numpy as np
 from six.moves import xrange  # pylint: disable=redefined-builtin
 import tensorflow as tf
 
@@ -28,16 +30,22 @@ from tensorflow.python.platform import gfile
 from tensorflow.python.platform import googletest
 from tensorflow.python.platform import logging
 from tensorflow.python.summary import event_accumulator as ea
+from tensorflow.python.util import compat
 
 
 class _EventGenerator(object):
 
   def __init__(self):
     self.items = []
+    self.parse_fn = None
 
   def Load(self):
     while self.items:
-      yield self.items.pop(0)
+      event = self.items.pop(0)
+      if self.parse_fn is None:
+        yield event
+      else:
+        yield self.parse_fn(event.SerializeToString(), 'fake_path', 0)
 
   def AddScalar(self, tag, wall_time=0, step=0, value=0):
     event = tf.Event(
@@ -120,8 +128,12 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
     self._real_constructor = ea.EventAccumulator
     self._real_generator = ea._GeneratorFromPath
 
+    def _FakeGeneratorFromPath(generator, *unused_args, **kwargs):
+      generator.parse_fn = kwargs.get('parse_fn')
+      return generator
+
     def _FakeAccumulatorConstructor(generator, *args, **kwargs):
-      ea._GeneratorFromPath = lambda x: generator
+      ea._GeneratorFromPath = _FakeGeneratorFromPath
       return self._real_constructor(generator, *args, **kwargs)
 
     ea.EventAccumulator = _FakeAccumulatorConstructor
@@ -187,6 +199,79 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
     self.assertEqual(acc.Scalars('s1'), [s1])
     self.assertEqual(acc.Scalars('s2'), [s2])
 
+  def testColumnarScalars(self):
+    gen = _EventGenerator()
+    columnar_gen = _EventGenerator()
+    acc = ea.EventAccumulator(gen)
+    columnar_acc = ea.EventAccumulator(columnar_gen, columnar_scalars=True)
+    for i in xrange(100):
+      gen.AddScalar('s1', wall_time=i * 0.5, step=i, value=i * 0.25)
+      columnar_gen.AddScalar('s1', wall_time=i * 0.5, step=i, value=i * 0.25)
+    acc.Reload()
+    columnar_acc.Reload()
+    self.assertEqual(acc.Scalars('s1'), columnar_acc.Scalars('s1'))
+    with self.assertRaises(KeyError):
+      columnar_acc.Scalars('s2')
+
+  def testScalarColumns(self):
+    for columnar_scalars in (False, True):
+      gen = _EventGenerator()
+      gen.AddScalar('s1', wall_time=1, step=10, value=32)
+      gen.AddScalar('s1', wall_time=2, step=12, value=64)
+      acc = ea.EventAccumulator(gen, columnar_scalars=columnar_scalars)
+      acc.Reload()
+      wall_times, steps, values = acc.ScalarColumns('s1')
+      self.assertEqual(wall_times.dtype, np.float64)
+      self.assertEqual(steps.dtype, np.int64)
+      self.assertEqual(values.dtype, np.float32)
+      self.assertAllEqual(wall_times, [1, 2])
+      self.assertAllEqual(steps, [10, 12])
+      self.assertAllEqual(values, [32, 64])
+
+  def testSampledScalarColumns(self):
+    for columnar_scalars in (False, True):
+      gen = _EventGenerator()
+      for i in xrange(10):
+        gen.AddScalar('s1', wall_time=i, step=i * 10, value=i * 0.5)
+      acc = ea.EventAccumulator(gen, columnar_scalars=columnar_scalars)
+      acc.Reload()
+      lengths = []
+      def sample(length):
+        lengths.append(length)
+        return [0, 4, 9]
+      wall_times, steps, values = acc.ScalarColumns('s1', sample)
+      self.assertEqual(lengths, [10])
+      self.assertEqual(values.dtype, np.float32)
+      self.assertAllEqual(wall_times, [0, 4, 9])
+      self.assertAllEqual(steps, [0, 40, 90])
+      self.assertAllEqual(values, [0, 2, 4.5])
+
+  def testGeneration(self):
+    gen = _EventGenerator()
+    acc = ea.EventAccumulator(gen)
+    gen.AddScalar('s1', wall_time=1, step=10, value=32)
+    gen.AddScalar('s2', wall_time=1, step=10, value=32)
+    acc.Reload()
+    generation = acc.Generation()
+    s1_generation = acc.Generation('s1')
+    s2_generation = acc.Generation('s2')
+    self.assertEqual(0, acc.Generation('s3'))
+
+    gen.AddScalar('s2', wall_time=2, step=20, value=64)
+    acc.Reload()
+    self.assertGreater(acc.Generation(), generation)
+    self.assertEqual(s1_generation, acc.Generation('s1'))
+    self.assertGreater(acc.Generation('s2'), s2_generation)
+
+    # Purging the data of a tag changes its generation.
+    s2_generation = acc.Generation('s2')
+    self.stubs.Set(logging, 'warn', lambda *args: None)
+    gen.AddScalar('s2', wall_time=3, step=15, value=64)
+    acc.Reload()
+    self.assertEqual([10, 15], [x.step for x in acc.Scalars('s2')])
+    self.assertGreater(acc.Generation('s2'), s2_generation)
+    self.assertEqual(s1_generation, acc.Generation('s1'))
+
   def testHistograms(self):
     gen = _EventGenerator()
     acc = ea.EventAccumulator(gen)
@@ -366,6 +451,38 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
                                          histo_max))
     AssertExpectedForBps(10000, histo_max)
 
+  def testCompressedPercentilesMatchPercentile(self):
+    gen = _EventGenerator()
+    acc = ea.EventAccumulator(gen)
+    rng = np.random.RandomState(0)
+    bps = ea.NORMAL_HISTOGRAM_BPS + (1, 2500, 9999)
+    bucket_limit = np.cumsum(rng.uniform(0.1, 1.0, size=30)).tolist()
+    for _ in xrange(100):
+      # Leave some of the buckets empty.
+      bucket = rng.randint(0, 20, size=30) * rng.randint(0, 2, size=30)
+      bucket = bucket.astype(np.float64).tolist()
+      histo_min = bucket_limit[0] - rng.uniform()
+      histo_max = bucket_limit[-1] - rng.uniform()
+      histo_num = sum(bucket)
+      bucket_total = histo_num or 1
+      cumsum_weights = np.cumsum(
+          [10000 * x / bucket_total for x in bucket]).tolist()
+      expected = [acc._Percentile(b, bucket_limit, cumsum_weights, histo_min,
+                                  histo_max, histo_num) for b in bps]
+      self.assertEqual(expected,
+                       ea._CompressedPercentiles(bps, bucket_limit, bucket,
+                                                 histo_min, histo_max,
+                                                 histo_num))
+
+  def testCompressedPercentilesOfEmptyHistograms(self):
+    bps = (0, 5000, 10000)
+    self.assertEqual([0, 0, 0],
+                     ea._CompressedPercentiles(bps, [1, 2], [0, 0], 0, 0, 0))
+    self.assertEqual([3, 3, 3],
+                     ea._CompressedPercentiles(bps, [1, 2], [0, 0], 1, 3, 2))
+    self.assertEqual([3, 3, 3],
+                     ea._CompressedPercentiles(bps, [], [], 1, 3, 2))
+
   def testImages(self):
     gen = _EventGenerator()
     acc = ea.EventAccumulator(gen)
@@ -395,6 +512,25 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
     self.assertEqual(acc.Images('im1'), [im1])
     self.assertEqual(acc.Images('im2'), [im2])
 
+  def testTagFilter(self):
+    gen = _EventGenerator()
+    acc = ea.EventAccumulator(gen, tag_filter={ea.SCALARS: '^s1$',
+                                               ea.HISTOGRAMS: 'hst',
+                                               ea.IMAGES: 'im2'})
+    gen.AddScalar('s1')
+    gen.AddScalar('s10')
+    gen.AddHistogram('hst1')
+    gen.AddImage('im1')
+    gen.AddImage('im2')
+    gen.AddEvent(tf.Event(graph_def=tf.GraphDef().SerializeToString()))
+    acc.Reload()
+    self.assertTagsEqual(acc.Tags(), {
+        ea.IMAGES: ['im2'],
+        ea.SCALARS: ['s1'],
+        ea.HISTOGRAMS: ['hst1'],
+        ea.COMPRESSED_HISTOGRAMS: [],
+        ea.GRAPH: False})
+
   def testActivation(self):
     gen = _EventGenerator()
     acc = ea.EventAccumulator(gen)
@@ -476,6 +612,21 @@ class MockingEventAccumulatorTest(EventAccumulatorTest):
     ## Check that we have discarded 200 and 300 from s1
     self.assertEqual([x.step for x in acc.Scalars('s1')], [100, 101, 201, 301])
 
+  def testExpiredDataDiscardedFromColumnarScalars(self):
+    self.stubs.Set(logging, 'warn', lambda *args: None)
+
+    gen = _EventGenerator()
+    acc = ea.EventAccumulator(gen, columnar_scalars=True)
+
+    gen.AddEvent(tf.Event(wall_time=0, step=0, file_version='brain.Event:1'))
+    gen.AddScalar('s1', wall_time=1, step=100, value=20)
+    gen.AddScalar('s1', wall_time=1, step=200, value=20)
+    gen.AddScalar('s1', wall_time=1, step=300, value=20)
+    gen.AddScalar('s1', wall_time=1, step=101, value=20)
+    acc.Reload()
+    self.assertEqual([x.step for x in acc.Scalars('s1')], [100, 101])
+    self.assertAllEqual(acc.ScalarColumns('s1')[1], [100, 101])
+
   def testOrphanedDataNotDiscardedIfFlagUnset(self):
     """Tests that events are not discarded if purge_orphaned_data is false.
     """
@@ -643,6 +794,172 @@ class RealisticEventAccumulatorTest(EventAccumulatorTest):
       self.assertEqual(i * i, sq_events[i].value)
     self.assertProtoEquals(graph_def, acc.Graph())
 
+  def _WriteScalars(self, writer, start, stop):
+    for i in xrange(start, stop):
+      value = tf.Summary.Value(tag='id', simple_value=i)
+      writer.add_summary(tf.Summary(value=[value]), i)
+    writer.flush()
+
+  def _NewDirectory(self, name):
+    directory = os.path.join(self.get_temp_dir(), name)
+    if gfile.IsDirectory(directory):
+      gfile.DeleteRecursively(directory)
+    gfile.MkDir(directory)
+    return directory
+
+  def testRestoresFromCache(self):
+    directory = self._NewDirectory('cached_dir')
+    cache_path = os.path.join(self._NewDirectory('cache'), 'run.cache')
+    writer = tf.train.SummaryWriter(directory, max_queue=100)
+    graph_def = tf.GraphDef(node=[tf.NodeDef(name='A', op='Mul')])
+    writer.add_graph(graph_def)
+    self._WriteScalars(writer, 0, 30)
+    acc = ea.EventAccumulator(directory, cache_path=cache_path)
+    acc.Reload()
+    self.assertTrue(gfile.Exists(cache_path))
+    self._WriteScalars(writer, 30, 40)
+
+    # A new accumulator only loads the events written after the cache.
+    start_offsets = []
+    loader_class = ea.event_file_loader.EventFileLoader
+
+    def _RecordingLoader(path, start_offset=0, parse_fn=None):
+      start_offsets.append(start_offset)
+      return loader_class(path, start_offset, parse_fn)
+
+    ea.event_file_loader.EventFileLoader = _RecordingLoader
+    try:
+      restored = ea.EventAccumulator(directory, cache_path=cache_path)
+      restored.Reload()
+    finally:
+      ea.event_file_loader.EventFileLoader = loader_class
+    self.assertEqual(1, len(start_offsets))
+    self.assertGreater(start_offsets[0], 0)
+
+    acc.Reload()
+    self.assertEqual(acc.num_loaded_events, restored.num_loaded_events)
+    self.assertEqual(acc.Scalars('id'), restored.Scalars('id'))
+    self.assertEqual(40, len(restored.Scalars('id')))
+    self.assertProtoEquals(graph_def, restored.Graph())
+    self.assertGreater(restored.Generation('id'), 0)
+
+  def testThrottlesCacheSaves(self):
+    directory = self._NewDirectory('throttled_dir')
+    cache_path = os.path.join(self._NewDirectory('cache'), 'run.cache')
+    writer = tf.train.SummaryWriter(directory, max_queue=100)
+    self._WriteScalars(writer, 0, 10)
+    acc = ea.EventAccumulator(directory, cache_path=cache_path)
+    acc.Reload()
+    num_cached_events = acc.num_loaded_events
+    self.assertEqual(num_cached_events,
+                     ea.state_cache.Load(cache_path)['num_loaded_events'])
+
+    # Reloading again within the save interval does not save the new events.
+    self._WriteScalars(writer, 10, 20)
+    acc.Reload()
+    self.assertGreater(acc.num_loaded_events, num_cached_events)
+    self.assertEqual(num_cached_events,
+                     ea.state_cache.Load(cache_path)['num_loaded_events'])
+
+    acc.SaveCache()
+    restored = ea.EventAccumulator(directory, cache_path=cache_path)
+    restored.Reload()
+    self.assertEqual(acc.num_loaded_events, restored.num_loaded_events)
+    self.assertEqual(acc.Scalars('id'), restored.Scalars('id'))
+
+  def testIgnoresCacheOfTruncatedEventFile(self):
+    directory = self._NewDirectory('truncated_dir')
+    cache_path = os.path.join(self._NewDirectory('cache'), 'run.cache')
+    writer = tf.train.SummaryWriter(directory, max_queue=100)
+    self._WriteScalars(writer, 0, 30)
+    writer.close()
+    ea.EventAccumulator(directory, cache_path=cache_path).Reload()
+
+    event_file = os.path.join(directory, gfile.ListDirectory(directory)[0])
+    with open(event_file, 'rb') as f:
+      contents = f.read()
+    with open(event_file, 'wb') as f:
+      f.write(contents[:len(contents) // 2])
+
+    restored = ea.EventAccumulator(directory, cache_path=cache_path)
+    restored.Reload()
+    uncached = ea.EventAccumulator(directory)
+    uncached.Reload()
+    self.assertLess(len(uncached.Scalars('id')), 30)
+    self.assertEqual(uncached.Scalars('id'), restored.Scalars('id'))
+
+
+  def testLazyImages(self):
+    directory = self._NewDirectory('images_dir')
+    writer = tf.train.SummaryWriter(directory)
+    graph_def = tf.GraphDef(node=[tf.NodeDef(name='A', op='Mul')])
+    writer.add_graph(graph_def)
+    for step in xrange(3):
+      encoded_image = compat.as_bytes('image%d' % step) * 100
+      image = tf.Summary.Image(height=1, width=step + 1, colorspace=1,
+                               encoded_image_string=encoded_image)
+      values = [tf.Summary.Value(tag='im', image=image),
+                tf.Summary.Value(tag='id', simple_value=step)]
+      writer.add_summary(tf.Summary(value=values), step)
+    writer.close()
+
+    eager = ea.EventAccumulator(directory)
+    eager.Reload()
+    lazy = ea.EventAccumulator(directory, lazy_images=True,
+                               tag_filter={ea.IMAGES: '.'})
+    lazy.Reload()
+    self.assertEqual([], lazy.Tags()[ea.SCALARS])
+    self.assertFalse(lazy.Tags()[ea.GRAPH])
+    eager_images = eager.Images('im')
+    lazy_images = lazy.Images('im')
+    self.assertEqual(3, len(lazy_images))
+    for eager_image, lazy_image in zip(eager_images, lazy_images):
+      self.assertIsInstance(lazy_image.encoded_image_string, ea.ImageLocation)
+      self.assertEqual(eager_image.width, lazy_image.width)
+      self.assertEqual(eager_image.encoded_image_string,
+                       lazy.EncodedImage(lazy_image))
+      self.assertEqual(eager_image.encoded_image_string,
+                       eager.EncodedImage(eager_image))
+
+
+class CompressedHistogramBenchmark(tf.test.Benchmark):
+
+  def _WriteHistogramEvents(self, directory, num_steps, num_tags, num_buckets):
+    rng = np.random.RandomState(0)
+    bucket_limit = np.cumsum(rng.uniform(0.1, 1.0, size=num_buckets)).tolist()
+    writer = tf.train.SummaryWriter(directory, max_queue=100)
+    for step in xrange(num_steps):
+      values = []
+      for i in xrange(num_tags):
+        bucket = rng.randint(0, 100, size=num_buckets).astype(np.float64)
+        histo = tf.HistogramProto(min=0, max=bucket_limit[-1],
+                                  num=bucket.sum(), bucket_limit=bucket_limit,
+                                  bucket=bucket.tolist())
+        values.append(tf.Summary.Value(tag='hst%d' % i, histo=histo))
+      writer.add_summary(tf.Summary(value=values), step)
+    writer.close()
+
+  def benchmarkReloadHistograms(self):
+    num_steps, num_tags, num_buckets = 100, 50, 200
+    directory = os.path.join(tf.test.get_temp_dir(), 'histogram_benchmark')
+    if gfile.IsDirectory(directory):
+      gfile.DeleteRecursively(directory)
+    gfile.MkDir(directory)
+    self._WriteHistogramEvents(directory, num_steps, num_tags, num_buckets)
+
+    acc = ea.EventAccumulator(directory, size_guidance={
+        ea.HISTOGRAMS: 1, ea.COMPRESSED_HISTOGRAMS: 0})
+    start_time = time.time()
+    acc.Reload()
+    wall_time = time.time() - start_time
+    num_histograms = num_steps * num_tags
+    print('Loaded %d histograms of %d buckets in %.3f s' %
+          (num_histograms, num_buckets, wall_time))
+    self.report_benchmark(
+        name='event_accumulator_reload_%d_histograms' % num_histograms,
+        iters=1, wall_time=wall_time,
+        extras={'histograms_per_second': num_histograms / wall_time})
+
 
 if __name__ == '__main__':
   tf.test.main()
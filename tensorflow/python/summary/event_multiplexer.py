@@ -20,13 +20,17 @@ from __future__ import print_function
 
 import os
 import threading
+import time
 
 import six
+from six.moves import queue
 
 from tensorflow.python.platform import gfile
 from tensorflow.python.platform import logging
 from tensorflow.python.summary import event_accumulator
+from tensorflow.python.summary.impl import directory_monitor
 from tensorflow.python.summary.impl import gcs
+from tensorflow.python.summary.impl import state_cache
 
 
 class EventMultiplexer(object):
@@ -80,7 +84,15 @@ class EventMultiplexer(object):
   def __init__(self,
                run_path_map=None,
                size_guidance=event_accumulator.DEFAULT_SIZE_GUIDANCE,
-               purge_orphaned_data=True):
+               purge_orphaned_data=True,
+               reload_threads=1,
+               max_reload_backoff=0,
+               columnar_scalars=False,
+               directory_monitor=None,
+               cache_dir=None,
+               gcs_client=None,
+               tag_filter=None,
+               lazy_images=False):
     """Constructor for the `EventMultiplexer`.
 
     Args:
@@ -92,6 +104,31 @@ class EventMultiplexer(object):
         `event_ccumulator.EventAccumulator` for details.
       purge_orphaned_data: Whether to discard any events that were "orphaned" by
         a TensorFlow restart.
+      reload_threads: The number of threads `Reload` uses to reload runs in
+        parallel.
+      max_reload_backoff: The maximum number of consecutive calls to `Reload`
+        that skip a run in which no new events were found. A run is skipped
+        once after its first reload without new events, and then twice as
+        many times after each further one, up to this limit. If 0, every run
+        is reloaded on every call.
+      columnar_scalars: Whether the accumulators store scalars in NumPy arrays.
+        See `event_accumulator.EventAccumulator` for details.
+      directory_monitor: An optional directory monitor (see
+        `directory_monitor.NewDirectoryMonitor`). If given, it is used to only
+        list the local directories that changed in `AddRunsFromDirectory`, and
+        to only reload the runs whose directories changed.
+      cache_dir: An optional local directory in which the accumulators save
+        their data, so that after a restart they resume loading where they
+        stopped. Only use a directory that nobody else can write to, and call
+        `SaveCaches` before exiting. See the `cache_path` argument of
+        `event_accumulator.EventAccumulator`.
+      gcs_client: An optional `gcs_client.GCSClient` that the accumulators
+        read event files on GCS with. If None, they use gsutil.
+      tag_filter: An optional dict from `tagType`s to regular expressions
+        that select the data the accumulators load. See
+        `event_accumulator.EventAccumulator` for details.
+      lazy_images: Whether the accumulators only keep the locations of images
+        in the event files. `EncodedImage` reads them.
     """
     self._accumulators_mutex = threading.Lock()
     self._accumulators = {}
@@ -99,6 +136,20 @@ class EventMultiplexer(object):
     self._reload_called = False
     self._size_guidance = size_guidance
     self.purge_orphaned_data = purge_orphaned_data
+    self._reload_threads = max(1, reload_threads)
+    self._max_reload_backoff = max_reload_backoff
+    self._columnar_scalars = columnar_scalars
+    self._directory_monitor = directory_monitor
+    self._cache_dir = cache_dir
+    self._gcs_client = gcs_client
+    self._tag_filter = tag_filter
+    self._lazy_images = lazy_images
+    # Maps the paths passed to AddRunsFromDirectory to their DirectoryTrees.
+    self._directory_trees = {}
+    # Maps run names to the number of consecutive reloads that found no new
+    # events, and to the number of upcoming calls to `Reload` that skip them.
+    self._unchanged_reloads = {}
+    self._reloads_to_skip = {}
     if run_path_map is not None:
       for (run, path) in six.iteritems(run_path_map):
         self.AddRun(path, run)
@@ -134,12 +185,23 @@ class EventMultiplexer(object):
           logging.warning('Conflict for name %s: old path %s, new path %s',
                           name, self._paths[name], path)
         logging.info('Constructing EventAccumulator for %s', path)
+        cache_path = None
+        if self._cache_dir:
+          cache_path = state_cache.CachePath(self._cache_dir, path)
         accumulator = event_accumulator.EventAccumulator(
             path,
             size_guidance=self._size_guidance,
-            purge_orphaned_data=self.purge_orphaned_data)
+            purge_orphaned_data=self.purge_orphaned_data,
+            columnar_scalars=self._columnar_scalars,
+            directory_monitor=self._directory_monitor,
+            cache_path=cache_path,
+            gcs_client=self._gcs_client,
+            tag_filter=self._tag_filter,
+            lazy_images=self._lazy_images)
         self._accumulators[name] = accumulator
         self._paths[name] = path
+        self._unchanged_reloads.pop(name, None)
+        self._reloads_to_skip.pop(name, None)
     if accumulator:
       if self._reload_called:
         accumulator.Reload()
@@ -185,9 +247,16 @@ class EventMultiplexer(object):
       if not gfile.IsDirectory(path):
         raise ValueError('AddRunsFromDirectory: path exists and is not a '
                          'directory, %s' % path)
+      if self._directory_monitor is None:
+        walk = gfile.Walk(path)
+      else:
+        if path not in self._directory_trees:
+          self._directory_trees[path] = directory_monitor.DirectoryTree(
+              path, self._directory_monitor)
+        walk = self._directory_trees[path].Walk()
       subdirs = [
           subdir
-          for (subdir, _, files) in gfile.Walk(path)
+          for (subdir, _, files) in walk
           if list(filter(event_accumulator.IsTensorFlowEventsFile, files))
       ]
 
@@ -200,15 +269,128 @@ class EventMultiplexer(object):
     return self
 
   def Reload(self):
-    """Call `Reload` on every `EventAccumulator`."""
+    """Call `Reload` on every `EventAccumulator`.
+
+    The accumulators are reloaded by up to `reload_threads` threads. Runs in
+    which recent reloads found no new events may be skipped, see
+    `max_reload_backoff`.
+
+    Returns:
+      The `EventMultiplexer`.
+    """
     self._reload_called = True
+    start = time.time()
     with self._accumulators_mutex:
-      loaders = list(self._accumulators.values())
+      items = list(six.iteritems(self._accumulators))
+      loaders = []
+      for name, accumulator in items:
+        if self._reloads_to_skip.get(name, 0) > 0:
+          self._reloads_to_skip[name] -= 1
+        else:
+          loaders.append((name, accumulator))
+
+    if self._reload_threads > 1 and len(loaders) > 1:
+      timings = self._ReloadInThreads(loaders)
+    else:
+      timings = [self._ReloadRun(name, l) for name, l in loaders]
+
+    if timings:
+      slowest_duration, slowest_name = max(
+          (duration, name) for name, duration in timings)
+      logging.info('Reloaded %d runs (%d skipped) in %0.1f secs, slowest run '
+                   '%s took %0.1f secs', len(timings),
+                   len(items) - len(loaders), time.time() - start,
+                   slowest_name, slowest_duration)
+    return self
 
-    for l in loaders:
-      l.Reload()
+  def SaveCaches(self):
+    """Saves the data of every `EventAccumulator` to its cache.
+
+    `EventAccumulator.Reload` only saves new data periodically, so this should
+    be called before exiting. Does nothing without a `cache_dir`.
+
+    Returns:
+      The `EventMultiplexer`.
+    """
+    with self._accumulators_mutex:
+      accumulators = list(self._accumulators.values())
+    for accumulator in accumulators:
+      accumulator.SaveCache()
     return self
 
+  def _ReloadRun(self, name, accumulator):
+    """Reloads one run, and updates its backoff.
+
+    Args:
+      name: The name of the run.
+      accumulator: The `EventAccumulator` of the run.
+
+    Returns:
+      A `(name, duration)` pair, where duration is the number of seconds the
+      reload took.
+    """
+    num_events = accumulator.num_loaded_events
+    start = time.time()
+    accumulator.Reload()
+    duration = time.time() - start
+    num_new_events = accumulator.num_loaded_events - num_events
+    logging.vlog(1, 'Reloaded run %s in %0.2f secs, %d new events', name,
+                 duration, num_new_events)
+    with self._accumulators_mutex:
+      if num_new_events:
+        self._unchanged_reloads.pop(name, None)
+      else:
+        # Past this count the backoff is always the maximum, so the count
+        # stops growing.
+        unchanged_reloads = min(self._unchanged_reloads.get(name, 0) + 1,
+                                self._max_reload_backoff.bit_length() + 1)
+        self._unchanged_reloads[name] = unchanged_reloads
+        self._reloads_to_skip[name] = min(2 ** (unchanged_reloads - 1),
+                                          self._max_reload_backoff)
+    return name, duration
+
+  def _ReloadInThreads(self, loaders):
+    """Reloads runs using `reload_threads` threads.
+
+    Args:
+      loaders: A list of `(name, accumulator)` pairs.
+
+    Returns:
+      A list of `(name, duration)` pairs, as returned by `_ReloadRun`.
+
+    Raises:
+      The first exception raised by the reload of a run, after all the other
+      runs have been reloaded.
+    """
+    work = queue.Queue()
+    for loader in loaders:
+      work.put(loader)
+    timings = []
+    errors = []
+
+    def _Worker():
+      while True:
+        try:
+          name, accumulator = work.get_nowait()
+        except queue.Empty:
+          return
+        try:
+          timings.append(self._ReloadRun(name, accumulator))
+        except Exception as e:  # pylint: disable=broad-except
+          logging.error('Failed to reload run %s: %s', name, e)
+          errors.append(e)
+
+    threads = [threading.Thread(target=_Worker)
+               for _ in range(min(self._reload_threads, len(loaders)))]
+    for thread in threads:
+      thread.daemon = True
+      thread.start()
+    for thread in threads:
+      thread.join()
+    if errors:
+      raise errors[0]
+    return timings
+
   def Scalars(self, run, tag):
     """Retrieve the scalar events associated with a run and tag.
 
@@ -227,6 +409,27 @@ class EventMultiplexer(object):
     accumulator = self._GetAccumulator(run)
     return accumulator.Scalars(tag)
 
+  def ScalarColumns(self, run, tag, sample=None):
+    """Retrieve the scalars associated with a run and tag, as arrays.
+
+    Args:
+      run: A string name of the run for which values are retrieved.
+      tag: A string name of the tag for which values are retrieved.
+      sample: If not None, a function that takes the number of scalars and
+        returns the indices of the ones to retrieve.
+
+    Raises:
+      KeyError: If the run is not found, or the tag is not available for
+        the given run.
+      RuntimeError: If the run's `EventAccumulator` has not been activated.
+
+    Returns:
+      A tuple `(wall_times, steps, values)` of arrays. See
+      `event_accumulator.EventAccumulator.ScalarColumns`.
+    """
+    accumulator = self._GetAccumulator(run)
+    return accumulator.ScalarColumns(tag, sample)
+
   def Graph(self, run):
     """Retrieve the graphs associated with the provided run.
 
@@ -298,6 +501,46 @@ class EventMultiplexer(object):
     accumulator = self._GetAccumulator(run)
     return accumulator.Images(tag)
 
+  def EncodedImage(self, run, image_event):
+    """Returns the encoded image of an image event of a run.
+
+    Args:
+      run: A string name of the run that the image event is from.
+      image_event: An `event_accumulator.ImageEvent` returned by `Images`.
+
+    Raises:
+      KeyError: If the run is not found.
+      IOError: If the image cannot be read from its event file.
+
+    Returns:
+      The encoded image string.
+    """
+    accumulator = self._GetAccumulator(run)
+    return accumulator.EncodedImage(image_event)
+
+  def RunGeneration(self, run, tag=None):
+    """Returns a value that changes whenever the data of a run may change.
+
+    The value is the same for two calls only if the run was not replaced and
+    its data did not change between them, so it can be used to invalidate
+    data that was derived from the run.
+
+    Args:
+      run: A string name of a run.
+      tag: An optional string tag. If given, the value only changes when the
+        data of that tag changes. See `EventAccumulator.Generation`.
+
+    Raises:
+      KeyError: If the run is not found.
+
+    Returns:
+      A hashable value.
+    """
+    with self._accumulators_mutex:
+      accumulator = self._accumulators[run]
+      path = self._paths[run]
+    return (path, accumulator.Generation(tag))
+
   def Runs(self):
     """Return all the run names in the `EventMultiplexer`.
 
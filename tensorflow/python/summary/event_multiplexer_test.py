@@ -25,6 +25,7 @@ from tensorflow.python.platform import gfile
 from tensorflow.python.platform import googletest
 from tensorflow.python.summary import event_accumulator
 from tensorflow.python.summary import event_multiplexer
+from tensorflow.python.summary.impl import directory_monitor
 
 
 def _AddEvents(path):
@@ -43,9 +44,14 @@ def _CreateCleanDirectory(path):
 
 class _FakeAccumulator(object):
 
-  def __init__(self, path):
+  def __init__(self, path, cache_path=None):
     self._path = path
+    self.cache_path = cache_path
     self.reload_called = False
+    self.reload_count = 0
+    self.save_cache_count = 0
+    self.num_loaded_events = 0
+    self.new_events_per_reload = 0
 
   def Tags(self):
     return {event_accumulator.IMAGES: ['im1', 'im2'],
@@ -73,8 +79,19 @@ class _FakeAccumulator(object):
       raise KeyError
     return ['%s/%s' % (self._path, tag_name)]
 
+  def EncodedImage(self, image_event):
+    return 'encoded %s' % image_event
+
+  def Generation(self, tag=None):
+    return self.num_loaded_events
+
   def Reload(self):
     self.reload_called = True
+    self.reload_count += 1
+    self.num_loaded_events += self.new_events_per_reload
+
+  def SaveCache(self):
+    self.save_cache_count += 1
 
 
 # pylint: disable=unused-argument
@@ -82,8 +99,14 @@ def _GetFakeAccumulator(
     path,
     size_guidance=None,
     compression_bps=None,
-    purge_orphaned_data=None):
-  return _FakeAccumulator(path)
+    purge_orphaned_data=None,
+    columnar_scalars=None,
+    directory_monitor=None,
+    cache_path=None,
+    gcs_client=None,
+    tag_filter=None,
+    lazy_images=False):
+  return _FakeAccumulator(path, cache_path)
 # pylint: enable=unused-argument
 
 
@@ -111,6 +134,59 @@ class EventMultiplexerTest(test_util.TensorFlowTestCase):
     self.assertTrue(x._GetAccumulator('run1').reload_called)
     self.assertTrue(x._GetAccumulator('run2').reload_called)
 
+  def testReloadInThreads(self):
+    runs = dict(('run%d' % i, 'path%d' % i) for i in range(10))
+    x = event_multiplexer.EventMultiplexer(runs, reload_threads=4)
+    x.Reload()
+    for run in runs:
+      self.assertEqual(1, x._GetAccumulator(run).reload_count)
+
+  def testReloadInThreadsRaises(self):
+    x = event_multiplexer.EventMultiplexer({'run1': 'path1', 'run2': 'path2'},
+                                           reload_threads=2)
+    def _Fail():
+      raise ValueError('Bad event file')
+    x._GetAccumulator('run1').Reload = _Fail
+    with self.assertRaisesRegexp(ValueError, 'Bad event file'):
+      x.Reload()
+    self.assertEqual(1, x._GetAccumulator('run2').reload_count)
+
+  def testReloadBackoff(self):
+    x = event_multiplexer.EventMultiplexer({'run1': 'path1', 'run2': 'path2'},
+                                           max_reload_backoff=2)
+    run1 = x._GetAccumulator('run1')
+    run2 = x._GetAccumulator('run2')
+    run2.new_events_per_reload = 1
+    run1_reload_counts = []
+    for _ in range(7):
+      x.Reload()
+      run1_reload_counts.append(run1.reload_count)
+    # run1 never changes, so it is skipped for 1, 2, and then at most 2
+    # calls after each reload.
+    self.assertEqual([1, 1, 2, 2, 2, 3, 3], run1_reload_counts)
+    self.assertEqual(7, run2.reload_count)
+    # Once run1 changes, it is reloaded on every call again.
+    run1.new_events_per_reload = 1
+    x.Reload()
+    x.Reload()
+    x.Reload()
+    self.assertEqual(5, run1.reload_count)
+
+  def testRunGeneration(self):
+    x = event_multiplexer.EventMultiplexer({'run1': 'path1', 'run2': 'path2'})
+    x._GetAccumulator('run1').new_events_per_reload = 1
+    x.Reload()
+    run1_generation = x.RunGeneration('run1')
+    run2_generation = x.RunGeneration('run2')
+    x.Reload()
+    self.assertNotEqual(run1_generation, x.RunGeneration('run1'))
+    self.assertEqual(run2_generation, x.RunGeneration('run2'))
+    # Replacing a run changes its generation.
+    x.AddRun('path3', 'run2')
+    self.assertNotEqual(run2_generation, x.RunGeneration('run2'))
+    with self.assertRaises(KeyError):
+      x.RunGeneration('run3')
+
   def testScalars(self):
     x = event_multiplexer.EventMultiplexer({'run1': 'path1', 'run2': 'path2'})
 
@@ -119,6 +195,13 @@ class EventMultiplexerTest(test_util.TensorFlowTestCase):
 
     self.assertEqual(run1_expected, run1_actual)
 
+  def testEncodedImage(self):
+    x = event_multiplexer.EventMultiplexer({'run1': 'path1'})
+    image = x.Images('run1', 'im1')[0]
+    self.assertEqual('encoded path1/im1', x.EncodedImage('run1', image))
+    with self.assertRaises(KeyError):
+      x.EncodedImage('run2', image)
+
   def testExceptions(self):
     x = event_multiplexer.EventMultiplexer({'run1': 'path1', 'run2': 'path2'})
     with self.assertRaises(KeyError):
@@ -229,6 +312,43 @@ class EventMultiplexerTest(test_util.TensorFlowTestCase):
     self.assertItemsEqual(x.Runs(), ['.', 'subdirectory/1', 'subdirectory/2',
                                      'subdirectory/1/1'])
 
+  def testAddRunsFromDirectoryWithDirectoryMonitor(self):
+    monitor = directory_monitor.NewDirectoryMonitor()
+    x = event_multiplexer.EventMultiplexer(directory_monitor=monitor)
+    join = os.path.join
+    realdir = join(self.get_temp_dir(), 'monitored_directory')
+    _CreateCleanDirectory(realdir)
+
+    x.AddRunsFromDirectory(realdir)
+    self.assertEqual(x.Runs(), {})
+    _AddEvents(join(realdir, 'path1'))
+    x.AddRunsFromDirectory(realdir)
+    self.assertItemsEqual(x.Runs(), ['path1'])
+    _AddEvents(join(realdir, 'path1', 'path1_1'))
+    _AddEvents(join(realdir, 'path2'))
+    x.AddRunsFromDirectory(realdir)
+    self.assertItemsEqual(x.Runs(), ['path1', 'path1/path1_1', 'path2'])
+    monitor.Close()
+
+  def testCacheDir(self):
+    x = event_multiplexer.EventMultiplexer()
+    x.AddRun('run1_path', 'run1')
+    self.assertIsNone(x._GetAccumulator('run1').cache_path)
+
+    cache_dir = os.path.join(self.get_temp_dir(), 'cache')
+    x = event_multiplexer.EventMultiplexer(cache_dir=cache_dir)
+    x.AddRun('run1_path', 'run1')
+    x.AddRun('run2_path', 'run2')
+    cache_path1 = x._GetAccumulator('run1').cache_path
+    cache_path2 = x._GetAccumulator('run2').cache_path
+    self.assertEqual(cache_dir, os.path.dirname(cache_path1))
+    self.assertEqual(cache_dir, os.path.dirname(cache_path2))
+    self.assertNotEqual(cache_path1, cache_path2)
+
+    x.SaveCaches()
+    self.assertEqual(1, x._GetAccumulator('run1').save_cache_count)
+    self.assertEqual(1, x._GetAccumulator('run2').save_cache_count)
+
   def testAddRunsFromDirectoryThrowsException(self):
     x = event_multiplexer.EventMultiplexer()
     tmpdir = self.get_temp_dir()
@@ -0,0 +1,347 @@
+# Copyright 2015 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Detects changes in local directories, so that they are not listed in vain.
+
+A directory monitor counts the changes in each directory that it watches:
+files or subdirectories that are created, deleted, moved or modified. A
+consumer that remembers the change count of a directory when it lists it only
+needs to list the directory again once the count has changed. Since the count
+is read before the directory is listed, no change can be missed.
+
+Directory monitors only support local directories. There are two kinds:
+
+  * `InotifyDirectoryMonitor` uses Linux's inotify through ctypes, so that
+    checking for changes costs no system calls for the directories.
+  * `PollingDirectoryMonitor` compares the modification times and sizes of a
+    directory and of its entries. The entries are only listed again when the
+    modification time of the directory changes.
+
+Note that inotify does not see changes made by other hosts on a network
+filesystem, so polling should be used for those.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import threading
+
+from tensorflow.python.platform import gfile
+from tensorflow.python.platform import logging
+from tensorflow.python.util import compat
+
+# Constants from <sys/inotify.h>.
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM |
+               _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF |
+               _IN_MOVE_SELF)
+
+# struct inotify_event is followed by a name of `len` bytes.
+_EVENT_FORMAT = 'iIII'
+_EVENT_SIZE = struct.calcsize(_EVENT_FORMAT)
+_READ_SIZE = 64 * 1024
+
+
+def NewDirectoryMonitor(use_inotify=True):
+  """Creates a directory monitor.
+
+  Args:
+    use_inotify: Whether to use inotify if it is available. If it is not, or
+      if this is False, the monitor polls the directories instead.
+
+  Returns:
+    An `InotifyDirectoryMonitor` or a `PollingDirectoryMonitor`.
+  """
+  if use_inotify:
+    try:
+      return InotifyDirectoryMonitor()
+    except (AttributeError, OSError) as e:
+      logging.warn('inotify is not available (%s), polling directories '
+                   'for changes instead.', e)
+  return PollingDirectoryMonitor()
+
+
+def _StatKey(path):
+  """Returns what identifies the current contents of a path, or None."""
+  try:
+    st = os.stat(path)
+  except OSError:
+    return None
+  return (st.st_ino, st.st_mtime, st.st_size)
+
+
+class PollingDirectoryMonitor(object):
+  """A directory monitor that polls the directories for changes.
+
+  Each call to `ChangeCount` stats the directory and the entries it had when
+  it was last listed. This detects new, deleted and modified files, as long as
+  the filesystem records modification times precisely enough to tell apart
+  changes in quick succession.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    # Maps each watched directory to its snapshot: the stat key of the
+    # directory and a dict from its entries to their stat keys, or None if
+    # the directory does not exist.
+    self._snapshots = {}
+    self._change_counts = collections.defaultdict(int)
+
+  def Watch(self, directory):
+    """Starts counting the changes in a directory, if it was not yet watched.
+
+    Args:
+      directory: The path of a local directory. It need not exist yet.
+    """
+    with self._lock:
+      if directory not in self._snapshots:
+        self._snapshots[directory] = self._Snapshot(directory, None)
+
+  def ChangeCount(self, directory):
+    """Returns the number of changes seen in a directory.
+
+    Starts watching the directory if it was not watched yet.
+
+    Args:
+      directory: The path of a local directory.
+
+    Returns:
+      A number that increases whenever the directory changes.
+    """
+    with self._lock:
+      if directory not in self._snapshots:
+        self._snapshots[directory] = self._Snapshot(directory, None)
+      else:
+        previous = self._snapshots[directory]
+        snapshot = self._Snapshot(directory, previous)
+        if snapshot != previous:
+          self._snapshots[directory] = snapshot
+          self._change_counts[directory] += 1
+      return self._change_counts[directory]
+
+  def Close(self):
+    """Stops watching all directories."""
+    with self._lock:
+      self._snapshots.clear()
+
+  def _Snapshot(self, directory, previous):
+    directory_key = _StatKey(directory)
+    if directory_key is None:
+      return None
+    if previous is not None and previous[0] == directory_key:
+      # No entries were created or deleted, so only stat them again.
+      names = list(previous[1])
+    else:
+      try:
+        names = os.listdir(directory)
+      except OSError:
+        return None
+    return (directory_key,
+            {name: _StatKey(os.path.join(directory, name)) for name in names})
+
+
+class InotifyDirectoryMonitor(object):
+  """A directory monitor that uses inotify.
+
+  `ChangeCount` reads the pending inotify events without blocking, so it does
+  not touch the directories themselves. Directories that cannot be watched
+  with inotify, for example because they do not exist yet or because the
+  limit on inotify watches was reached, are polled instead.
+  """
+
+  def __init__(self):
+    """Creates a new inotify instance.
+
+    Raises:
+      OSError: If inotify is not available.
+    """
+    libc_name = ctypes.util.find_library('c')
+    if libc_name is None:
+      raise OSError(errno.ENOSYS, 'libc was not found')
+    self._libc = ctypes.CDLL(libc_name, use_errno=True)
+    # Raises AttributeError if libc has no inotify functions.
+    self._libc.inotify_init1.argtypes = [ctypes.c_int]
+    self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p,
+                                             ctypes.c_uint32]
+    fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    if fd < 0:
+      error = ctypes.get_errno()
+      raise OSError(error, os.strerror(error))
+    self._fd = fd
+    self._lock = threading.Lock()
+    self._directories_by_wd = {}
+    self._wds_by_directory = {}
+    self._change_counts = collections.defaultdict(int)
+    # The directories that could not be watched with inotify. Their change
+    # count is the sum of their count here and in _polling_monitor.
+    self._polled_directories = set()
+    self._polling_monitor = PollingDirectoryMonitor()
+
+  def Watch(self, directory):
+    """Starts counting the changes in a directory, if it was not yet watched.
+
+    Args:
+      directory: The path of a local directory. It need not exist yet.
+    """
+    with self._lock:
+      self._ReadEvents()
+      self._WatchLocked(directory)
+
+  def ChangeCount(self, directory):
+    """Returns the number of changes seen in a directory.
+
+    Starts watching the directory if it was not watched yet.
+
+    Args:
+      directory: The path of a local directory.
+
+    Returns:
+      A number that increases whenever the directory changes.
+    """
+    with self._lock:
+      self._ReadEvents()
+      self._WatchLocked(directory)
+      count = self._change_counts[directory]
+      if directory in self._polled_directories:
+        count += self._polling_monitor.ChangeCount(directory)
+      return count
+
+  def Close(self):
+    """Stops watching all directories, and closes the inotify instance."""
+    with self._lock:
+      if self._fd is not None:
+        os.close(self._fd)
+        self._fd = None
+      self._polling_monitor.Close()
+
+  def _WatchLocked(self, directory):
+    """Watches a directory, if it is not watched already."""
+    if (directory in self._wds_by_directory or
+        directory in self._polled_directories):
+      return
+    wd = self._libc.inotify_add_watch(self._fd, compat.as_bytes(directory),
+                                      _WATCH_MASK)
+    if wd < 0:
+      error = ctypes.get_errno()
+      logging.vlog(1, 'Polling %s, since it cannot be watched with inotify: '
+                   '%s', directory, os.strerror(error))
+      self._polled_directories.add(directory)
+      self._polling_monitor.Watch(directory)
+      return
+    self._directories_by_wd[wd] = directory
+    self._wds_by_directory[directory] = wd
+
+  def _ReadEvents(self):
+    """Counts the pending inotify events."""
+    while True:
+      try:
+        data = os.read(self._fd, _READ_SIZE)
+      except OSError as e:
+        if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+          return
+        raise
+      offset = 0
+      while offset < len(data):
+        wd, mask, _, name_length = struct.unpack_from(_EVENT_FORMAT, data,
+                                                      offset)
+        offset += _EVENT_SIZE + name_length
+        if mask & _IN_Q_OVERFLOW:
+          # Events were dropped, so any directory may have changed.
+          for directory in self._wds_by_directory:
+            self._change_counts[directory] += 1
+          continue
+        directory = self._directories_by_wd.get(wd)
+        if directory is None:
+          continue
+        self._change_counts[directory] += 1
+        if mask & _IN_IGNORED:
+          # The directory was deleted or moved, so it is no longer watched.
+          # The next call to ChangeCount watches it again if it exists.
+          del self._directories_by_wd[wd]
+          del self._wds_by_directory[directory]
+
+
+class DirectoryTree(object):
+  """A cached listing of a local directory tree.
+
+  Only the directories that changed since the last call to `Walk` are listed
+  again, so walking a large tree that barely changes costs little.
+  """
+
+  def __init__(self, root, directory_monitor):
+    """Creates a directory tree.
+
+    Args:
+      root: The path of the root directory of the tree.
+      directory_monitor: The directory monitor used to detect changes.
+    """
+    self._root = root
+    self._directory_monitor = directory_monitor
+    # Maps each directory to its change count when it was listed, and to the
+    # lists of its subdirectories and files.
+    self._listings = {}
+
+  def Walk(self):
+    """Lists the directories in the tree, like `gfile.Walk`.
+
+    Returns:
+      A list with a `(directory, subdirectory_names, file_names)` tuple for
+      each directory in the tree, parents before their subdirectories. It is
+      empty if the root directory does not exist.
+    """
+    listings = {}
+    result = []
+    pending = [self._root]
+    while pending:
+      directory = pending.pop()
+      change_count = self._directory_monitor.ChangeCount(directory)
+      listing = self._listings.get(directory)
+      if listing is None or listing[0] != change_count:
+        try:
+          names = gfile.ListDirectory(directory)
+        except OSError:
+          continue
+        subdirectories = []
+        files = []
+        for name in names:
+          if gfile.IsDirectory(os.path.join(directory, name)):
+            subdirectories.append(name)
+          else:
+            files.append(name)
+        listing = (change_count, subdirectories, files)
+      listings[directory] = listing
+      result.append((directory, listing[1], listing[2]))
+      pending.extend(os.path.join(directory, name) for name in listing[1])
+    self._listings = listings
+    return result
@@ -0,0 +1,112 @@
+# Copyright 2015 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Tests for directory_monitor."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+
+from tensorflow.python.framework import test_util
+from tensorflow.python.platform import googletest
+from tensorflow.python.summary.impl import directory_monitor
+
+
+class PollingDirectoryMonitorTest(test_util.TensorFlowTestCase):
+
+  def _NewMonitor(self):
+    return directory_monitor.PollingDirectoryMonitor()
+
+  def setUp(self):
+    self._directory = os.path.join(self.get_temp_dir(), 'monitored_dir')
+    os.mkdir(self._directory)
+    self._monitor = self._NewMonitor()
+
+  def tearDown(self):
+    self._monitor.Close()
+    shutil.rmtree(self._directory)
+
+  def _WriteToFile(self, filename, data):
+    with open(os.path.join(self._directory, filename), 'a') as f:
+      f.write(data)
+
+  def assertChanges(self, change_fn):
+    count = self._monitor.ChangeCount(self._directory)
+    change_fn()
+    new_count = self._monitor.ChangeCount(self._directory)
+    self.assertGreater(new_count, count)
+    self.assertEqual(new_count, self._monitor.ChangeCount(self._directory))
+
+  def testUnchangedDirectory(self):
+    self._WriteToFile('a', 'abc')
+    count = self._monitor.ChangeCount(self._directory)
+    self.assertEqual(count, self._monitor.ChangeCount(self._directory))
+
+  def testNewFile(self):
+    self.assertChanges(lambda: self._WriteToFile('a', 'abc'))
+
+  def testAppendToFile(self):
+    self._WriteToFile('a', 'abc')
+    self.assertChanges(lambda: self._WriteToFile('a', 'def'))
+
+  def testDeletedFile(self):
+    self._WriteToFile('a', 'abc')
+    self.assertChanges(lambda: os.remove(os.path.join(self._directory, 'a')))
+
+  def testNewSubdirectory(self):
+    self.assertChanges(lambda: os.mkdir(os.path.join(self._directory, 'sub')))
+
+  def testDirectoryCreatedLater(self):
+    directory = os.path.join(self._directory, 'later')
+    count = self._monitor.ChangeCount(directory)
+    os.mkdir(directory)
+    self.assertGreater(self._monitor.ChangeCount(directory), count)
+    count = self._monitor.ChangeCount(directory)
+    with open(os.path.join(directory, 'a'), 'w') as f:
+      f.write('abc')
+    self.assertGreater(self._monitor.ChangeCount(directory), count)
+
+  def testDirectoryTree(self):
+    tree = directory_monitor.DirectoryTree(self._directory, self._monitor)
+    self.assertEqual([(self._directory, [], [])], tree.Walk())
+    subdirectory = os.path.join(self._directory, 'sub')
+    os.mkdir(subdirectory)
+    self._WriteToFile('a', 'abc')
+    self.assertEqual([(self._directory, ['sub'], ['a']),
+                      (subdirectory, [], [])], tree.Walk())
+    with open(os.path.join(subdirectory, 'b'), 'w') as f:
+      f.write('abc')
+    self.assertEqual([(self._directory, ['sub'], ['a']),
+                      (subdirectory, [], ['b'])], tree.Walk())
+    shutil.rmtree(subdirectory)
+    self.assertEqual([(self._directory, [], ['a'])], tree.Walk())
+
+  def testDirectoryTreeOfMissingDirectory(self):
+    tree = directory_monitor.DirectoryTree(
+        os.path.join(self._directory, 'missing'), self._monitor)
+    self.assertEqual([], tree.Walk())
+
+
+class InotifyDirectoryMonitorTest(PollingDirectoryMonitorTest):
+
+  def _NewMonitor(self):
+    return directory_monitor.NewDirectoryMonitor(use_inotify=True)
+
+
+if __name__ == '__main__':
+  googletest.main()
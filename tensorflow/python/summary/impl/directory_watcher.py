@@ -41,7 +41,8 @@ class DirectoryWatcher(object):
 
   """
 
-  def __init__(self, path_provider, loader_factory):
+  def __init__(self, path_provider, loader_factory, directory=None,
+               directory_monitor=None):
     """Constructs a new DirectoryWatcher.
 
     Args:
@@ -51,6 +52,11 @@ class DirectoryWatcher(object):
       loader_factory: A factory for creating loaders. The factory should take a
         path and return an object that has a Load method returning an
         iterator that will yield all events that have not been yielded yet.
+      directory: The local directory that the paths are in. Only used with
+        `directory_monitor`.
+      directory_monitor: An optional directory monitor (see
+        `directory_monitor.NewDirectoryMonitor`). If given, `Load` returns
+        right away unless `directory` changed since the last `Load`.
 
     Raises:
       ValueError: If path_provider or loader_factory are None.
@@ -63,6 +69,10 @@ class DirectoryWatcher(object):
     self._path = None
     self._loader_factory = loader_factory
     self._loader = None
+    self._directory = directory
+    self._directory_monitor = directory_monitor
+    # The change count of the directory when the last Load finished.
+    self._change_count = None
 
   def Load(self):
     """Loads new values.
@@ -78,6 +88,13 @@ class DirectoryWatcher(object):
       All values that have not been yielded yet.
     """
 
+    change_count = None
+    if self._directory_monitor is not None:
+      change_count = self._directory_monitor.ChangeCount(self._directory)
+      if change_count == self._change_count:
+        # No file in the directory changed, so there is nothing new to load.
+        return
+
     # If the loader exists, check it for a value.
     if not self._loader:
       self._InitializeLoader()
@@ -91,6 +108,8 @@ class DirectoryWatcher(object):
       if not next_path:
         logging.info('No path found after %s', self._path)
         # Current path is empty and there are no new paths, so we're done.
+        # Only now can later calls skip loading until the directory changes.
+        self._change_count = change_count
         return
 
       # There's a new path, so check to make sure there weren't any events
@@ -118,6 +137,32 @@ class DirectoryWatcher(object):
       # Advance to the next path and start over.
       self._SetPath(next_path)
 
+  def Position(self):
+    """Returns where loading stopped, as a `(path, offset)` pair.
+
+    The loaders must have a `Position` method that returns such a pair.
+
+    Returns:
+      The position of the loader of the current path, or None if no path was
+      loaded yet.
+    """
+    if not self._loader:
+      return None
+    return self._loader.Position()
+
+  def Seek(self, path, offset):
+    """Continues loading at a position returned by `Position`.
+
+    The loader factory must accept the offset as a second argument.
+
+    Args:
+      path: The path to load from next. Older paths are skipped.
+      offset: The offset in `path` to start loading at.
+    """
+    self._path = path
+    self._loader = self._loader_factory(path, offset)
+    self._change_count = None
+
   def _InitializeLoader(self):
     path = self._GetNextPath()
     if path:
@@ -168,12 +213,36 @@ def _SequentialProvider(path_source):
   return _Provider
 
 
-def SequentialGFileProvider(directory, path_filter=lambda x: True):
-  """Provides the files in a directory that match the given filter."""
+def SequentialGFileProvider(directory, path_filter=lambda x: True,
+                            directory_monitor=None):
+  """Provides the files in a directory that match the given filter.
+
+  Args:
+    directory: The directory to provide the files of.
+    path_filter: A function that returns True for the paths to provide.
+    directory_monitor: An optional directory monitor (see
+      `directory_monitor.NewDirectoryMonitor`). If given, the directory is only
+      listed again after it changes.
+
+  Returns:
+    A path provider for use with DirectoryWatcher.
+  """
+  # The change count of the directory when it was last listed, and the paths
+  # it had then.
+  listing = [None, []]
+
   def _Source():
+    change_count = None
+    if directory_monitor is not None:
+      change_count = directory_monitor.ChangeCount(directory)
+      if change_count == listing[0]:
+        return listing[1]
     paths = (os.path.join(directory, path)
              for path in gfile.ListDirectory(directory))
-    return (path for path in paths if path_filter(path))
+    paths = [path for path in paths if path_filter(path)]
+    if directory_monitor is not None:
+      listing[:] = [change_count, paths]
+    return paths
 
   return _SequentialProvider(_Source)
 
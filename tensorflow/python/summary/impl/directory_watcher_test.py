@@ -24,15 +24,17 @@ import shutil
 
 from tensorflow.python.framework import test_util
 from tensorflow.python.platform import googletest
+from tensorflow.python.summary.impl import directory_monitor
 from tensorflow.python.summary.impl import directory_watcher
 
 
 class _ByteLoader(object):
   """A loader that loads individual bytes from a file."""
 
-  def __init__(self, path):
+  def __init__(self, path, start_offset=0):
+    self._path = path
     self._f = open(path)
-    self.bytes_read = 0
+    self.bytes_read = start_offset
 
   def Load(self):
     while True:
@@ -44,6 +46,9 @@ class _ByteLoader(object):
       else:
         return
 
+  def Position(self):
+    return (self._path, self.bytes_read)
+
 
 class DirectoryWatcherTest(test_util.TensorFlowTestCase):
 
@@ -121,6 +126,51 @@ class DirectoryWatcherTest(test_util.TensorFlowTestCase):
     self._WriteToFile('c', 'c')
     self.assertWatcherYields(['a', 'c'])
 
+  def testPositionAndSeek(self):
+    self.assertIsNone(self._watcher.Position())
+    self._WriteToFile('a', 'a')
+    self._WriteToFile('b', 'bc')
+    self.assertWatcherYields(['a', 'b', 'c'])
+    position = self._watcher.Position()
+    self.assertEqual((os.path.join(self._directory, 'b'), 2), position)
+    self._WriteToFile('b', 'd')
+    self._WriteToFile('c', 'e')
+    # A new watcher continues where the old one stopped.
+    self._watcher = directory_watcher.DirectoryWatcher(
+        directory_watcher.SequentialGFileProvider(self._directory), _ByteLoader)
+    self._watcher.Seek(*position)
+    self.assertWatcherYields(['d', 'e'])
+
+
+class MonitoredDirectoryWatcherTest(DirectoryWatcherTest):
+  """Runs the DirectoryWatcher tests with a directory monitor."""
+
+  def setUp(self):
+    self._directory = os.path.join(self.get_temp_dir(), 'monitor_dir')
+    os.mkdir(self._directory)
+    self._monitor = directory_monitor.NewDirectoryMonitor()
+    self._watcher = directory_watcher.DirectoryWatcher(
+        directory_watcher.SequentialGFileProvider(
+            self._directory, directory_monitor=self._monitor),
+        _ByteLoader,
+        directory=self._directory,
+        directory_monitor=self._monitor)
+
+  def tearDown(self):
+    self._monitor.Close()
+    super(MonitoredDirectoryWatcherTest, self).tearDown()
+
+  def testSkipsLoadingUnchangedDirectory(self):
+    self._WriteToFile('a', 'abc')
+    self.assertWatcherYields(['a', 'b', 'c'])
+    loader = self._watcher._loader
+    loader.Load = None
+    # Nothing changed, so the loader is not used.
+    self.assertWatcherYields([])
+    del loader.Load
+    self._WriteToFile('a', 'd')
+    self.assertWatcherYields(['d'])
+
 
 if __name__ == '__main__':
   googletest.main()
@@ -28,14 +28,29 @@ from tensorflow.python.util import compat
 class EventFileLoader(object):
   """An EventLoader is an iterator that yields Event protos."""
 
-  def __init__(self, file_path):
+  def __init__(self, file_path, start_offset=0, parse_fn=None):
+    """Opens a record reader.
+
+    Args:
+      file_path: The path of the event file.
+      start_offset: The offset of the first record to load, e.g. an offset
+        returned by `Position` before.
+      parse_fn: An optional function that takes the data of a record, the
+        file path and the offset of the record in the file, and returns the
+        value to yield. By default the data is parsed as an `Event` proto.
+
+    Raises:
+      IOError: If the file cannot be opened.
+      ValueError: If `file_path` is None.
+    """
     if file_path is None:
       raise ValueError('A file path is required')
     logging.debug('Opening a record reader pointing at %s', file_path)
     self._reader = pywrap_tensorflow.PyRecordReader_New(
-        compat.as_bytes(file_path), 0)
+        compat.as_bytes(file_path), start_offset)
     # Store it for logging purposes.
     self._file_path = file_path
+    self._parse_fn = parse_fn
     if not self._reader:
       raise IOError('Failed to open a record reader pointing to %s' % file_path)
 
@@ -48,12 +63,23 @@ class EventFileLoader(object):
     Yields:
       All values that were written to disk that have not been yielded yet.
     """
-    while self._reader.GetNext():
-      event = event_pb2.Event()
-      event.ParseFromString(self._reader.record())
-      yield event
+    if self._parse_fn is not None:
+      while True:
+        offset = self._reader.offset()
+        if not self._reader.GetNext():
+          break
+        yield self._parse_fn(self._reader.record(), self._file_path, offset)
+    else:
+      while self._reader.GetNext():
+        event = event_pb2.Event()
+        event.ParseFromString(self._reader.record())
+        yield event
     logging.debug('No more events in %s', self._file_path)
 
+  def Position(self):
+    """Returns the file path and the offset after the last loaded event."""
+    return (self._file_path, self._reader.offset())
+
 
 def main(argv):
   if len(argv) != 2:
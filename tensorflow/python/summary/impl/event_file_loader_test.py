@@ -78,6 +78,18 @@ class EventFileLoaderTest(test_util.TensorFlowTestCase):
     loader = self._LoaderForTestFile(filename)
     self.assertEqual(len(list(loader.Load())), 2)
 
+  def testPositionAndStartOffset(self):
+    filename = tempfile.NamedTemporaryFile().name
+    self._WriteToFile(filename, EventFileLoaderTest.RECORD)
+    loader = self._LoaderForTestFile(filename)
+    self.assertEqual(loader.Position()[1], 0)
+    self.assertEqual(len(list(loader.Load())), 1)
+    path, offset = loader.Position()
+    self.assertEqual(offset, len(EventFileLoaderTest.RECORD))
+    self._WriteToFile(filename, EventFileLoaderTest.RECORD)
+    loader = event_file_loader.EventFileLoader(path, start_offset=offset)
+    self.assertEqual(len(list(loader.Load())), 1)
+
 
 if __name__ == '__main__':
   googletest.main()
@@ -0,0 +1,226 @@
+# Copyright 2015 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Parses only the wanted parts of serialized `Event` protos.
+
+Parsing an `Event` proto copies all of its summary values, including encoded
+images and graphs that may be megabytes large, even if they are then thrown
+away. An `EventParser` instead walks the protocol buffer wire format of the
+record, skips the bytes of the summary values and graphs that are not wanted
+without looking at them, and only parses the rest.
+
+It can also leave out the encoded images, and return where they are in the
+event file instead, so that they can be read when they are needed.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+
+import six
+
+from tensorflow.core.util import event_pb2
+
+## The location of an encoded image in an event file.
+ImageLocation = collections.namedtuple('ImageLocation',
+                                       ['path', 'offset', 'length'])
+
+## The kinds of summary values, as returned by `EventParser.Parse`.
+SCALAR = 'scalar'
+HISTOGRAM = 'histogram'
+IMAGE = 'image'
+
+# The size of the length and length CRC before the data of a record.
+_RECORD_HEADER_SIZE = 12
+
+# Wire types and the field numbers of event.proto and summary.proto.
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LENGTH_DELIMITED = 2
+_WIRE_FIXED32 = 5
+
+_EVENT_GRAPH_DEF = 4
+_EVENT_SUMMARY = 5
+_SUMMARY_VALUE = 1
+_VALUE_TAG = 1
+_VALUE_KINDS = {2: SCALAR, 4: IMAGE, 5: HISTOGRAM}
+_VALUE_IMAGE = 4
+_IMAGE_ENCODED_IMAGE_STRING = 4
+
+
+def _ReadVarint(data, pos):
+  """Returns the varint at `pos` in `data`, and the position after it."""
+  result = 0
+  shift = 0
+  while True:
+    byte = six.indexbytes(data, pos)
+    pos += 1
+    result |= (byte & 0x7f) << shift
+    if not byte & 0x80:
+      return result, pos
+    shift += 7
+
+
+def _EncodeVarint(value):
+  """Returns the bytes of a varint."""
+  encoded = bytearray()
+  while value > 0x7f:
+    encoded.append((value & 0x7f) | 0x80)
+    value >>= 7
+  encoded.append(value)
+  return bytes(encoded)
+
+
+def _LengthDelimited(field_number, value):
+  """Returns a serialized length-delimited field."""
+  return b''.join([_EncodeVarint(field_number << 3 | _WIRE_LENGTH_DELIMITED),
+                   _EncodeVarint(len(value)), value])
+
+
+def _Fields(data, start, end):
+  """Yields the fields of the message serialized in `data[start:end]`.
+
+  Args:
+    data: The bytes of a serialized message.
+    start: The position of the first field.
+    end: The position after the last field.
+
+  Yields:
+    A `(field_number, field_start, value_start, value_end)` tuple for each
+    field, where `data[field_start:value_end]` is the serialized field, and
+    `data[value_start:value_end]` its value.
+
+  Raises:
+    ValueError: If the message uses a wire type that is not supported.
+  """
+  pos = start
+  while pos < end:
+    field_start = pos
+    key, pos = _ReadVarint(data, pos)
+    wire_type = key & 7
+    if wire_type == _WIRE_VARINT:
+      value_start = pos
+      _, pos = _ReadVarint(data, pos)
+    elif wire_type == _WIRE_FIXED64:
+      value_start = pos
+      pos += 8
+    elif wire_type == _WIRE_LENGTH_DELIMITED:
+      length, value_start = _ReadVarint(data, pos)
+      pos = value_start + length
+    elif wire_type == _WIRE_FIXED32:
+      value_start = pos
+      pos += 4
+    else:
+      raise ValueError('Unsupported wire type %d' % wire_type)
+    yield key >> 3, field_start, value_start, pos
+
+
+class EventParser(object):
+  """Parses the wanted summary values of serialized `Event` protos."""
+
+  def __init__(self, wants_value, wants_graph=True, lazy_images=False):
+    """Creates a parser.
+
+    Args:
+      wants_value: A function that takes the kind of a summary value (one of
+        `SCALAR`, `HISTOGRAM` and `IMAGE`) and its tag, and returns whether
+        to parse it. Values of other kinds are never parsed.
+      wants_graph: Whether to parse the graphs of events.
+      lazy_images: Whether to leave out the encoded image strings of the
+        images that are parsed, and return their locations instead.
+    """
+    self._wants_value = wants_value
+    self._wants_graph = wants_graph
+    self._lazy_images = lazy_images
+
+  def Parse(self, record, path, record_offset):
+    """Parses the wanted parts of an event.
+
+    Args:
+      record: The serialized `Event` proto, i.e. the data of a record.
+      path: The path of the event file that the record is in.
+      record_offset: The offset of the record in the event file.
+
+    Returns:
+      A tuple `(event, image_locations)`. The `Event` proto only has the
+      wanted summary values, though it has a `summary` whenever the record
+      had one. `image_locations` maps the indices of the values in
+      `event.summary.value` whose encoded image strings were left out to
+      their `ImageLocation`s.
+    """
+    data_offset = record_offset + _RECORD_HEADER_SIZE
+    kept = []
+    image_locations = {}
+    for field, field_start, value_start, value_end in _Fields(
+        record, 0, len(record)):
+      if field == _EVENT_SUMMARY:
+        values = self._ParseSummary(record, value_start, value_end, path,
+                                    data_offset, image_locations)
+        kept.append(_LengthDelimited(_EVENT_SUMMARY, values))
+      elif field != _EVENT_GRAPH_DEF or self._wants_graph:
+        kept.append(record[field_start:value_end])
+    event = event_pb2.Event()
+    event.ParseFromString(b''.join(kept))
+    return event, image_locations
+
+  def _ParseSummary(self, record, start, end, path, data_offset,
+                    image_locations):
+    """Returns the serialized wanted values of a `Summary`."""
+    kept = []
+    for field, _, value_start, value_end in _Fields(record, start, end):
+      if field != _SUMMARY_VALUE:
+        continue
+      tag = None
+      kind = None
+      kind_span = None
+      for value_field, _, field_value_start, field_value_end in _Fields(
+          record, value_start, value_end):
+        if value_field == _VALUE_TAG:
+          tag = record[field_value_start:field_value_end].decode('utf-8')
+        elif value_field in _VALUE_KINDS:
+          kind = _VALUE_KINDS[value_field]
+          kind_span = (field_value_start, field_value_end)
+      if kind is None or not self._wants_value(kind, tag):
+        continue
+      if kind == IMAGE and self._lazy_images:
+        index = len(kept)
+        kept.append(self._LazyImageValue(record, value_start, value_end,
+                                         kind_span, path, data_offset,
+                                         image_locations, index))
+      else:
+        kept.append(record[value_start:value_end])
+    return b''.join(_LengthDelimited(_SUMMARY_VALUE, value) for value in kept)
+
+  def _LazyImageValue(self, record, start, end, image, path, data_offset,
+                      image_locations, index):
+    """Returns a serialized value without the encoded string of its image."""
+    image_start, image_end = image
+    image_fields = []
+    for field, field_start, value_start, value_end in _Fields(
+        record, image_start, image_end):
+      if field == _IMAGE_ENCODED_IMAGE_STRING:
+        image_locations[index] = ImageLocation(
+            path, data_offset + value_start, value_end - value_start)
+      else:
+        image_fields.append(record[field_start:value_end])
+    value_fields = []
+    for field, field_start, _, value_end in _Fields(record, start, end):
+      if field == _VALUE_IMAGE:
+        value_fields.append(_LengthDelimited(_VALUE_IMAGE,
+                                             b''.join(image_fields)))
+      else:
+        value_fields.append(record[field_start:value_end])
+    return b''.join(value_fields)
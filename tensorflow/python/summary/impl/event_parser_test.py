@@ -0,0 +1,113 @@
+# Copyright 2015 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Tests for event_parser."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from tensorflow.core.framework import graph_pb2
+from tensorflow.core.framework import summary_pb2
+from tensorflow.core.util import event_pb2
+from tensorflow.python.framework import test_util
+from tensorflow.python.platform import googletest
+from tensorflow.python.summary.impl import event_parser
+
+
+def _Event(*values, **kwargs):
+  return event_pb2.Event(wall_time=1.5, step=3,
+                         summary=summary_pb2.Summary(value=list(values)),
+                         **kwargs)
+
+
+def _Scalar(tag, value=1.0):
+  return summary_pb2.Summary.Value(tag=tag, simple_value=value)
+
+
+def _Image(tag, encoded_image_string):
+  image = summary_pb2.Summary.Image(height=2, width=3, colorspace=1,
+                                    encoded_image_string=encoded_image_string)
+  return summary_pb2.Summary.Value(tag=tag, image=image)
+
+
+def _Histogram(tag):
+  histo = summary_pb2.HistogramProto(min=1, max=2, num=3, bucket_limit=[2],
+                                     bucket=[3])
+  return summary_pb2.Summary.Value(tag=tag, histo=histo)
+
+
+class EventParserTest(test_util.TensorFlowTestCase):
+
+  def testParsesEverything(self):
+    graph_def = graph_pb2.GraphDef(node=[graph_pb2.NodeDef(name='A')])
+    for event in [_Event(_Scalar('s'), _Image('i', b'png'), _Histogram('h')),
+                  event_pb2.Event(wall_time=2, file_version='brain.Event:2'),
+                  event_pb2.Event(graph_def=graph_def.SerializeToString())]:
+      parser = event_parser.EventParser(lambda kind, tag: True)
+      parsed, image_locations = parser.Parse(event.SerializeToString(),
+                                             'path', 0)
+      self.assertProtoEquals(event, parsed)
+      self.assertEqual({}, image_locations)
+
+  def testFiltersValues(self):
+    event = _Event(_Scalar('s1'), _Scalar('s2'), _Histogram('h'),
+                   _Image('i', b'png'))
+    wanted = set([(event_parser.SCALAR, 's2'), (event_parser.IMAGE, 'i')])
+    parser = event_parser.EventParser(lambda kind, tag: (kind, tag) in wanted)
+    parsed, _ = parser.Parse(event.SerializeToString(), 'path', 0)
+    self.assertProtoEquals(_Event(_Scalar('s2'), _Image('i', b'png')), parsed)
+
+  def testKeepsEmptySummary(self):
+    event = _Event(_Scalar('s'))
+    parser = event_parser.EventParser(lambda kind, tag: False)
+    parsed, _ = parser.Parse(event.SerializeToString(), 'path', 0)
+    self.assertTrue(parsed.HasField('summary'))
+    self.assertEqual(0, len(parsed.summary.value))
+    self.assertEqual(3, parsed.step)
+
+  def testSkipsGraph(self):
+    graph_def = graph_pb2.GraphDef(node=[graph_pb2.NodeDef(name='A')])
+    event = event_pb2.Event(wall_time=2,
+                            graph_def=graph_def.SerializeToString())
+    parser = event_parser.EventParser(lambda kind, tag: True,
+                                      wants_graph=False)
+    parsed, _ = parser.Parse(event.SerializeToString(), 'path', 0)
+    self.assertFalse(parsed.HasField('graph_def'))
+    self.assertEqual(2, parsed.wall_time)
+
+  def testLazyImages(self):
+    event = _Event(_Image('i1', b'first image'), _Scalar('s'),
+                   _Image('i2', b'second image' * 100))
+    record = event.SerializeToString()
+    # Put the record after another one, and a record header of 12 bytes.
+    contents = b'x' * 50 + b'h' * 12 + record
+    parser = event_parser.EventParser(lambda kind, tag: True,
+                                      lazy_images=True)
+    parsed, image_locations = parser.Parse(record, 'path', 50)
+    self.assertEqual(['i1', 's', 'i2'],
+                     [value.tag for value in parsed.summary.value])
+    self.assertEqual(b'', parsed.summary.value[0].image.encoded_image_string)
+    self.assertEqual(3, parsed.summary.value[2].image.width)
+    self.assertEqual([0, 2], sorted(image_locations))
+    for index, image in [(0, b'first image'), (2, b'second image' * 100)]:
+      location = image_locations[index]
+      self.assertEqual('path', location.path)
+      self.assertEqual(image, contents[location.offset:location.offset +
+                                       location.length])
+
+
+if __name__ == '__main__':
+  googletest.main()
@@ -47,6 +47,33 @@ def CopyContents(gcs_path, byte_offset, local_file):
   local_file.flush()
 
 
+def ReadContents(gcs_path, byte_offset, max_bytes=None):
+  """Returns the contents of gcs_path from byte_offset onwards.
+
+  Args:
+    gcs_path: The path to the GCS object.
+    byte_offset: The byte offset to start reading from.
+    max_bytes: The maximum number of bytes to read, or None to read up to the
+      end of the object.
+
+  Returns:
+    The bytes read. There are fewer than `max_bytes` only if the end of the
+    object was reached.
+
+  Raises:
+    ValueError: If offset is negative or gcs_path is not a valid GCS path.
+    CalledProcessError: If the gsutil command failed.
+  """
+  if byte_offset < 0:
+    raise ValueError('byte_offset must not be negative')
+  if max_bytes is None:
+    byte_range = '%d-' % byte_offset
+  else:
+    byte_range = '%d-%d' % (byte_offset, byte_offset + max_bytes - 1)
+  command = ['gsutil', 'cat', '-r', byte_range, gcs_path]
+  return subprocess.check_output(command)
+
+
 def ListDirectory(directory):
   """Lists all files in the given directory."""
   command = ['gsutil', 'ls', directory]
@@ -0,0 +1,209 @@
+# Copyright 2015 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Reads Google Cloud Storage objects with HTTP range requests.
+
+Unlike `gcs.ReadContents`, which starts a gsutil process for every read, a
+`GCSClient` keeps its HTTP connections open and reuses them, so reading the
+few new bytes of an event file costs a single request. The client talks to
+any server that serves `<endpoint>/<bucket>/<object>` and honors `Range`
+headers, like the GCS XML API or a local fake object store in tests.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import errno
+import socket
+import subprocess
+import threading
+import time
+
+from six.moves import http_client
+from six.moves import urllib
+
+from tensorflow.python.platform import logging
+from tensorflow.python.summary.impl import gcs
+
+DEFAULT_ENDPOINT = 'https://storage.googleapis.com'
+
+# How long the access tokens of `GcloudAccessTokens` are used. They expire
+# after an hour.
+_ACCESS_TOKEN_LIFETIME_SECS = 30 * 60
+
+
+class GCSClient(object):
+  """Reads byte ranges of GCS objects over pooled HTTP connections.
+
+  The client is thread-safe. Each read uses an idle connection if there is
+  one, and returns it to the pool afterwards.
+  """
+
+  def __init__(self, endpoint=DEFAULT_ENDPOINT, access_token_fn=None,
+               timeout=60, max_idle_connections=8):
+    """Creates a client.
+
+    Args:
+      endpoint: The URL of the object store, e.g. `DEFAULT_ENDPOINT`.
+      access_token_fn: An optional function that returns an OAuth2 access
+        token to send with each request, or None to send none. See
+        `GcloudAccessTokens`.
+      timeout: The timeout of the connections in seconds.
+      max_idle_connections: The maximum number of idle connections to keep.
+
+    Raises:
+      ValueError: If the scheme of the endpoint is not http or https.
+    """
+    url = urllib.parse.urlparse(endpoint)
+    if url.scheme == 'https':
+      self._connection_class = http_client.HTTPSConnection
+    elif url.scheme == 'http':
+      self._connection_class = http_client.HTTPConnection
+    else:
+      raise ValueError('The endpoint must be an http or https URL, was %s' %
+                       endpoint)
+    self._host = url.netloc
+    self._path_prefix = url.path.rstrip('/')
+    self._access_token_fn = access_token_fn
+    self._timeout = timeout
+    self._max_idle_connections = max_idle_connections
+    self._idle_connections = []
+    self._lock = threading.Lock()
+
+  def ReadContents(self, gcs_path, byte_offset, max_bytes=None):
+    """Returns the contents of gcs_path from byte_offset onwards.
+
+    Like `gcs.ReadContents`, but with an HTTP range request.
+
+    Args:
+      gcs_path: The path to the GCS object.
+      byte_offset: The byte offset to start reading from.
+      max_bytes: The maximum number of bytes to read, or None to read up to
+        the end of the object.
+
+    Returns:
+      The bytes read. There are fewer than `max_bytes` only if the end of the
+      object was reached.
+
+    Raises:
+      ValueError: If offset is negative or gcs_path is not a valid GCS path.
+      IOError: If the object does not exist or cannot be read.
+    """
+    if byte_offset < 0:
+      raise ValueError('byte_offset must not be negative')
+    if max_bytes is None:
+      byte_range = 'bytes=%d-' % byte_offset
+    else:
+      byte_range = 'bytes=%d-%d' % (byte_offset, byte_offset + max_bytes - 1)
+    headers = {'Range': byte_range}
+    if self._access_token_fn is not None:
+      token = self._access_token_fn()
+      if token:
+        headers['Authorization'] = 'Bearer %s' % token
+    status, data = self._Get(self._ObjectPath(gcs_path), headers)
+    if status == http_client.PARTIAL_CONTENT:
+      return data
+    if status == http_client.OK:
+      # The server ignored the range and sent the whole object.
+      end = None if max_bytes is None else byte_offset + max_bytes
+      return data[byte_offset:end]
+    if status == http_client.REQUESTED_RANGE_NOT_SATISFIABLE:
+      # The offset is at or after the end of the object.
+      return b''
+    if status == http_client.NOT_FOUND:
+      raise IOError(errno.ENOENT, 'No such GCS object', gcs_path)
+    raise IOError('Reading %s failed with HTTP status %d' % (gcs_path, status))
+
+  def Close(self):
+    """Closes the idle connections."""
+    with self._lock:
+      connections = self._idle_connections
+      self._idle_connections = []
+    for connection in connections:
+      connection.close()
+
+  def _ObjectPath(self, gcs_path):
+    if not gcs.IsGCSPath(gcs_path):
+      raise ValueError('A GCS path is required, was %s' % gcs_path)
+    bucket, _, name = gcs_path[len(gcs.PATH_PREFIX):].partition('/')
+    if not bucket or not name:
+      raise ValueError('%s does not name a GCS object' % gcs_path)
+    return '%s/%s/%s' % (self._path_prefix, urllib.parse.quote(bucket),
+                         urllib.parse.quote(name))
+
+  def _Get(self, path, headers):
+    """Sends a GET request, and returns the status and body of the response.
+
+    A request on a reused connection that fails is retried once on a new
+    connection, since the server may have closed the idle connection.
+    """
+    for attempt in range(2):
+      connection, reused = self._TakeConnection(new=attempt > 0)
+      try:
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        data = response.read()
+      except (http_client.HTTPException, socket.error) as e:
+        connection.close()
+        if reused:
+          logging.debug('Retrying %s on a new connection after: %s', path, e)
+          continue
+        raise IOError('Reading %s failed: %s' % (path, e))
+      if response.will_close:
+        connection.close()
+      else:
+        self._ReturnConnection(connection)
+      return response.status, data
+
+  def _TakeConnection(self, new):
+    """Returns an idle connection or a new one, and whether it is reused."""
+    if not new:
+      with self._lock:
+        if self._idle_connections:
+          return self._idle_connections.pop(), True
+    return self._connection_class(self._host, timeout=self._timeout), False
+
+  def _ReturnConnection(self, connection):
+    with self._lock:
+      if len(self._idle_connections) < self._max_idle_connections:
+        self._idle_connections.append(connection)
+        return
+    connection.close()
+
+
+class GcloudAccessTokens(object):
+  """Gets OAuth2 access tokens from the gcloud tool, for `GCSClient`.
+
+  Calling an instance returns the token of the active gcloud account, which
+  is fetched again after half an hour, or None if there is none.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._token = None
+    self._expiry = 0
+
+  def __call__(self):
+    with self._lock:
+      if time.time() >= self._expiry:
+        command = ['gcloud', 'auth', 'print-access-token']
+        try:
+          self._token = subprocess.check_output(command).strip().decode()
+        except (OSError, subprocess.CalledProcessError) as e:
+          logging.warn('Sending GCS requests without an access token, since '
+                       'gcloud failed: %s', e)
+          self._token = None
+        self._expiry = time.time() + _ACCESS_TOKEN_LIFETIME_SECS
+      return self._token
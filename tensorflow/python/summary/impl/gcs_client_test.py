@@ -0,0 +1,177 @@
+# Copyright 2015 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Tests for gcs_client, against a fake object store on localhost."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import re
+import threading
+
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+from six.moves import urllib
+
+from tensorflow.python.framework import test_util
+from tensorflow.python.platform import googletest
+from tensorflow.python.summary.impl import gcs_client
+from tensorflow.python.summary.impl import gcs_file_loader
+
+
+class _FakeObjectStoreHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+  """Serves the objects of the server with support for `Range` headers."""
+
+  protocol_version = 'HTTP/1.1'
+
+  def do_GET(self):  # pylint: disable=invalid-name
+    self.server.connections.add(self.client_address)
+    self.server.requests.append((self.path, dict(self.headers.items())))
+    contents = self.server.objects.get(urllib.parse.unquote(self.path))
+    if contents is None:
+      self._Respond(404, b'')
+      return
+    match = re.match(r'bytes=(\d+)-(\d*)$', self.headers.get('Range', ''))
+    if match is None or self.server.ignore_ranges:
+      self._Respond(200, contents)
+      return
+    start = int(match.group(1))
+    end = int(match.group(2)) + 1 if match.group(2) else len(contents)
+    if start >= len(contents):
+      self._Respond(416, b'')
+      return
+    self._Respond(206, contents[start:end])
+
+  def _Respond(self, status, body):
+    self.send_response(status)
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, *args):
+    pass
+
+
+class _FakeObjectStore(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+  """An object store that serves `objects`, a dict from paths to contents."""
+
+  daemon_threads = True
+
+  def __init__(self):
+    BaseHTTPServer.HTTPServer.__init__(self, ('localhost', 0),
+                                       _FakeObjectStoreHandler)
+    self.objects = {}
+    self.ignore_ranges = False
+    self.connections = set()
+    self.requests = []
+
+
+class GCSClientTest(test_util.TensorFlowTestCase):
+
+  def setUp(self):
+    self._server = _FakeObjectStore()
+    self._server_thread = threading.Thread(target=self._server.serve_forever)
+    self._server_thread.daemon = True
+    self._server_thread.start()
+    self._client = gcs_client.GCSClient(
+        'http://localhost:%d/storage' % self._server.server_address[1])
+
+  def tearDown(self):
+    self._client.Close()
+    self._server.shutdown()
+    self._server.server_close()
+
+  def testReadContents(self):
+    self._server.objects['/storage/bucket/dir/object'] = b'0123456789'
+    self.assertEqual(b'0123456789',
+                     self._client.ReadContents('gs://bucket/dir/object', 0))
+    self.assertEqual(b'3456789',
+                     self._client.ReadContents('gs://bucket/dir/object', 3))
+    self.assertEqual(b'34', self._client.ReadContents(
+        'gs://bucket/dir/object', 3, max_bytes=2))
+    self.assertEqual(b'', self._client.ReadContents('gs://bucket/dir/object',
+                                                    10))
+    self.assertEqual(b'', self._client.ReadContents('gs://bucket/dir/object',
+                                                    20, max_bytes=5))
+
+  def testServerIgnoresRanges(self):
+    self._server.objects['/storage/bucket/object'] = b'0123456789'
+    self._server.ignore_ranges = True
+    self.assertEqual(b'34', self._client.ReadContents('gs://bucket/object', 3,
+                                                      max_bytes=2))
+    self.assertEqual(b'', self._client.ReadContents('gs://bucket/object', 20))
+
+  def testReusesConnections(self):
+    self._server.objects['/storage/bucket/object'] = b'0123456789'
+    for offset in range(10):
+      self._client.ReadContents('gs://bucket/object', offset)
+    self.assertEqual(1, len(self._server.connections))
+
+  def testReconnectsAfterServerClosesConnection(self):
+    self._server.objects['/storage/bucket/object'] = b'0123456789'
+    self._client.ReadContents('gs://bucket/object', 0)
+    # Close the idle connection on the client side, as if the server had.
+    self._client._idle_connections[0].sock.close()
+    self.assertEqual(b'56789',
+                     self._client.ReadContents('gs://bucket/object', 5))
+
+  def testAccessToken(self):
+    self._server.objects['/storage/bucket/object'] = b'0123456789'
+    client = gcs_client.GCSClient(
+        'http://localhost:%d/storage' % self._server.server_address[1],
+        access_token_fn=lambda: 'secret')
+    client.ReadContents('gs://bucket/object', 0)
+    client.Close()
+    self.assertEqual('Bearer secret',
+                     self._server.requests[-1][1].get('Authorization'))
+
+  def testErrors(self):
+    with self.assertRaises(IOError):
+      self._client.ReadContents('gs://bucket/missing', 0)
+    with self.assertRaises(ValueError):
+      self._client.ReadContents('gs://bucket/object', -1)
+    with self.assertRaises(ValueError):
+      self._client.ReadContents('/local/path', 0)
+    with self.assertRaises(ValueError):
+      self._client.ReadContents('gs://bucket', 0)
+    with self.assertRaises(ValueError):
+      gcs_client.GCSClient('ftp://localhost')
+
+  def testLoadEventsWithClient(self):
+    # A couple of simple records.
+    records = [
+        b'\x18\x00\x00\x00\x00\x00\x00\x00\xa3\x7fK"\t\x00\x00\xc0%\xddu'
+        b'\xd5A\x1a\rbrain.Event:1\xec\xf32\x8d',
+        b'\x18\x00\x00\x00\x00\x00\x00\x00\xa3\x7fK"\t\x00\x00\x00\'\xe6'
+        b'\xb3\xd5A\x1a\rbrain.Event:2jM\x0b\x15'
+    ]
+    path = '/storage/bucket/run/events.tfevents.1'
+    self._server.objects[path] = records[0] + records[1][:5]
+    loader = gcs_file_loader.GCSFileLoader(
+        'gs://bucket/run/events.tfevents.1', client=self._client)
+    events = list(loader.Load())
+    self.assertEqual(['brain.Event:1'],
+                     [event.file_version for event in events])
+    self._server.objects[path] += records[1][5:]
+    events = list(loader.Load())
+    self.assertEqual(['brain.Event:2'],
+                     [event.file_version for event in events])
+    self.assertEqual(0, len(list(loader.Load())))
+    self.assertEqual(1, len(self._server.connections))
+
+
+if __name__ == '__main__':
+  googletest.main()
@@ -17,42 +17,141 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-import tempfile
+import struct
 
 from tensorflow.core.util import event_pb2
-from tensorflow.python import pywrap_tensorflow
 from tensorflow.python.platform import app
 from tensorflow.python.platform import logging
 from tensorflow.python.summary.impl import gcs
-from tensorflow.python.util import compat
+
+# The number of bytes that GCSFileLoader reads at a time.
+_READ_SIZE = 16 * 1024 * 1024
+
+# A record starts with its length as a uint64 and the masked CRC-32C of the
+# length as a uint32, and ends with the masked CRC-32C of its data.
+_HEADER_FORMAT = '<QI'
+_HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
+_FOOTER_SIZE = 4
+
+
+def _Crc32cTable():
+  table = []
+  for i in range(256):
+    crc = i
+    for _ in range(8):
+      crc = (crc >> 1) ^ (0x82f63b78 if crc & 1 else 0)
+    table.append(crc)
+  return table
+
+_CRC32C_TABLE = _Crc32cTable()
+
+
+def _MaskedCrc32c(data):
+  """Returns the masked CRC-32C of a bytearray, as in TFRecord files."""
+  crc = 0xffffffff
+  for byte in data:
+    crc = _CRC32C_TABLE[(crc ^ byte) & 0xff] ^ (crc >> 8)
+  crc ^= 0xffffffff
+  return (((crc >> 15) | (crc << 17)) + 0xa282ead8) & 0xffffffff
 
 
 class GCSFileLoader(object):
   """A GCSFileLoader loads Event protos from a path to GCS storage.
 
-  The GCSFileLoader keeps track of the offset in the file, copies the contents
-  of the file to local disk, reads it, and then immediately deletes the file.
+  The GCSFileLoader reads the bytes of the file that it has not read yet into
+  memory, `_READ_SIZE` bytes at a time, and parses the records in them. The
+  bytes of a record that is not completely written yet are kept until the
+  rest of it is read.
+
+  Only the CRC of the length of each record is checked, which detects reads
+  that are not aligned with records. Checking the CRC of the data in Python
+  would take longer than downloading it, and GCS already checks the integrity
+  of the data that it sends.
   """
 
-  def __init__(self, gcs_path):
+  def __init__(self, gcs_path, start_offset=0, client=None, parse_fn=None):
+    """Creates a loader.
+
+    Args:
+      gcs_path: The GCS path of the event file.
+      start_offset: The offset of the first record to load, e.g. an offset
+        returned by `Position` before.
+      client: An optional `gcs_client.GCSClient` to read the file with. If
+        None, the file is read with gsutil.
+      parse_fn: An optional function that takes the data of a record, the GCS
+        path and the offset of the record in the file, and returns the value
+        to yield. By default the data is parsed as an `Event` proto.
+
+    Raises:
+      ValueError: If `gcs_path` is not a GCS path.
+    """
     if not gcs.IsGCSPath(gcs_path):
       raise ValueError('A GCS path is required')
     self._gcs_path = gcs_path
-    self._gcs_offset = 0
+    if client is None:
+      self._read_contents = gcs.ReadContents
+    else:
+      self._read_contents = client.ReadContents
+    self._parse_fn = parse_fn
+    # The offset of the end of the last record that was loaded, and the bytes
+    # read after it. The bytes before _buffer_start were already parsed.
+    self._gcs_offset = start_offset
+    self._buffer = bytearray()
+    self._buffer_start = 0
+    # Set when a corrupt record is found, after which nothing more is loaded.
+    self._corrupt = False
 
   def Load(self):
-    # Create a temp file to hold the contents that we haven't seen yet.
-    with tempfile.NamedTemporaryFile(prefix='tf-gcs-') as temp_file:
-      name = temp_file.name
-      logging.debug('Temp file created at %s', name)
-      gcs.CopyContents(self._gcs_path, self._gcs_offset, temp_file)
-      reader = pywrap_tensorflow.PyRecordReader_New(compat.as_bytes(name), 0)
-      while reader.GetNext():
+    """Loads all new events from GCS.
+
+    Calling Load multiple times in a row will not 'drop' events as long as the
+    return value is not iterated over.
+
+    Yields:
+      All events that were written to GCS that have not been yielded yet.
+    """
+    while not self._corrupt:
+      read_offset = self._gcs_offset + len(self._buffer) - self._buffer_start
+      data = self._read_contents(self._gcs_path, read_offset, _READ_SIZE)
+      del self._buffer[:self._buffer_start]
+      self._buffer_start = 0
+      self._buffer.extend(data)
+      for record, offset in self._ParseRecords():
+        if self._parse_fn is not None:
+          yield self._parse_fn(record, self._gcs_path, offset)
+          continue
         event = event_pb2.Event()
-        event.ParseFromString(reader.record())
+        event.ParseFromString(record)
         yield event
-      logging.debug('No more events in %s', name)
-      self._gcs_offset += reader.offset()
+      if len(data) < _READ_SIZE:
+        break
+    logging.debug('No more events in %s', self._gcs_path)
+
+  def Position(self):
+    """Returns the GCS path and the offset after the last loaded event."""
+    return (self._gcs_path, self._gcs_offset)
+
+  def _ParseRecords(self):
+    """Yields the complete records in the buffer, and their offsets."""
+    buf = self._buffer
+    while True:
+      start = self._buffer_start
+      if len(buf) - start < _HEADER_SIZE:
+        return
+      length, length_crc = struct.unpack_from(_HEADER_FORMAT, buf, start)
+      if _MaskedCrc32c(buf[start:start + 8]) != length_crc:
+        logging.error('Corrupt record at offset %d of %s, not loading any '
+                      'more events from it', self._gcs_offset, self._gcs_path)
+        self._corrupt = True
+        return
+      end = start + _HEADER_SIZE + length + _FOOTER_SIZE
+      if len(buf) < end:
+        return
+      record = bytes(buf[start + _HEADER_SIZE:end - _FOOTER_SIZE])
+      offset = self._gcs_offset
+      self._buffer_start = end
+      self._gcs_offset += end - start
+      yield record, offset
 
 
 def main(argv):
@@ -28,14 +28,16 @@ class GCSFileLoaderTest(tf.test.TestCase):
 
   def setUp(self):
     self._append_contents_call_count = 0
-    # A record containing a simple event.
+    # The contents of the fake GCS object.
+    self._contents = b''
     self._stubs = googletest.StubOutForTesting()
-    self._stubs.Set(gcs, 'CopyContents', self._MockCopyContents)
+    self._stubs.Set(gcs, 'ReadContents', self._MockReadContents)
 
   def tearDown(self):
     self._stubs.CleanUp()
 
   def testLoad(self):
+    self._stubs.Set(gcs, 'ReadContents', self._MockAppendingReadContents)
     loader = gcs_file_loader.GCSFileLoader('gs://some-fake-url')
     events = list(loader.Load())
     self.assertEqual(len(events), 1)
@@ -47,6 +49,34 @@ class GCSFileLoaderTest(tf.test.TestCase):
     self.assertEqual(len(events), 0)
     self.assertEqual(self._append_contents_call_count, 3)
 
+  def testPartiallyWrittenRecord(self):
+    loader = gcs_file_loader.GCSFileLoader('gs://some-fake-url')
+    self._contents = self.MOCK_RECORDS[0] + self.MOCK_RECORDS[1][:10]
+    events = list(loader.Load())
+    self.assertEqual(len(events), 1)
+    self.assertEqual(loader.Position(),
+                     ('gs://some-fake-url', len(self.MOCK_RECORDS[0])))
+    self._contents += self.MOCK_RECORDS[1][10:]
+    events = list(loader.Load())
+    self.assertEqual(len(events), 1)
+    self.assertEqual(events[0].file_version, 'brain.Event:2')
+
+  def testStartOffset(self):
+    self._contents = self.MOCK_RECORDS[0] + self.MOCK_RECORDS[1]
+    loader = gcs_file_loader.GCSFileLoader(
+        'gs://some-fake-url', start_offset=len(self.MOCK_RECORDS[0]))
+    events = list(loader.Load())
+    self.assertEqual(len(events), 1)
+    self.assertEqual(events[0].file_version, 'brain.Event:2')
+    self.assertEqual(loader.Position(),
+                     ('gs://some-fake-url', len(self._contents)))
+
+  def testCorruptRecord(self):
+    self._contents = self.MOCK_RECORDS[0] + b'\xff' + self.MOCK_RECORDS[1]
+    loader = gcs_file_loader.GCSFileLoader('gs://some-fake-url')
+    self.assertEqual(len(list(loader.Load())), 1)
+    self.assertEqual(len(list(loader.Load())), 0)
+
   # A couple of simple records.
   MOCK_RECORDS = [
       b'\x18\x00\x00\x00\x00\x00\x00\x00\xa3\x7fK"\t\x00\x00\xc0%\xddu'
@@ -55,7 +85,11 @@ class GCSFileLoaderTest(tf.test.TestCase):
       b'\xb3\xd5A\x1a\rbrain.Event:2jM\x0b\x15'
   ]
 
-  def _MockCopyContents(self, gcs_path, offset, local_file):
+  def _MockReadContents(self, gcs_path, offset, max_bytes=None):
+    end = None if max_bytes is None else offset + max_bytes
+    return self._contents[offset:end]
+
+  def _MockAppendingReadContents(self, gcs_path, offset, max_bytes=None):
     if self._append_contents_call_count == 0:
       self.assertEqual(offset, 0)
     elif self._append_contents_call_count == 1:
@@ -65,9 +99,9 @@ class GCSFileLoaderTest(tf.test.TestCase):
                        len(self.MOCK_RECORDS[0]) + len(self.MOCK_RECORDS[1]))
 
     if self._append_contents_call_count < len(self.MOCK_RECORDS):
-      local_file.write(self.MOCK_RECORDS[self._append_contents_call_count])
-      local_file.flush()
+      self._contents += self.MOCK_RECORDS[self._append_contents_call_count]
     self._append_contents_call_count += 1
+    return self._MockReadContents(gcs_path, offset, max_bytes)
 
 
 if __name__ == '__main__':
@@ -23,6 +23,8 @@ import collections
 import random
 import threading
 
+import numpy as np
+
 
 class Reservoir(object):
   """A map-to-arrays container, with deterministic Reservoir Sampling.
@@ -71,7 +73,7 @@ class Reservoir(object):
     if size < 0 or size != round(size):
       raise ValueError('size must be nonegative integer, was %s' % size)
     self._buckets = collections.defaultdict(
-        lambda: _ReservoirBucket(size, random.Random(seed)))
+        lambda: self._NewBucket(size, random.Random(seed)))
     # _mutex guards the keys - creating new keys, retreiving by key, etc
     # the internal items are guarded by the ReservoirBuckets' internal mutexes
     self._mutex = threading.Lock()
@@ -138,6 +140,93 @@ class Reservoir(object):
         return sum(bucket.FilterItems(filterFn)
                    for bucket in self._buckets.values())
 
+  def GetState(self):
+    """Returns the items and sampling state of every key.
+
+    Returns:
+      A picklable dict from each key to the state of its bucket. `SetState`
+      of a reservoir with the same size and seed restores it, after which
+      both reservoirs sample new items identically.
+    """
+    with self._mutex:
+      buckets = list(self._buckets.items())
+    return {key: bucket.GetState() for key, bucket in buckets}
+
+  def SetState(self, state):
+    """Replaces all keys and items with a state returned by `GetState`.
+
+    Args:
+      state: A dict returned by `GetState`.
+    """
+    with self._mutex:
+      self._buckets.clear()
+      for key, bucket_state in state.items():
+        self._buckets[key].SetState(bucket_state)
+
+  def _NewBucket(self, size, rand):
+    """Creates the bucket that holds the items for a new key."""
+    return _ReservoirBucket(size, rand)
+
+
+class ColumnarReservoir(Reservoir):
+  """A `Reservoir` of namedtuples that stores each field in a NumPy array.
+
+  Items must be instances of `item_type`, and each of their fields is stored
+  in a growable array of the corresponding dtype, rather than as one Python
+  object per item. Items are sampled exactly as in `Reservoir`, so for the
+  same seed and size both keep the same items.
+
+  `Items()` rebuilds the stored items as `item_type` namedtuples, and
+  `Columns()` returns the stored fields as arrays, without creating an object
+  per item.
+  """
+
+  def __init__(self, size, item_type, column_dtypes, seed=0):
+    """Creates a new columnar reservoir.
+
+    Args:
+      size: The number of values to keep in the reservoir for each tag. If 0,
+        all values will be kept.
+      item_type: The namedtuple type of the items.
+      column_dtypes: The NumPy dtype of each field of `item_type`, in order.
+      seed: The seed of the random number generator to use when sampling.
+
+    Raises:
+      ValueError: If size is negative or not an integer, or if there is not
+        one dtype per field of `item_type`.
+    """
+    if len(column_dtypes) != len(item_type._fields):
+      raise ValueError('Expected %d column dtypes for %s, got %d' %
+                       (len(item_type._fields), item_type.__name__,
+                        len(column_dtypes)))
+    self._item_type = item_type
+    self._column_dtypes = tuple(column_dtypes)
+    super(ColumnarReservoir, self).__init__(size, seed=seed)
+
+  def Columns(self, key):
+    """Return the fields of the items associated with given key, as arrays.
+
+    Args:
+      key: The key for which we are finding associated items.
+
+    Raises:
+      KeyError: If the key is not found in the reservoir.
+
+    Returns:
+      A tuple with one 1-D array per field of the items, in the order of
+      `item_type._fields`. The arrays are copies, and are not modified by
+      later calls to `AddItem` or `FilterItems`.
+    """
+    with self._mutex:
+      if key not in self._buckets:
+        raise KeyError('Key %s was not found in Reservoir' % key)
+      bucket = self._buckets[key]
+    return bucket.Columns()
+
+  def _NewBucket(self, size, rand):
+    return _ColumnarReservoirBucket(size, self._item_type, self._column_dtypes,
+                                    rand)
+
 
 class _ReservoirBucket(object):
   """A container for items from a stream, that implements reservoir sampling.
@@ -232,3 +321,169 @@ class _ReservoirBucket(object):
     """Get all the items in the bucket."""
     with self._mutex:
       return self.items
+
+  def GetState(self):
+    """Get the items, the number of items seen and the random state."""
+    with self._mutex:
+      return (list(self.items), self._num_items_seen, self._random.getstate())
+
+  def SetState(self, state):
+    """Restore a state returned by GetState."""
+    items, num_items_seen, random_state = state
+    with self._mutex:
+      self.items = list(items)
+      self._num_items_seen = num_items_seen
+      self._random.setstate(random_state)
+
+
+# The initial number of items that a _ColumnarReservoirBucket has room for.
+_INITIAL_COLUMN_CAPACITY = 16
+
+
+class _ColumnarReservoirBucket(object):
+  """A _ReservoirBucket that stores each field of its items in an array.
+
+  It makes the same sampling decisions as _ReservoirBucket, so that for the
+  same random number generator both keep the same items.
+  """
+
+  def __init__(self, _max_size, item_type, column_dtypes, _random=None):
+    """Create the _ColumnarReservoirBucket.
+
+    Args:
+      _max_size: The maximum size the reservoir bucket may grow to. If size is
+        zero, the bucket has unbounded size.
+      item_type: The namedtuple type of the items.
+      column_dtypes: The NumPy dtype of each field of `item_type`, in order.
+      _random: The random number generator to use. If not specified, defaults to
+        random.Random(0).
+
+    Raises:
+      ValueError: if the size is not a nonnegative integer.
+    """
+    if _max_size < 0 or _max_size != round(_max_size):
+      raise ValueError('_max_size must be nonegative int, was %s' % _max_size)
+    capacity = _INITIAL_COLUMN_CAPACITY
+    if _max_size:
+      capacity = min(capacity, int(_max_size))
+    self._item_type = item_type
+    self._columns = [np.empty(capacity, dtype=dtype) for dtype in column_dtypes]
+    self._size = 0
+    # This mutex protects the columns, ensuring that calls to Items, Columns
+    # and AddItem are thread-safe
+    self._mutex = threading.Lock()
+    self._max_size = _max_size
+    self._num_items_seen = 0
+    if _random is not None:
+      self._random = _random
+    else:
+      self._random = random.Random(0)
+
+  def _Grow(self):
+    """Doubles the capacity of the columns, up to _max_size."""
+    capacity = 2 * len(self._columns[0])
+    if self._max_size:
+      capacity = min(capacity, int(self._max_size))
+    for i, column in enumerate(self._columns):
+      grown = np.empty(capacity, dtype=column.dtype)
+      grown[:self._size] = column[:self._size]
+      self._columns[i] = grown
+
+  def _SetItem(self, index, item):
+    for column, field in zip(self._columns, item):
+      column[index] = field
+
+  def AddItem(self, item):
+    """Add an item to the bucket, replacing an old item if necessary.
+
+    See _ReservoirBucket.AddItem. Removing an item from the middle of the bucket
+    shifts the later items of each column down by one in place.
+
+    Args:
+      item: The item to add to the bucket.
+    """
+    with self._mutex:
+      if self._size < self._max_size or self._max_size == 0:
+        if self._size == len(self._columns[0]):
+          self._Grow()
+        self._SetItem(self._size, item)
+        self._size += 1
+      else:
+        r = self._random.randint(0, self._num_items_seen)
+        if r < self._max_size:
+          last = self._size - 1
+          for column in self._columns:
+            column[r:last] = column[r + 1:self._size]
+        self._SetItem(self._size - 1, item)
+      self._num_items_seen += 1
+
+  def FilterItems(self, filterFn):
+    """Filter items in the bucket, using a filtering function.
+
+    `filterFn` is first called once with an item whose fields are the columns
+    of the bucket. If it returns one boolean per item, that is used as the mask
+    of items to keep. Otherwise `filterFn` is called on each item in turn. See
+    _ReservoirBucket.FilterItems for how self._num_items_seen is updated.
+
+    Args:
+      filterFn: A function that returns True for items to be kept.
+
+    Returns:
+      The number of items removed from the bucket.
+    """
+    with self._mutex:
+      size_before = self._size
+      columns = [column[:size_before] for column in self._columns]
+      try:
+        keep = np.asarray(filterFn(self._item_type(*columns)), dtype=bool)
+      except (TypeError, ValueError):
+        keep = None
+      if keep is None or keep.shape != (size_before,):
+        keep = np.array([bool(filterFn(item)) for item in self._Items()],
+                        dtype=bool)
+      self._size = int(np.count_nonzero(keep))
+      for column in columns:
+        column[:self._size] = column[keep]
+      size_diff = size_before - self._size
+
+      # Estimate a correction the number of items seen
+      prop_remaining = self._size / float(
+          size_before) if size_before > 0 else 0
+      self._num_items_seen = int(round(self._num_items_seen * prop_remaining))
+      return size_diff
+
+  def _Items(self):
+    fields = [column[:self._size].tolist() for column in self._columns]
+    return [self._item_type(*item_fields) for item_fields in zip(*fields)]
+
+  def Items(self):
+    """Get all the items in the bucket."""
+    with self._mutex:
+      return self._Items()
+
+  def Columns(self):
+    """Get copies of the columns of the items in the bucket."""
+    with self._mutex:
+      return tuple(column[:self._size].copy() for column in self._columns)
+
+  def GetState(self):
+    """Get the columns, the number of items seen and the random state."""
+    with self._mutex:
+      return (tuple(column[:self._size].copy() for column in self._columns),
+              self._num_items_seen, self._random.getstate())
+
+  def SetState(self, state):
+    """Restore a state returned by GetState."""
+    columns, num_items_seen, random_state = state
+    with self._mutex:
+      size = len(columns[0])
+      capacity = max(size, _INITIAL_COLUMN_CAPACITY)
+      if self._max_size:
+        capacity = max(size, min(capacity, int(self._max_size)))
+      for i, column in enumerate(columns):
+        restored = np.empty(capacity, dtype=self._columns[i].dtype)
+        restored[:size] = column
+        self._columns[i] = restored
+      self._size = size
+      self._num_items_seen = num_items_seen
+      self._random.setstate(random_state)
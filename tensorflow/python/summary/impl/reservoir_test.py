@@ -17,6 +17,9 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+
+import numpy as np
 from six.moves import xrange  # pylint: disable=redefined-builtin
 import tensorflow as tf
 
@@ -109,6 +112,22 @@ class ReservoirTest(tf.test.TestCase):
     self.assertEqual(len(r.Items('key1')), 4)
     self.assertEqual(len(r.Items('key2')), 8)
 
+  def testSetState(self):
+    r1 = reservoir.Reservoir(10)
+    for i in xrange(100):
+      r1.AddItem('key1', i)
+    r1.AddItem('key2', 0)
+    r2 = reservoir.Reservoir(10)
+    r2.AddItem('key3', 0)
+    r2.SetState(r1.GetState())
+    self.assertItemsEqual(r2.Keys(), ['key1', 'key2'])
+    # Both reservoirs keep sampling identically.
+    for i in xrange(100, 200):
+      r1.AddItem('key1', i)
+      r2.AddItem('key1', i)
+    self.assertEqual(r1.Items('key1'), r2.Items('key1'))
+    self.assertEqual(r1.Items('key2'), r2.Items('key2'))
+
 
 class ReservoirBucketTest(tf.test.TestCase):
 
@@ -191,6 +210,75 @@ class ReservoirBucketTest(tf.test.TestCase):
                      int(round(10000 * (1 - float(num_removed) / 100))))
 
 
+_Point = collections.namedtuple('_Point', ['step', 'value'])
+
+
+class ColumnarReservoirTest(tf.test.TestCase):
+
+  def _NewColumnar(self, size, seed=0):
+    return reservoir.ColumnarReservoir(
+        size, _Point, (np.int64, np.float64), seed=seed)
+
+  def testRequiresOneDtypePerField(self):
+    with self.assertRaises(ValueError):
+      reservoir.ColumnarReservoir(10, _Point, (np.int64,))
+
+  def testSamplesLikeReservoir(self):
+    for size in (0, 1, 10, 100):
+      r = reservoir.Reservoir(size, seed=7)
+      c = self._NewColumnar(size, seed=7)
+      for i in xrange(1000):
+        r.AddItem('key', _Point(i, i / 2.0))
+        c.AddItem('key', _Point(i, i / 2.0))
+      self.assertEqual(r.Items('key'), c.Items('key'))
+
+  def testColumns(self):
+    c = self._NewColumnar(0)
+    for i in xrange(40):
+      c.AddItem('key', _Point(i, i * 1.5))
+    steps, values = c.Columns('key')
+    self.assertEqual(steps.dtype, np.int64)
+    self.assertEqual(values.dtype, np.float64)
+    self.assertAllEqual(steps, np.arange(40))
+    self.assertAllClose(values, np.arange(40) * 1.5)
+    with self.assertRaises(KeyError):
+      c.Columns('missing')
+
+  def testFilterItemsLikeReservoir(self):
+    r = reservoir.Reservoir(100)
+    c = self._NewColumnar(100)
+    for i in xrange(10000):
+      r.AddItem('key', _Point(i, float(i)))
+      c.AddItem('key', _Point(i, float(i)))
+    # A filter that works on whole columns is applied once, as a mask.
+    self.assertEqual(r.FilterItems(lambda x: x.step < 5000),
+                     c.FilterItems(lambda x: x.step < 5000))
+    self.assertEqual(r.Items('key'), c.Items('key'))
+    # A filter that only works on single items is applied item by item.
+    self.assertEqual(r.FilterItems(lambda x: x.step % 2 == 0 and x.step > 10),
+                     c.FilterItems(lambda x: x.step % 2 == 0 and x.step > 10))
+    self.assertEqual(r.Items('key'), c.Items('key'))
+    self.assertEqual(r._buckets['key']._num_items_seen,
+                     c._buckets['key']._num_items_seen)
+    for i in xrange(10000, 11000):
+      r.AddItem('key', _Point(i, float(i)))
+      c.AddItem('key', _Point(i, float(i)))
+    self.assertEqual(r.Items('key'), c.Items('key'))
+
+  def testSetState(self):
+    for size in (0, 10):
+      c1 = self._NewColumnar(size)
+      for i in xrange(100):
+        c1.AddItem('key', _Point(i, float(i)))
+      c2 = self._NewColumnar(size)
+      c2.SetState(c1.GetState())
+      self.assertEqual(c1.Items('key'), c2.Items('key'))
+      for i in xrange(100, 200):
+        c1.AddItem('key', _Point(i, float(i)))
+        c2.AddItem('key', _Point(i, float(i)))
+      self.assertEqual(c1.Items('key'), c2.Items('key'))
+
+
 class ReservoirBucketStatisticalDistributionTest(tf.test.TestCase):
 
   def setUp(self):
@@ -0,0 +1,128 @@
+# Copyright 2015 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Saves the state of event accumulators, so that restarts can resume it.
+
+A cache file holds a pickled, zlib compressed state, which is written to a
+temporary file first and then renamed, so that a cache file is never seen
+half-written. Since the state is unpickled, cache files must only be read
+from directories that nobody else can write to.
+
+The state records the event file and the offset in it where loading stopped,
+with a fingerprint of the bytes before that offset. `Fingerprint` computes
+the fingerprint again on restart, so that a truncated or rewritten event file
+is detected and loaded from the start instead.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import hashlib
+import os
+import zlib
+
+from six.moves import cPickle as pickle
+
+from tensorflow.python.platform import gfile
+from tensorflow.python.platform import logging
+from tensorflow.python.util import compat
+
+# Incremented whenever the format of the cached state changes.
+_CACHE_VERSION = 1
+
+# The fingerprint of a file covers this many bytes at its start, and this many
+# bytes before the offset where loading stopped.
+_FINGERPRINT_BYTES = 4096
+
+
+def CachePath(cache_dir, path):
+  """Returns the path of the cache file for an accumulator of `path`."""
+  digest = hashlib.sha1(compat.as_bytes(path)).hexdigest()
+  return os.path.join(cache_dir, digest + '.cache')
+
+
+def Fingerprint(path, offset):
+  """Fingerprints the contents of a file up to an offset.
+
+  Args:
+    path: The path of a local file.
+    offset: The number of bytes at the start of the file to fingerprint.
+
+  Returns:
+    A string that only stays the same as long as the file is not truncated
+    to less than `offset` bytes and its first `offset` bytes are not
+    rewritten, or None if the file cannot be read or is too short.
+  """
+  head_size = min(offset, _FINGERPRINT_BYTES)
+  tail_start = max(offset - _FINGERPRINT_BYTES, 0)
+  try:
+    with gfile.GFile(path, 'rb') as f:
+      head = f.read(head_size)
+      f.seek(tail_start)
+      tail = f.read(offset - tail_start)
+  except (IOError, OSError):
+    return None
+  if len(head) != head_size or len(tail) != offset - tail_start:
+    return None
+  digest = hashlib.sha1(head)
+  digest.update(tail)
+  return '%d:%s' % (offset, digest.hexdigest())
+
+
+def Save(cache_path, state):
+  """Replaces the state saved in a cache file.
+
+  Args:
+    cache_path: The path of the cache file. Its directory is created if it
+      does not exist.
+    state: A picklable object.
+
+  Raises:
+    IOError: If the cache file cannot be written.
+    OSError: If the cache file cannot be written.
+  """
+  data = zlib.compress(pickle.dumps((_CACHE_VERSION, state), protocol=2), 1)
+  directory = os.path.dirname(cache_path)
+  if directory and not gfile.IsDirectory(directory):
+    gfile.MakeDirs(directory)
+  temp_path = '%s.tmp%d' % (cache_path, os.getpid())
+  with gfile.GFile(temp_path, 'wb') as f:
+    f.write(data)
+  gfile.Rename(temp_path, cache_path, overwrite=True)
+
+
+def Load(cache_path):
+  """Returns the state saved in a cache file.
+
+  Args:
+    cache_path: The path of the cache file.
+
+  Returns:
+    The state passed to `Save`, or None if the file does not exist, cannot
+    be read, or was saved by an incompatible version.
+  """
+  if not gfile.Exists(cache_path):
+    return None
+  try:
+    with gfile.GFile(cache_path, 'rb') as f:
+      version, state = pickle.loads(zlib.decompress(f.read()))
+  except Exception as e:  # pylint: disable=broad-except
+    logging.warn('Ignoring the unreadable cache file %s: %s', cache_path, e)
+    return None
+  if version != _CACHE_VERSION:
+    logging.info('Ignoring the cache file %s of version %s', cache_path,
+                 version)
+    return None
+  return state
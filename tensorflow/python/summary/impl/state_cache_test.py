@@ -0,0 +1,75 @@
+# Copyright 2015 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Tests for state_cache."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+
+from tensorflow.python.framework import test_util
+from tensorflow.python.platform import googletest
+from tensorflow.python.summary.impl import state_cache
+
+
+class StateCacheTest(test_util.TensorFlowTestCase):
+
+  def _WriteToFile(self, path, data, mode='ab'):
+    with open(path, mode) as f:
+      f.write(data)
+
+  def testSaveAndLoad(self):
+    cache_path = os.path.join(self.get_temp_dir(), 'new_dir', 'run.cache')
+    self.assertIsNone(state_cache.Load(cache_path))
+    state = {'items': [(1, 2.5), (2, 3.5)], 'graph': b'\x00\xff'}
+    state_cache.Save(cache_path, state)
+    self.assertEqual(state, state_cache.Load(cache_path))
+    state_cache.Save(cache_path, {'items': []})
+    self.assertEqual({'items': []}, state_cache.Load(cache_path))
+    self.assertEqual(['run.cache'], os.listdir(os.path.dirname(cache_path)))
+
+  def testLoadCorruptCache(self):
+    cache_path = os.path.join(self.get_temp_dir(), 'corrupt.cache')
+    self._WriteToFile(cache_path, b'not a cache', mode='wb')
+    self.assertIsNone(state_cache.Load(cache_path))
+
+  def testCachePath(self):
+    path = state_cache.CachePath('/cache', '/logs/run1')
+    self.assertEqual('/cache', os.path.dirname(path))
+    self.assertEqual(path, state_cache.CachePath('/cache', '/logs/run1'))
+    self.assertNotEqual(path, state_cache.CachePath('/cache', '/logs/run2'))
+
+  def testFingerprint(self):
+    path = os.path.join(self.get_temp_dir(), 'events')
+    self._WriteToFile(path, b'a' * 10000, mode='wb')
+    fingerprint = state_cache.Fingerprint(path, 10000)
+    self.assertIsNotNone(fingerprint)
+    # Appending to the file keeps the fingerprint of its start.
+    self._WriteToFile(path, b'b' * 100)
+    self.assertEqual(fingerprint, state_cache.Fingerprint(path, 10000))
+    self.assertNotEqual(fingerprint, state_cache.Fingerprint(path, 10100))
+    # Rewriting the end of the fingerprinted bytes changes it.
+    self._WriteToFile(path, b'a' * 9999 + b'c', mode='wb')
+    self.assertNotEqual(fingerprint, state_cache.Fingerprint(path, 10000))
+    # Truncating the file makes it impossible to fingerprint.
+    self._WriteToFile(path, b'a' * 9999, mode='wb')
+    self.assertIsNone(state_cache.Fingerprint(path, 10000))
+    self.assertIsNone(state_cache.Fingerprint(path + '_missing', 0))
+
+
+if __name__ == '__main__':
+  googletest.main()
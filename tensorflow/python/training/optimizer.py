@@ -154,7 +154,8 @@ class Optimizer(object):
 
   def minimize(self, loss, global_step=None, var_list=None,
                gate_gradients=GATE_OP, aggregation_method=None,
-               colocate_gradients_with_ops=False, name=None):
+               colocate_gradients_with_ops=False, name=None,
+               checkpoints=None):
     """Add operations to minimize `loss` by updating `var_list`.
 
     This method simply combines calls `compute_gradients()` and
@@ -176,6 +177,8 @@ class Optimizer(object):
       colocate_gradients_with_ops: If True, try colocating gradients with
         the corresponding op.
       name: Optional name for the returned operation.
+      checkpoints: Optional. The activations to keep for backprop, see
+        `compute_gradients()`.
 
     Returns:
       An Operation that updates the variables in `var_list`.  If `global_step`
@@ -187,13 +190,14 @@ class Optimizer(object):
     grads_and_vars = self.compute_gradients(
         loss, var_list=var_list, gate_gradients=gate_gradients,
         aggregation_method=aggregation_method,
-        colocate_gradients_with_ops=colocate_gradients_with_ops)
+        colocate_gradients_with_ops=colocate_gradients_with_ops,
+        checkpoints=checkpoints)
     return self.apply_gradients(grads_and_vars, global_step=global_step,
                                 name=name)
 
   def compute_gradients(self, loss, var_list=None, gate_gradients=GATE_OP,
                         aggregation_method=None,
-                        colocate_gradients_with_ops=False):
+                        colocate_gradients_with_ops=False, checkpoints=None):
     """Compute gradients of `loss` for the variables in `var_list`.
 
     This is the first part of `minimize()`.  It returns a list
@@ -213,6 +217,10 @@ class Optimizer(object):
         Valid values are defined in the class `AggregationMethod`.
       colocate_gradients_with_ops: If True, try colocating gradients with
         the corresponding op.
+      checkpoints: Optional. A list of tensors to keep for backprop, or a
+        constant defined in the class `CheckpointSelection`. The other
+        activations are recomputed during backprop to save memory. If None,
+        all activations are kept.
 
     Returns:
       A list of (gradient, variable) pairs.
@@ -238,7 +246,8 @@ class Optimizer(object):
     grads = gradients.gradients(
         loss, var_refs, gate_gradients=(gate_gradients == Optimizer.GATE_OP),
         aggregation_method=aggregation_method,
-        colocate_gradients_with_ops=colocate_gradients_with_ops)
+        colocate_gradients_with_ops=colocate_gradients_with_ops,
+        checkpoints=checkpoints)
     if gate_gradients == Optimizer.GATE_GRAPH:
       grads = control_flow_ops.tuple(grads)
     grads_and_vars = list(zip(grads, var_list))
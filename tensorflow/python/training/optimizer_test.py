@@ -62,6 +62,21 @@ class OptimizerTest(tf.test.TestCase):
       self.assertAllClose([-14., -13.], var0.eval())
       self.assertAllClose([-6., -5.], var1.eval())
 
+  def testCheckpoints(self):
+    with self.test_session():
+      var0 = tf.Variable([1.0, 2.0])
+      var1 = tf.Variable([3.0, 4.0])
+      cost = tf.reduce_sum(tf.tanh(5 * var0) * tf.tanh(3 * var1))
+      sgd_op = tf.train.GradientDescentOptimizer(3.0)
+      expected = sgd_op.compute_gradients(cost, [var0, var1])
+      actual = sgd_op.compute_gradients(
+          cost, [var0, var1],
+          checkpoints=tf.CheckpointSelection.SQRT_N)
+
+      tf.initialize_all_variables().run()
+      for (expected_grad, _), (actual_grad, _) in zip(expected, actual):
+        self.assertAllClose(expected_grad.eval(), actual_grad.eval())
+
   def testNoVariables(self):
     with self.test_session():
       var0 = tf.Variable([1.0, 2.0], trainable=False)
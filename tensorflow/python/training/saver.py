@@ -40,6 +40,7 @@ from tensorflow.python.framework import device as pydev
 from tensorflow.python.framework import importer
 from tensorflow.python.framework import op_def_registry
 from tensorflow.python.framework import ops
+from tensorflow.python.framework import tensor_util
 from tensorflow.python.ops import array_ops
 from tensorflow.python.ops import constant_op
 from tensorflow.python.ops import control_flow_ops
@@ -221,13 +222,49 @@ class BaseSaverBuilder(object):
       # pylint: disable=protected-access
       return gen_io_ops._sharded_filespec(filename_tensor, num_shards_tensor)
 
+  def _VarToSaveBytes(self, var_to_save):
+    """Returns the number of bytes of 'var_to_save', or 0 if unknown."""
+    shape = var_to_save.var.get_shape()
+    if not shape.is_fully_defined():
+      return 0
+    return shape.num_elements() * var_to_save.var.dtype.size
+
+  def _PlanRestoreGroups(self, vars_to_save, max_concurrent_restores):
+    """Split vars_to_save into groups that are restored concurrently.
+
+    The variables of a group are restored one after the other, while the
+    groups are restored in parallel. Variables are assigned, largest first,
+    to the group with the fewest bytes to restore so far, so that the groups
+    finish at about the same time.
+
+    Args:
+      vars_to_save: A list of BaseSaverBuilder.VarToSave objects.
+      max_concurrent_restores: The maximum number of variables to restore at
+        the same time. If None or 0, all variables are restored concurrently.
+
+    Returns:
+      A list of lists of BaseSaverBuilder.VarToSave objects.
+    """
+    if not max_concurrent_restores:
+      return [[vs] for vs in vars_to_save]
+    num_groups = min(max_concurrent_restores, len(vars_to_save))
+    groups = [[] for _ in range(num_groups)]
+    group_bytes = [0] * num_groups
+    for vs in sorted(vars_to_save, key=self._VarToSaveBytes, reverse=True):
+      i = min(range(num_groups),
+              key=lambda j: (group_bytes[j], len(groups[j])))
+      groups[i].append(vs)
+      group_bytes[i] += self._VarToSaveBytes(vs)
+    return groups
+
   def _AddRestoreOps(self,
                      filename_tensor,
                      vars_to_save,
                      restore_sequentially,
                      reshape,
                      preferred_shard=-1,
-                     name="restore_all"):
+                     name="restore_all",
+                     max_concurrent_restores=None):
     """Add operations to restore vars_to_save.
 
     Args:
@@ -239,41 +276,54 @@ class BaseSaverBuilder(object):
         the corresponding variable.
       preferred_shard: Shard to open first when loading a sharded file.
       name: Name for the returned op.
+      max_concurrent_restores: The maximum number of variables to restore at
+        the same time within a shard. If None, there is no limit. Ignored if
+        restore_sequentially is True.
 
     Returns:
       An Operation that restores the variables.
     """
+    if restore_sequentially:
+      groups = [vars_to_save]
+    else:
+      groups = self._PlanRestoreGroups(vars_to_save, max_concurrent_restores)
     assign_ops = []
-    for vs in vars_to_save:
-      v = vs.var
-      restore_control_inputs = assign_ops[-1:] if restore_sequentially else []
-      # Load and optionally reshape on the CPU, as string tensors are not
-      # available on the GPU.
-      # TODO(touts): Re-enable restore on GPU when we can support annotating
-      # string tensors as "HostMemory" inputs.
-      with ops.device(graph_util.set_cpu0(v.device) if v.device else None):
-        with ops.control_dependencies(restore_control_inputs):
-          values = self.restore_op(filename_tensor, vs, preferred_shard)
-        if reshape:
-          shape = v.get_shape()
-          if not shape.is_fully_defined():
-            shape = array_ops.shape(v)
-          values = array_ops.reshape(values, shape)
-
-      # Assign on the same device as the variable.
-      validate_shape = not reshape and v.get_shape().is_fully_defined()
-      with ops.colocate_with(v):
-        assign_ops.append(state_ops.assign(v,
-                                           values,
-                                           validate_shape=validate_shape))
+    for group in groups:
+      # The variables of a group are restored one after the other.
+      group_assign_ops = []
+      for vs in group:
+        v = vs.var
+        restore_control_inputs = group_assign_ops[-1:]
+        # Load and optionally reshape on the CPU, as string tensors are not
+        # available on the GPU.
+        # TODO(touts): Re-enable restore on GPU when we can support annotating
+        # string tensors as "HostMemory" inputs.
+        with ops.device(graph_util.set_cpu0(v.device) if v.device else None):
+          with ops.control_dependencies(restore_control_inputs):
+            values = self.restore_op(filename_tensor, vs, preferred_shard)
+          if reshape:
+            shape = v.get_shape()
+            if not shape.is_fully_defined():
+              shape = array_ops.shape(v)
+            values = array_ops.reshape(values, shape)
+
+        # Assign on the same device as the variable.
+        validate_shape = not reshape and v.get_shape().is_fully_defined()
+        with ops.colocate_with(v):
+          group_assign_ops.append(state_ops.assign(
+              v, values, validate_shape=validate_shape))
+      assign_ops.extend(group_assign_ops)
 
     # Create a Noop that has control dependencies from all the updates.
     return control_flow_ops.group(*assign_ops, name=name)
 
   def _AddShardedRestoreOps(self, filename_tensor, per_device,
-                            restore_sequentially, reshape):
+                            restore_sequentially, reshape,
+                            max_concurrent_restores=None):
     """Add Ops to save variables from multiple devices.
 
+    The shards are restored in parallel.
+
     Args:
       filename_tensor: Tensor for the path of the file to load.
       per_device: A list of (device, _VarToSave) pairs, as
@@ -282,6 +332,8 @@ class BaseSaverBuilder(object):
         within a shard.
       reshape: True if we want to reshape loaded tensors to the shape of
         the corresponding variable.
+      max_concurrent_restores: The maximum number of variables to restore at
+        the same time within each shard. If None, there is no limit.
 
     Returns:
       An Operation that restores the variables.
@@ -295,7 +347,8 @@ class BaseSaverBuilder(object):
             restore_sequentially,
             reshape,
             preferred_shard=shard,
-            name="restore_shard"))
+            name="restore_shard",
+            max_concurrent_restores=max_concurrent_restores))
     return control_flow_ops.group(*sharded_restores, name="restore_all")
 
   def _IsVariable(self, v):
@@ -448,7 +501,8 @@ class BaseSaverBuilder(object):
             max_to_keep=5,
             keep_checkpoint_every_n_hours=10000.0,
             name=None,
-            restore_sequentially=False):
+            restore_sequentially=False,
+            max_concurrent_restores=None):
     """Adds save/restore nodes to the graph and creates a SaverDef proto.
 
     Args:
@@ -472,6 +526,9 @@ class BaseSaverBuilder(object):
       name: String.  Optional name to use as a prefix when adding operations.
       restore_sequentially: A Bool, which if true, causes restore of different
         variables to happen sequentially within each device.
+      max_concurrent_restores: Optional. The maximum number of variables
+        restored at the same time within each device. Variables are spread
+        over that many sequential restore chains, balanced by size.
 
     Returns:
       A SaverDef proto.
@@ -495,11 +552,13 @@ class BaseSaverBuilder(object):
         per_device = self._GroupByDevices(vars_to_save)
         save_tensor = self._AddShardedSaveOps(filename_tensor, per_device)
         restore_op = self._AddShardedRestoreOps(
-            filename_tensor, per_device, restore_sequentially, reshape)
+            filename_tensor, per_device, restore_sequentially, reshape,
+            max_concurrent_restores=max_concurrent_restores)
       else:
         save_tensor = self._AddSaveOps(filename_tensor, vars_to_save)
         restore_op = self._AddRestoreOps(
-            filename_tensor, vars_to_save, restore_sequentially, reshape)
+            filename_tensor, vars_to_save, restore_sequentially, reshape,
+            max_concurrent_restores=max_concurrent_restores)
 
     assert restore_op.name.endswith("restore_all"), restore_op.name
 
@@ -735,6 +794,7 @@ class Saver(object):
   @@__init__
   @@save
   @@restore
+  @@restore_timings
 
   Other utility methods.
 
@@ -752,7 +812,8 @@ class Saver(object):
                name=None,
                restore_sequentially=False,
                saver_def=None,
-               builder=None):
+               builder=None,
+               max_concurrent_restores=None):
     """Creates a `Saver`.
 
     The constructor adds ops to save and restore variables.
@@ -810,6 +871,10 @@ class Saver(object):
         `as_saver_def()` call of the `Saver` that was created for that `Graph`.
       builder: Optional `SaverBuilder` to use if a `saver_def` was not provided.
         Defaults to `BaseSaverBuilder()`.
+      max_concurrent_restores: Optional. The maximum number of variables
+        restored at the same time within each device. This bounds the number
+        of concurrent checkpoint readers, while still restoring the shards
+        in parallel. Defaults to no limit.
 
     Raises:
       TypeError: If `var_list` is invalid.
@@ -829,7 +894,8 @@ class Saver(object):
           max_to_keep=max_to_keep,
           keep_checkpoint_every_n_hours=keep_checkpoint_every_n_hours,
           name=name,
-          restore_sequentially=restore_sequentially)
+          restore_sequentially=restore_sequentially,
+          max_concurrent_restores=max_concurrent_restores)
     if not isinstance(saver_def, saver_pb2.SaverDef):
       raise ValueError("saver_def must if a saver_pb2.SaverDef: %s" % saver_def)
     if not saver_def.save_tensor_name:
@@ -1063,7 +1129,7 @@ class Saver(object):
                              collection_list=collection_list,
                              as_text=as_text)
 
-  def restore(self, sess, save_path):
+  def restore(self, sess, save_path, options=None, run_metadata=None):
     """Restores previously saved variables.
 
     This method runs the ops added by the constructor for restoring variables.
@@ -1074,9 +1140,16 @@ class Saver(object):
     The `save_path` argument is typically a value previously returned from a
     `save()` call, or a call to `latest_checkpoint()`.
 
+    To find out how long each variable took to restore, pass `options` with
+    `trace_level=RunOptions.FULL_TRACE` and a `run_metadata` proto, and then
+    call `restore_timings(run_metadata)`.
+
     Args:
       sess: A `Session` to use to restore the parameters.
       save_path: Path where parameters were previously saved.
+      options: Optional. A `RunOptions` protocol buffer passed to `sess.run()`.
+      run_metadata: Optional. A `RunMetadata` protocol buffer filled in by
+        `sess.run()`.
 
     Raises:
       ValueError: If the given `save_path` does not point to a file.
@@ -1084,7 +1157,45 @@ class Saver(object):
     if not gfile.Glob(save_path):
       raise ValueError("Restore called with invalid save path %s" % save_path)
     sess.run(self.saver_def.restore_op_name,
-             {self.saver_def.filename_tensor_name: save_path})
+             {self.saver_def.filename_tensor_name: save_path},
+             options=options, run_metadata=run_metadata)
+
+  def restore_timings(self, run_metadata, graph=None):
+    """Returns the time spent reading each variable in a traced `restore()`.
+
+    Args:
+      run_metadata: A `RunMetadata` protocol buffer filled in by a call to
+        `restore()` with `trace_level=RunOptions.FULL_TRACE`.
+      graph: Optional. The graph of the session passed to `restore()`.
+        Defaults to the default graph.
+
+    Returns:
+      A dict mapping the name of each variable in the checkpoint to the
+      number of microseconds spent reading it. The times of the slices of a
+      partitioned variable are added up.
+    """
+    if graph is None:
+      graph = ops.get_default_graph()
+    scope = self.saver_def.restore_op_name.rpartition("/")[0]
+    prefix = scope + "/" if scope else ""
+    timings = {}
+    for dev_stats in run_metadata.step_stats.dev_stats:
+      for node_stats in dev_stats.node_stats:
+        if not node_stats.node_name.startswith(prefix):
+          continue
+        try:
+          op = graph.get_operation_by_name(node_stats.node_name)
+        except (KeyError, ValueError):
+          continue
+        if op.type not in ("Restore", "RestoreSlice"):
+          continue
+        tensor_name_op = op.inputs[1].op
+        if tensor_name_op.type != "Const":
+          continue
+        name = compat.as_str(tensor_util.MakeNdarray(
+            tensor_name_op.get_attr("value")).item())
+        timings[name] = timings.get(name, 0) + node_stats.all_end_rel_micros
+    return timings
 
   @staticmethod
   def _add_collection_def(meta_graph_def, key):
@@ -106,6 +106,50 @@ class SaverTest(tf.test.TestCase):
       self.assertEqual(10.0, v0_2.eval())
       self.assertEqual(20.0, v1_2.eval())
 
+  def testMaxConcurrentRestores(self):
+    save_path = os.path.join(self.get_temp_dir(), "max_concurrent_restores")
+    sizes = [10, 40, 20, 30, 5]
+
+    with self.test_session(graph=tf.Graph()) as sess:
+      var_list = [tf.Variable(tf.fill([size], float(size)), name="v%d" % size)
+                  for size in sizes]
+      save = tf.train.Saver(var_list)
+      tf.initialize_all_variables().run()
+      save.save(sess, save_path)
+
+    with self.test_session(graph=tf.Graph()) as sess:
+      var_list = [tf.Variable(tf.zeros([size]), name="v%d" % size)
+                  for size in sizes]
+      save = tf.train.Saver(var_list, max_concurrent_restores=2)
+      # The 5 variables are read in 2 chains, so 3 of the reads wait for
+      # the variable restored before them.
+      restore_ops = [op for op in sess.graph.get_operations()
+                     if op.type == "RestoreSlice"]
+      self.assertEqual(5, len(restore_ops))
+      self.assertEqual(3, len([op for op in restore_ops
+                               if op.control_inputs]))
+
+      run_options = tf.RunOptions(trace_level=tf.RunOptions.FULL_TRACE)
+      run_metadata = tf.RunMetadata()
+      save.restore(sess, save_path, options=run_options,
+                   run_metadata=run_metadata)
+      for size, v in zip(sizes, var_list):
+        self.assertAllEqual([float(size)] * size, v.eval())
+      timings = save.restore_timings(run_metadata)
+      self.assertEqual(set("v%d" % size for size in sizes), set(timings))
+
+  def testPlanRestoreGroups(self):
+    with tf.Graph().as_default():
+      builder = saver_module.BaseSaverBuilder()
+      vars_to_save = [builder.VarToSave(tf.Variable(tf.zeros([size])), "",
+                                        "v%d" % size)
+                      for size in [10, 40, 20, 30, 5]]
+      groups = builder._PlanRestoreGroups(vars_to_save, 2)
+      self.assertEqual([["v40", "v10", "v5"], ["v30", "v20"]],
+                       [[vs.name for vs in group] for group in groups])
+      groups = builder._PlanRestoreGroups(vars_to_save, None)
+      self.assertEqual(5, len(groups))
+
   def testInt64(self):
     save_path = os.path.join(self.get_temp_dir(), "int64")
 
@@ -19,12 +19,11 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import os.path
 import threading
 import time
 
-import six
-
 from tensorflow.core.framework import graph_pb2
 from tensorflow.core.framework import summary_pb2
 from tensorflow.core.util import event_pb2
@@ -54,10 +53,11 @@ class SummaryWriter(object):
 
   @@flush
   @@close
+  @@get_stats
   """
 
   def __init__(self, logdir, graph=None, max_queue=10, flush_secs=120,
-               graph_def=None):
+               graph_def=None, max_queue_bytes=None, drop_when_full=False):
     """Creates a `SummaryWriter` and an event file.
 
     On construction the summary writer creates a new event file in `logdir`.
@@ -87,6 +87,18 @@ class SummaryWriter(object):
        and events to disk.
     *  `max_queue`: Maximum number of summaries or events pending to be
        written to disk before one of the 'add' calls block.
+    *  `max_queue_bytes`: Maximum total size of the pending summaries and
+       events, so that large summaries such as images cannot use unbounded
+       memory when they are added faster than they are written.
+    *  `drop_when_full`: Whether `add_summary()` drops the summary instead of
+       blocking when the queue is full, so that a slow disk never stalls the
+       training loop. Graphs, session logs and events added with
+       `add_event()` are never dropped. `get_stats()` counts the dropped
+       summaries.
+
+    The events are written in batches: the writer thread takes all the
+    pending events at once, serializes and writes them, and then flushes the
+    event file if `flush_secs` have passed.
 
     Args:
       logdir: A string. Directory where event file will be written.
@@ -95,11 +107,17 @@ class SummaryWriter(object):
       flush_secs: Number. How often, in seconds, to flush the
         pending events and summaries to disk.
       graph_def: DEPRECATED: Use the `graph` argument instead.
+      max_queue_bytes: Integer. Optional maximum total size in bytes of the
+        pending events and summaries, including those being written. An
+        event larger than that is still added when there are none.
+      drop_when_full: Boolean. Whether to drop summaries rather than block
+        when the queue is full.
     """
     self._logdir = logdir
     if not gfile.IsDirectory(self._logdir):
       gfile.MakeDirs(self._logdir)
-    self._event_queue = six.moves.queue.Queue(max_queue)
+    self._event_queue = _EventQueue(max_queue, max_queue_bytes)
+    self._drop_when_full = drop_when_full
     self._ev_writer = pywrap_tensorflow.EventsWriter(
         compat.as_bytes(os.path.join(self._logdir, "events")))
     self._worker = _EventLoggerThread(self._event_queue, self._ev_writer,
@@ -122,6 +140,9 @@ class SummaryWriter(object):
     buffer that you populate with your own data. The latter is
     commonly done to report evaluation results in event files.
 
+    If the writer was created with `drop_when_full` and its queue is full, the
+    summary is dropped.
+
     Args:
       summary: A `Summary` protocol buffer, optionally serialized as a string.
       global_step: Number. Optional global step value to record with the
@@ -134,7 +155,7 @@ class SummaryWriter(object):
     event = event_pb2.Event(wall_time=time.time(), summary=summary)
     if global_step is not None:
       event.step = int(global_step)
-    self.add_event(event)
+    self._event_queue.put(event, block=not self._drop_when_full)
 
   def add_session_log(self, session_log, global_step=None):
     """Adds a `SessionLog` protocol buffer to the event file.
@@ -228,6 +249,31 @@ class SummaryWriter(object):
     self._event_queue.join()
     self._ev_writer.Flush()
 
+  def get_stats(self):
+    """Returns statistics about the events written so far.
+
+    They help to tell whether summaries are added faster than they can be
+    written, e.g. when `queued_bytes` stays close to `max_queue_bytes`.
+
+    Returns:
+      A dict with the following integer or float values:
+
+      *  `queued_events`, `queued_bytes`: The number and total size of the
+         events that are waiting to be written.
+      *  `writing_bytes`: The total size of the events being written.
+      *  `peak_queued_bytes`: The largest sum of `queued_bytes` and
+         `writing_bytes` so far, which `max_queue_bytes` bounds.
+      *  `written_events`: The number of events written to the event file.
+      *  `written_batches`: The number of batches they were written in.
+      *  `dropped_events`: The number of summaries dropped because the queue
+         was full, with `drop_when_full`.
+      *  `blocked_secs`: The total time that the 'add' calls spent waiting
+         for room in the queue.
+      *  `write_secs`: The total time spent writing and flushing batches.
+      *  `max_write_secs`: The longest time spent writing a batch.
+    """
+    return self._event_queue.get_stats()
+
   def close(self):
     """Flushes the event file to disk and close the file.
 
@@ -237,6 +283,123 @@ class SummaryWriter(object):
     self._ev_writer.Close()
 
 
+class _EventQueue(object):
+  """A queue of events that is bounded by their number and total size.
+
+  Like `Queue.Queue`, except that the consumer takes all the queued events at
+  once, and that it keeps the statistics returned by `get_stats`. The events
+  of a batch count against the size limit until the batch is marked done, so
+  the limit bounds the memory used by both queued events and events being
+  written.
+  """
+
+  def __init__(self, max_events, max_bytes=None):
+    """Creates a queue.
+
+    Args:
+      max_events: The maximum number of queued events. If it is not positive,
+        the number of events is unbounded.
+      max_bytes: The maximum total size in bytes of the queued events and of
+        the events being written, or None if it is unbounded.
+    """
+    self._max_events = max_events
+    self._max_bytes = max_bytes
+    self._cond = threading.Condition()
+    self._events = collections.deque()
+    self._bytes = 0
+    # The total sizes of the batches taken by `get_batch` and not yet marked
+    # done, oldest first.
+    self._batch_bytes = collections.deque()
+    self._writing_bytes = 0
+    self._unfinished_events = 0
+    self._stats = {
+        "peak_queued_bytes": 0,
+        "written_events": 0,
+        "written_batches": 0,
+        "dropped_events": 0,
+        "blocked_secs": 0.0,
+        "write_secs": 0.0,
+        "max_write_secs": 0.0,
+    }
+
+  def _full(self, size):
+    """Returns whether an event of the size does not fit."""
+    if self._max_events > 0 and len(self._events) >= self._max_events:
+      return True
+    # An event larger than the limit is added once nothing else is held.
+    held_bytes = self._bytes + self._writing_bytes
+    return (self._max_bytes is not None and held_bytes > 0 and
+            held_bytes + size > self._max_bytes)
+
+  def put(self, event, block=True):
+    """Adds an event, blocking or dropping it while the queue is full.
+
+    Args:
+      event: An `Event` protocol buffer.
+      block: Whether to wait for room in the queue if it is full. If False,
+        the event is dropped instead.
+
+    Returns:
+      Whether the event was added.
+    """
+    size = event.ByteSize()
+    with self._cond:
+      if self._full(size):
+        if not block:
+          self._stats["dropped_events"] += 1
+          return False
+        start = time.time()
+        while self._full(size):
+          self._cond.wait()
+        self._stats["blocked_secs"] += time.time() - start
+      self._events.append((event, size))
+      self._bytes += size
+      self._unfinished_events += 1
+      self._stats["peak_queued_bytes"] = max(
+          self._stats["peak_queued_bytes"], self._bytes + self._writing_bytes)
+      self._cond.notify_all()
+    return True
+
+  def get_batch(self):
+    """Removes and returns all queued events, waiting for at least one."""
+    with self._cond:
+      while not self._events:
+        self._cond.wait()
+      batch = [event for event, _ in self._events]
+      self._events.clear()
+      self._batch_bytes.append(self._bytes)
+      self._writing_bytes += self._bytes
+      self._bytes = 0
+      self._cond.notify_all()
+    return batch
+
+  def task_done(self, num_events, write_secs):
+    """Records that the oldest batch returned by `get_batch` was written."""
+    with self._cond:
+      self._writing_bytes -= self._batch_bytes.popleft()
+      self._unfinished_events -= num_events
+      self._stats["written_events"] += num_events
+      self._stats["written_batches"] += 1
+      self._stats["write_secs"] += write_secs
+      self._stats["max_write_secs"] = max(self._stats["max_write_secs"],
+                                          write_secs)
+      self._cond.notify_all()
+
+  def join(self):
+    """Waits until all the events added have been written."""
+    with self._cond:
+      while self._unfinished_events:
+        self._cond.wait()
+
+  def get_stats(self):
+    with self._cond:
+      stats = dict(self._stats)
+      stats["queued_events"] = len(self._events)
+      stats["queued_bytes"] = self._bytes
+      stats["writing_bytes"] = self._writing_bytes
+    return stats
+
+
 class _EventLoggerThread(threading.Thread):
   """Thread that logs events."""
 
@@ -244,7 +407,7 @@ class _EventLoggerThread(threading.Thread):
     """Creates an _EventLoggerThread.
 
     Args:
-      queue: A Queue from which to dequeue events.
+      queue: An _EventQueue from which to dequeue batches of events.
       ev_writer: An event writer. Used to log brain events for
        the visualizer.
       flush_secs: How often, in seconds, to flush the
@@ -260,9 +423,11 @@ class _EventLoggerThread(threading.Thread):
 
   def run(self):
     while True:
-      event = self._queue.get()
+      events = self._queue.get_batch()
+      start = time.time()
       try:
-        self._ev_writer.WriteEvent(event)
+        for event in events:
+          self._ev_writer.WriteEvent(event)
         # Flush the event writer every so often.
         now = time.time()
         if now > self._next_event_flush_time:
@@ -270,7 +435,7 @@ class _EventLoggerThread(threading.Thread):
           # Do it again in two minutes.
           self._next_event_flush_time = now + self._flush_secs
       finally:
-        self._queue.task_done()
+        self._queue.task_done(len(events), time.time() - start)
 
 
 def summary_iterator(path):
@@ -21,10 +21,12 @@ from __future__ import print_function
 import glob
 import os.path
 import shutil
+import threading
 import time
 
 import tensorflow as tf
 from tensorflow.core.util.event_pb2 import SessionLog
+from tensorflow.python.training import summary_io
 
 
 class SummaryWriterTestCase(tf.test.TestCase):
@@ -219,6 +221,71 @@ class SummaryWriterTestCase(tf.test.TestCase):
     # We should be done.
     self.assertRaises(StopIteration, lambda: next(rr))
 
+  def testGetStats(self):
+    test_dir = self._CleanTestDir("stats")
+    sw = tf.train.SummaryWriter(test_dir, max_queue_bytes=1 << 20)
+    for step in range(5):
+      summ = tf.Summary(value=[tf.Summary.Value(tag="s", simple_value=step)])
+      sw.add_summary(summ, step)
+    sw.flush()
+    stats = sw.get_stats()
+    self.assertEquals(5, stats["written_events"])
+    self.assertLessEqual(1, stats["written_batches"])
+    self.assertEquals(0, stats["queued_events"])
+    self.assertEquals(0, stats["queued_bytes"])
+    self.assertEquals(0, stats["dropped_events"])
+    self.assertLess(0, stats["peak_queued_bytes"])
+    sw.close()
+
+    rr = self._EventsReader(test_dir)
+    self.assertEquals("brain.Event:2", next(rr).file_version)
+    self.assertEquals(list(range(5)), [ev.step for ev in rr])
+
+  def _SummaryEvent(self, size):
+    image = tf.Summary.Image(encoded_image_string=b"x" * size)
+    return tf.Event(summary=tf.Summary(value=[tf.Summary.Value(tag="i",
+                                                               image=image)]))
+
+  def testEventQueueDropsWhenFull(self):
+    queue = summary_io._EventQueue(0, max_bytes=2500)
+    event = self._SummaryEvent(1000)
+    self.assertTrue(queue.put(event, block=False))
+    self.assertTrue(queue.put(event, block=False))
+    self.assertFalse(queue.put(event, block=False))
+    # Events being written still count against the limit.
+    self.assertEquals(2, len(queue.get_batch()))
+    self.assertLess(2000, queue.get_stats()["writing_bytes"])
+    self.assertFalse(queue.put(event, block=False))
+    queue.task_done(2, 0.5)
+    # An event larger than the limit still fits once nothing else is held.
+    self.assertTrue(queue.put(self._SummaryEvent(5000), block=False))
+    self.assertEquals(1, len(queue.get_batch()))
+    queue.task_done(1, 0.25)
+    stats = queue.get_stats()
+    self.assertEquals(2, stats["dropped_events"])
+    self.assertEquals(3, stats["written_events"])
+    self.assertEquals(0, stats["writing_bytes"])
+    self.assertEquals(0.5, stats["max_write_secs"])
+
+  def testEventQueueBlocksWhenFull(self):
+    queue = summary_io._EventQueue(2)
+    event = self._SummaryEvent(10)
+    queue.put(event)
+    queue.put(event)
+    added = threading.Event()
+
+    def _Put():
+      queue.put(event)
+      added.set()
+
+    thread = threading.Thread(target=_Put)
+    thread.start()
+    self.assertFalse(added.wait(0.1))
+    self.assertEquals(2, len(queue.get_batch()))
+    thread.join()
+    self.assertTrue(added.is_set())
+    self.assertEquals(1, queue.get_stats()["queued_events"])
+
 
 if __name__ == "__main__":
   tf.test.main()
@@ -45,6 +45,8 @@ functions below.
 
 @@gradients
 @@AggregationMethod
+@@CheckpointSelection
+@@estimate_activation_bytes
 
 @@stop_gradient
 
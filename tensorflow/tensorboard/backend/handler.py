@@ -23,13 +23,19 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import binascii
+import collections
 import csv
 import gzip
+import hashlib
 import imghdr
 import json
 import mimetypes
+import numbers
 import os
+import threading
 
+import numpy as np
 from six import BytesIO
 from six.moves import BaseHTTPServer
 from six.moves import urllib
@@ -62,6 +68,10 @@ _IMGHDR_TO_MIMETYPE = {
 }
 _DEFAULT_IMAGE_MIMETYPE = 'application/octet-stream'
 
+# Distinguishes the ETags of this process from those of earlier ones, whose
+# data generations started over from the same values.
+_ETAG_NONCE = binascii.hexlify(os.urandom(8))
+
 
 def _content_type_for_image(encoded_image_string):
   image_type = imghdr.what(None, encoded_image_string)
@@ -88,9 +98,16 @@ class TensorboardHandler(BaseHTTPServer.BaseHTTPRequestHandler):
   # How many samples to include in sampling API calls by default.
   DEFAULT_SAMPLE_COUNT = 10
 
-  def __init__(self, multiplexer, *args):
+  def __init__(self, multiplexer, *args, **kwargs):
     self._multiplexer = multiplexer
-    BaseHTTPServer.BaseHTTPRequestHandler.__init__(self, *args)
+    # An optional LruCache of downsampled data, shared by all requests.
+    self._downsample_cache = kwargs.pop('downsample_cache', None)
+    # An optional LruCache that maps ETags to the content types and gzipped
+    # bodies of the responses with those ETags, shared by all requests.
+    self._response_cache = kwargs.pop('response_cache', None)
+    # The ETag of the response to the current request, if it has one.
+    self._etag = None
+    BaseHTTPServer.BaseHTTPRequestHandler.__init__(self, *args, **kwargs)
 
   # We use underscore_names for consistency with inherited methods.
 
@@ -137,64 +154,191 @@ class TensorboardHandler(BaseHTTPServer.BaseHTTPRequestHandler):
     prefix = os.path.commonprefix([base, absolute_path])
     return prefix == base
 
-  def _send_gzip_response(self, content, content_type, code=200):
-    """Writes the given content as gzip response using the given content type.
+  def _get_downsampled(self, run, tag, key, compute_fn):
+    """Returns `compute_fn()`, cached until the data of `tag` changes.
 
     Args:
-      content: The content to respond with.
+      run: The name of the run that the data is derived from.
+      tag: The tag that the data is derived from.
+      key: A hashable key that identifies the data within the tag.
+      compute_fn: A function that computes the data. Its result must not be
+        modified after it is returned, since it may be shared by requests.
+
+    Returns:
+      The result of `compute_fn()`.
+    """
+    if self._downsample_cache is None:
+      return compute_fn()
+    key = (run, tag, self._multiplexer.RunGeneration(run, tag)) + key
+    value = self._downsample_cache.get(key)
+    if value is None:
+      value = compute_fn()
+      self._downsample_cache.put(key, value)
+    return value
+
+  def _compute_etag(self, query_params):
+    """Computes the ETag of the response to a data request.
+
+    The ETag changes whenever the data that the response is derived from may
+    have changed: the data of the requested tag if there is one, otherwise the
+    data of the requested run, or of all runs if no run is requested. It is a
+    weak ETag, since the gzipped and identity bodies of a response share it.
+
+    Args:
+      query_params: The query parameters as a dict.
+
+    Returns:
+      A weak ETag string, or None if the requested run does not exist.
+    """
+    run = query_params.get('run')
+    try:
+      if run is None:
+        generation = [(name, self._multiplexer.RunGeneration(name))
+                      for name in sorted(self._multiplexer.Runs())]
+      else:
+        generation = self._multiplexer.RunGeneration(run,
+                                                     query_params.get('tag'))
+    except KeyError:
+      return None
+    key = repr((_ETAG_NONCE, self.path, generation))
+    return 'W/"%s"' % hashlib.sha1(compat.as_bytes(key)).hexdigest()
+
+  def _etag_matches(self):
+    """Returns whether the client already has the response with our ETag.
+
+    Like any If-None-Match comparison, this ignores whether ETags are weak.
+    """
+    if_none_match = self.headers.get('If-None-Match')
+    if self._etag is None or if_none_match is None:
+      return False
+    opaque_tag = self._etag[len('W/'):]
+    etags = [etag.strip() for etag in if_none_match.split(',')]
+    return '*' in etags or any(
+        etag == opaque_tag or etag == self._etag for etag in etags)
+
+  def _accepts_gzip(self):
+    """Returns whether the client accepts gzip-encoded responses."""
+    return 'gzip' in self.headers.get('Accept-Encoding', '')
+
+  def _send_not_modified(self):
+    """Tells the client that the response with our ETag is still current."""
+    self.send_response(304)
+    self.send_header('ETag', self._etag)
+    self.end_headers()
+
+  def _send_content(self, content, content_type, code=200,
+                    content_encoding=None):
+    """Writes out the given bytes with the headers for them.
+
+    Successful responses that have an ETag tell the client to revalidate its
+    cached copy of the response with the ETag before using it.
+
+    Args:
+      content: The bytes to respond with.
+      content_type: The mime type of the content.
+      code: The numeric HTTP status code to use.
+      content_encoding: The encoding of the content, if any.
+    """
+    self.send_response(code)
+    self.send_header('Content-Type', content_type)
+    self.send_header('Content-Length', len(content))
+    if content_encoding is not None:
+      self.send_header('Content-Encoding', content_encoding)
+    if code == 200 and self._etag is not None:
+      self.send_header('ETag', self._etag)
+      self.send_header('Cache-Control', 'no-cache')
+      self.send_header('Vary', 'Accept-Encoding')
+    self.end_headers()
+    self.wfile.write(content)
+
+  def _send_gzip_content(self, content, content_type, code=200):
+    """Gzips the given bytes and writes them out, caching them by ETag.
+
+    Args:
+      content: The bytes to respond with.
       content_type: The mime type of the content.
       code: The numeric HTTP status code to use.
     """
     out = BytesIO()
     f = gzip.GzipFile(fileobj=out, mode='wb')
-    f.write(compat.as_bytes(content))
+    f.write(content)
     f.close()
     gzip_content = out.getvalue()
-    self.send_response(code)
-    self.send_header('Content-Type', content_type)
-    self.send_header('Content-Length', len(gzip_content))
-    self.send_header('Content-Encoding', 'gzip')
-    self.end_headers()
-    self.wfile.write(gzip_content)
+    if (code == 200 and self._etag is not None and
+        self._response_cache is not None):
+      self._response_cache.put(self._etag, (content_type, gzip_content))
+    self._send_content(gzip_content, content_type, code, 'gzip')
+
+  def _send_cached_response(self):
+    """Writes out the cached gzipped response with our ETag, if there is one.
+
+    Returns:
+      Whether a cached response was sent.
+    """
+    if (self._etag is None or self._response_cache is None or
+        not self._accepts_gzip()):
+      return False
+    cached = self._response_cache.get(self._etag)
+    if cached is None:
+      return False
+    content_type, gzip_content = cached
+    self._send_content(gzip_content, content_type, 200, 'gzip')
+    return True
+
+  def _send_gzip_response(self, content, content_type, code=200):
+    """Writes the given content as gzip response using the given content type.
+
+    Args:
+      content: The content to respond with.
+      content_type: The mime type of the content.
+      code: The numeric HTTP status code to use.
+    """
+    self._send_gzip_content(compat.as_bytes(content), content_type, code)
 
   def _send_json_response(self, obj, code=200):
     """Writes out the given object as JSON using the given HTTP status code.
 
-    This also replaces special float values with stringified versions.
+    This also replaces special float values with stringified versions. The
+    JSON is gzipped if the client accepts that.
 
     Args:
       obj: The object to respond with.
       code: The numeric HTTP status code to use.
     """
 
-    output = json.dumps(float_wrapper.WrapSpecialFloats(obj))
+    output = compat.as_bytes(
+        json.dumps(float_wrapper.WrapSpecialFloats(obj)))
 
-    self.send_response(code)
-    self.send_header('Content-Type', 'application/json')
-    self.send_header('Content-Length', len(output))
-    self.end_headers()
-    self.wfile.write(compat.as_bytes(output))
+    if self._accepts_gzip():
+      self._send_gzip_content(output, 'application/json', code)
+    else:
+      self._send_content(output, 'application/json', code)
 
   def _send_csv_response(self, serialized_csv, code=200):
     """Writes out the given string, which represents CSV data.
 
     Unlike _send_json_response, this does *not* perform the CSV serialization
-    for you. It only sets the proper headers.
+    for you. It only sets the proper headers, and gzips the data if the client
+    accepts that.
 
     Args:
       serialized_csv: A string containing some CSV data.
       code: The numeric HTTP status code to use.
     """
 
-    self.send_response(code)
-    self.send_header('Content-Type', 'text/csv')
-    self.send_header('Content-Length', len(serialized_csv))
-    self.end_headers()
-    self.wfile.write(serialized_csv)
+    output = compat.as_bytes(serialized_csv)
+    if self._accepts_gzip():
+      self._send_gzip_content(output, 'text/csv', code)
+    else:
+      self._send_content(output, 'text/csv', code)
 
   def _serve_scalars(self, query_params):
     """Given a tag and single run, return array of ScalarEvents.
 
+    The events can be restricted to the steps between the optional `min_step`
+    and `max_step` query parameters, and downsampled to at most `max_points`
+    events, keeping the minimum and maximum of the values they replace.
+
     Alternately, if both the tag and the run are omitted, returns JSON object
     where obj[run][tag] contains sample values for the given tag in the given
     run.
@@ -212,15 +356,24 @@ class TensorboardHandler(BaseHTTPServer.BaseHTTPRequestHandler):
 
       sample_count = int(query_params.get('sample_count',
                                           self.DEFAULT_SAMPLE_COUNT))
+      sample = lambda length: _uniform_sample_indices(length, sample_count)
       values = {}
       for run_name, tags in self._multiplexer.Runs().items():
         values[run_name] = {
-            tag: _uniform_sample(
-                self._multiplexer.Scalars(run_name, tag), sample_count)
+            tag: _scalar_rows(
+                self._multiplexer.ScalarColumns(run_name, tag, sample))
             for tag in tags['scalars']
         }
     else:
-      values = self._multiplexer.Scalars(run, tag)
+      try:
+        min_step, max_step, max_points = _parse_downsample_params(query_params)
+      except ValueError as e:
+        self.send_error(400, str(e))
+        return
+      values = self._get_downsampled(
+          run, tag, (SCALARS_ROUTE, min_step, max_step, max_points),
+          lambda: _downsample_scalars(self._multiplexer.ScalarColumns(run, tag),
+                                      min_step, max_step, max_points))
 
     if query_params.get('format') == _OutputFormat.CSV:
       string_io = BytesIO()
@@ -267,10 +420,26 @@ class TensorboardHandler(BaseHTTPServer.BaseHTTPRequestHandler):
     self._send_gzip_response(graph_pbtxt, 'text/plain')
 
   def _serve_histograms(self, query_params):
-    """Given a tag and single run, return an array of histogram values."""
+    """Given a tag and single run, return an array of histogram values.
+
+    The histograms can be restricted to the steps between the optional
+    `min_step` and `max_step` query parameters, and sampled uniformly down to
+    at most `max_points` histograms.
+
+    Args:
+      query_params: The query parameters as a dict.
+    """
     tag = query_params.get('tag')
     run = query_params.get('run')
-    values = self._multiplexer.Histograms(run, tag)
+    try:
+      min_step, max_step, max_points = _parse_downsample_params(query_params)
+    except ValueError as e:
+      self.send_error(400, str(e))
+      return
+    values = self._get_downsampled(
+        run, tag, (HISTOGRAMS_ROUTE, min_step, max_step, max_points),
+        lambda: _downsample_events(self._multiplexer.Histograms(run, tag),
+                                   min_step, max_step, max_points))
     self._send_json_response(values)
 
   def _serve_compressed_histograms(self, query_params):
@@ -324,14 +493,9 @@ class TensorboardHandler(BaseHTTPServer.BaseHTTPRequestHandler):
     run = query_params.get('run')
     index = int(query_params.get('index'))
     image = self._multiplexer.Images(run, tag)[index]
-    encoded_image_string = image.encoded_image_string
+    encoded_image_string = self._multiplexer.EncodedImage(run, image)
     content_type = _content_type_for_image(encoded_image_string)
-
-    self.send_response(200)
-    self.send_header('Content-Type', content_type)
-    self.send_header('Content-Length', len(encoded_image_string))
-    self.end_headers()
-    self.wfile.write(encoded_image_string)
+    self._send_content(encoded_image_string, content_type)
 
   def _query_for_individual_image(self, run, tag, index):
     """Builds a URL for accessing the specified image.
@@ -450,7 +614,15 @@ class TensorboardHandler(BaseHTTPServer.BaseHTTPRequestHandler):
         return
       query_params[key] = query_params[key][0]
 
+    self._etag = None
     if clean_path in data_handlers:
+      if clean_path.startswith(DATA_PREFIX):
+        self._etag = self._compute_etag(query_params)
+        if self._etag_matches():
+          self._send_not_modified()
+          return
+        if self._send_cached_response():
+          return
       data_handlers[clean_path](query_params)
     elif clean_path in TAB_ROUTES:
       self._serve_index(query_params)
@@ -474,15 +646,178 @@ def _uniform_sample(values, count):
     be included. If `count > len(values)`, then all values will be returned.
   """
 
+  return [values[i] for i in _uniform_sample_indices(len(values), count)]
+
+
+def _uniform_sample_indices(length, count):
+  """Returns the indices of `count` values sampled uniformly from `length`.
+
+  Args:
+    length: The number of values to sample from.
+    count: The number of values to sample. Must be at least 2.
+
+  Raises:
+    ValueError: If `count` is not at least 2.
+    TypeError: If `count` is not an integer.
+
+  Returns:
+    An increasing array of indices into the values. The first and the last
+    index will always be included. If `count > length`, then all indices will be
+    returned.
+  """
+  if not isinstance(count, numbers.Integral):
+    raise TypeError('count must be an integer, got %r' % (count,))
+
   if count < 2:
     raise ValueError('Must sample at least 2 elements, %d requested' % count)
 
-  if count >= len(values):
-    # Copy the list in case the caller mutates it.
-    return list(values)
+  if count >= length:
+    return np.arange(length)
+
+  # We divide by count - 1 to make sure we always get the first and the last
+  # element.
+  return (length - 1) * np.arange(count) // (count - 1)
+
 
-  return [
-      # We divide by count - 1 to make sure we always get the first and the last
-      # element.
-      values[(len(values) - 1) * i // (count - 1)] for i in xrange(count)
-  ]
+def _scalar_rows(columns):
+  """Converts the columns of scalar events to `[wall_time, step, value]` rows.
+
+  Args:
+    columns: A tuple `(wall_times, steps, values)` of arrays, as returned by
+      `EventMultiplexer.ScalarColumns`.
+
+  Returns:
+    A list of `[wall_time, step, value]` lists of Python numbers.
+  """
+  return [list(row) for row in zip(*[column.tolist() for column in columns])]
+
+
+def _parse_downsample_params(query_params):
+  """Parses the `min_step`, `max_step` and `max_points` query parameters.
+
+  Args:
+    query_params: The query parameters as a dict.
+
+  Raises:
+    ValueError: If a parameter is not an integer, or if `max_points` is less
+      than 2.
+
+  Returns:
+    A tuple `(min_step, max_step, max_points)`, with None for the parameters
+    that are not given.
+  """
+  min_step, max_step, max_points = [
+      None if query_params.get(key) is None else int(query_params[key])
+      for key in ('min_step', 'max_step', 'max_points')]
+  if max_points is not None and max_points < 2:
+    raise ValueError('max_points must be at least 2, was %d' % max_points)
+  return min_step, max_step, max_points
+
+
+def _min_max_sample_indices(values, max_points):
+  """Returns the indices of at most `max_points` values that keep extremes.
+
+  The first and the last value are always kept. The values between them are
+  split into `(max_points - 2) // 2` runs of consecutive values, and the
+  minimum and the maximum of each run are kept. Unlike uniform sampling, this
+  keeps spikes in the values.
+
+  Args:
+    values: A 1-D array of values.
+    max_points: The maximum number of values to keep. Must be at least 2.
+
+  Returns:
+    An increasing array of indices into `values`.
+  """
+  length = len(values)
+  if max_points >= length:
+    return np.arange(length)
+
+  num_runs = (max_points - 2) // 2
+  edges = np.linspace(1, length - 1, num_runs + 1).astype(np.int64)
+  indices = [0, length - 1]
+  for start, end in zip(edges[:-1], edges[1:]):
+    if start < end:
+      indices.append(start + np.argmin(values[start:end]))
+      indices.append(start + np.argmax(values[start:end]))
+  return np.unique(indices)
+
+
+def _downsample_scalars(columns, min_step=None, max_step=None, max_points=None):
+  """Restricts scalars to a range of steps, and downsamples them.
+
+  Args:
+    columns: A tuple `(wall_times, steps, values)` of arrays, as returned by
+      `EventMultiplexer.ScalarColumns`.
+    min_step: If not None, the smallest step to keep.
+    max_step: If not None, the largest step to keep.
+    max_points: If not None, the maximum number of scalars to keep. See
+      `_min_max_sample_indices`.
+
+  Returns:
+    A list of `[wall_time, step, value]` lists of Python numbers.
+  """
+  steps = columns[1]
+  keep = np.ones(len(steps), dtype=bool)
+  if min_step is not None:
+    keep &= steps >= min_step
+  if max_step is not None:
+    keep &= steps <= max_step
+  if not keep.all():
+    columns = [column[keep] for column in columns]
+  if max_points is not None:
+    indices = _min_max_sample_indices(columns[2], max_points)
+    columns = [column[indices] for column in columns]
+  return _scalar_rows(columns)
+
+
+def _downsample_events(events, min_step=None, max_step=None, max_points=None):
+  """Restricts events to a range of steps, and samples them uniformly.
+
+  Args:
+    events: A list of events with a `step` field.
+    min_step: If not None, the smallest step to keep.
+    max_step: If not None, the largest step to keep.
+    max_points: If not None, the maximum number of events to keep.
+
+  Returns:
+    A new list of events from `events`.
+  """
+  events = [event for event in events
+            if (min_step is None or event.step >= min_step) and
+            (max_step is None or event.step <= max_step)]
+  if max_points is not None:
+    events = _uniform_sample(events, max_points)
+  return events
+
+
+class LruCache(object):
+  """A thread-safe cache that evicts the least recently used entries."""
+
+  def __init__(self, max_entries):
+    """Creates an empty cache.
+
+    Args:
+      max_entries: The maximum number of entries to keep.
+    """
+    self._max_entries = max_entries
+    self._entries = collections.OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, key, default=None):
+    """Returns the value of `key`, or `default` if it is not cached."""
+    with self._lock:
+      if key not in self._entries:
+        return default
+      # Move the entry to the end, as the most recently used one.
+      value = self._entries.pop(key)
+      self._entries[key] = value
+      return value
+
+  def put(self, key, value):
+    """Caches `value` for `key`, evicting the least recently used entries."""
+    with self._lock:
+      self._entries.pop(key, None)
+      self._entries[key] = value
+      while len(self._entries) > self._max_entries:
+        self._entries.popitem(last=False)
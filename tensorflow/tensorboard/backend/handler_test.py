@@ -22,6 +22,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import numpy as np
 from six.moves import xrange
 
 from tensorflow.python.platform import googletest
@@ -60,6 +61,78 @@ class UniformSampleTest(googletest.TestCase):
     with self.assertRaises(TypeError):
       handler._uniform_sample([1, 2, 3, 4], 3.0)
 
+  def testSampleIndices(self):
+    self.assertEqual(handler._uniform_sample_indices(3, 10).tolist(),
+                     [0, 1, 2])
+    self.assertEqual(handler._uniform_sample_indices(10, 4).tolist(),
+                     [0, 3, 6, 9])
+    with self.assertRaises(ValueError):
+      handler._uniform_sample_indices(10, 1)
+
+
+class ScalarRowsTest(googletest.TestCase):
+
+  def testRows(self):
+    columns = (np.array([1.5, 2.5, 3.5], dtype=np.float64),
+               np.array([10, 20, 30], dtype=np.int64),
+               np.array([0.25, 0.5, 0.75], dtype=np.float32))
+    self.assertEqual(handler._scalar_rows(columns),
+                     [[1.5, 10, 0.25], [2.5, 20, 0.5], [3.5, 30, 0.75]])
+
+  def testRowsAreJsonSerializable(self):
+    columns = (np.array([1.0]), np.array([1], dtype=np.int64),
+               np.array([2.0], dtype=np.float32))
+    rows = handler._scalar_rows(columns)
+    self.assertIs(type(rows[0][1]), int)
+    self.assertIs(type(rows[0][2]), float)
+
+
+class DownsampleTest(googletest.TestCase):
+
+  def testMinMaxSampleIndices(self):
+    values = np.array([0, 5, 1, 1, -3, 1, 1, 2, 0, 1], dtype=np.float32)
+    self.assertEqual(handler._min_max_sample_indices(values, 20).tolist(),
+                     list(range(10)))
+    self.assertEqual(handler._min_max_sample_indices(values, 2).tolist(),
+                     [0, 9])
+    # The spikes at 1 and 4 are kept.
+    self.assertEqual(handler._min_max_sample_indices(values, 4).tolist(),
+                     [0, 1, 4, 9])
+
+  def testDownsampleScalars(self):
+    steps = np.arange(0, 100, dtype=np.int64)
+    columns = (steps.astype(np.float64), steps, steps.astype(np.float32))
+    rows = handler._downsample_scalars(columns, min_step=10, max_step=20)
+    self.assertEqual([row[1] for row in rows], list(range(10, 21)))
+    rows = handler._downsample_scalars(columns, max_points=6)
+    self.assertLessEqual(len(rows), 6)
+    self.assertEqual(rows[0], [0.0, 0, 0.0])
+    self.assertEqual(rows[-1], [99.0, 99, 99.0])
+
+  def testParseDownsampleParams(self):
+    self.assertEqual(handler._parse_downsample_params({}), (None, None, None))
+    self.assertEqual(
+        handler._parse_downsample_params(
+            {'min_step': '5', 'max_step': '10', 'max_points': '3'}),
+        (5, 10, 3))
+    with self.assertRaises(ValueError):
+      handler._parse_downsample_params({'max_points': '1'})
+    with self.assertRaises(ValueError):
+      handler._parse_downsample_params({'min_step': 'x'})
+
+
+class LruCacheTest(googletest.TestCase):
+
+  def testEvictsLeastRecentlyUsed(self):
+    cache = handler.LruCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    self.assertEqual(cache.get('a'), 1)
+    cache.put('c', 3)
+    self.assertEqual(cache.get('b'), None)
+    self.assertEqual(cache.get('a'), 1)
+    self.assertEqual(cache.get('c'), 3)
+
 
 if __name__ == '__main__':
   googletest.main()
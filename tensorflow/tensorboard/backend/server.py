@@ -46,6 +46,12 @@ TENSORBOARD_SIZE_GUIDANCE = {
 # How often to reload new data after the latest load (secs)
 LOAD_INTERVAL = 60
 
+# How many downsampled scalar and histogram responses to cache
+DOWNSAMPLE_CACHE_ENTRIES = 1000
+
+# How many gzipped response bodies to cache
+RESPONSE_CACHE_ENTRIES = 200
+
 
 def ParseEventFilesSpec(logdir):
   """Parses `logdir` into a map from paths to run group names.
@@ -167,5 +173,8 @@ def BuildServer(multiplexer, host, port):
   Returns:
     A `BaseHTTPServer.HTTPServer`.
   """
-  factory = functools.partial(handler.TensorboardHandler, multiplexer)
+  factory = functools.partial(
+      handler.TensorboardHandler, multiplexer,
+      downsample_cache=handler.LruCache(DOWNSAMPLE_CACHE_ENTRIES),
+      response_cache=handler.LruCache(RESPONSE_CACHE_ENTRIES))
   return ThreadedHTTPServer((host, port), factory)
@@ -138,6 +138,69 @@ class TensorboardServerTest(tf.test.TestCase):
     values = samples['run1']['simple_values']
     self.assertEqual(len(values), self._SCALAR_COUNT)
 
+  def testDownsampleScalars(self):
+    """Test the step range and max_points parameters of /data/scalars."""
+    values = self._getJson('/data/scalars?run=run1&tag=simple_values'
+                           '&min_step=100&max_step=500&max_points=10')
+    self.assertLessEqual(len(values), 10)
+    self.assertEqual(values[0], [1000, 100, 10])
+    self.assertEqual(values[-1], [5000, 500, 50])
+    # The second request is served from the cache.
+    self.assertEqual(values, self._getJson(
+        '/data/scalars?run=run1&tag=simple_values'
+        '&min_step=100&max_step=500&max_points=10'))
+
+  def testDownsampleScalarsWithInvalidParameters(self):
+    """Test that malformed downsampling parameters are rejected."""
+    for query in ('max_points=1', 'max_points=ten', 'min_step=1.5'):
+      response = self._get('/data/scalars?run=run1&tag=simple_values&' + query)
+      self.assertEqual(response.status, 400)
+      response.read()
+
+  def testDownsampleHistograms(self):
+    """Test the step range parameters of /data/histograms."""
+    self.assertEqual(
+        self._getJson('/data/histograms?tag=histogram&run=run1&min_step=1'), [])
+    self.assertEqual(
+        len(self._getJson('/data/histograms?tag=histogram&run=run1'
+                          '&max_step=0&max_points=2')), 1)
+
+  def testNotModified(self):
+    """Test that unchanged data is answered with 304 Not Modified."""
+    response = self._get('/data/scalars?run=run1&tag=simple_values')
+    self.assertEqual(response.status, 200)
+    etag = response.getheader('ETag')
+    # The gzipped and identity bodies share a weak ETag.
+    self.assertTrue(etag.startswith('W/"'))
+    response.read()
+
+    self._connection.request('GET', '/data/scalars?run=run1&tag=simple_values',
+                             headers={'If-None-Match': etag})
+    response = self._connection.getresponse()
+    self.assertEqual(response.status, 304)
+    self.assertEqual(response.getheader('ETag'), etag)
+    response.read()
+
+    # Other requests have other ETags.
+    response = self._get('/data/scalars?run=run1&tag=simple_values'
+                         '&max_points=10')
+    self.assertNotEqual(response.getheader('ETag'), etag)
+    response.read()
+
+  def testGzippedResponsesAreCached(self):
+    """Test that gzipped bodies are served again for the same ETag."""
+    bodies = []
+    for _ in xrange(2):
+      self._connection.request('GET', '/data/runs',
+                               headers={'Accept-Encoding': 'gzip'})
+      response = self._connection.getresponse()
+      self.assertEqual(response.status, 200)
+      self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+      bodies.append(self._decodeResponse(response))
+    self.assertEqual(bodies[0], bodies[1])
+    self.assertEqual(json.loads(bodies[0].decode('utf-8')),
+                     self._getJson('/data/runs'))
+
   def testImages(self):
     """Test listing images and retrieving an individual image."""
     image_json = self._getJson('/data/images?tag=image&run=run1')
@@ -22,6 +22,7 @@ from __future__ import division
 from __future__ import print_function
 
 import os
+import re
 import socket
 
 from tensorflow.python.platform import app
@@ -29,7 +30,10 @@ from tensorflow.python.platform import flags
 from tensorflow.python.platform import logging
 from tensorflow.python.platform import resource_loader
 from tensorflow.python.platform import status_bar
+from tensorflow.python.summary import event_accumulator
 from tensorflow.python.summary import event_multiplexer
+from tensorflow.python.summary.impl import directory_monitor
+from tensorflow.python.summary.impl import gcs_client
 from tensorflow.tensorboard.backend import server
 
 flags.DEFINE_string('logdir', None, """logdir specifies the directory where
@@ -58,8 +62,78 @@ flags.DEFINE_boolean('purge_orphaned_data', True, 'Whether to purge data that '
                      'Disabling purge_orphaned_data can be used to debug data '
                      'disappearance.')
 
+flags.DEFINE_integer('reload_threads', 8, 'The number of threads used to '
+                     'reload runs in parallel.')
+
+flags.DEFINE_integer('max_reload_backoff', 4, 'The maximum number of reload '
+                     'cycles that skip a run in which no new events were '
+                     'found. Set to 0 to reload every run on every cycle.')
+
+flags.DEFINE_boolean('columnar_scalars', False, 'Whether to store the wall '
+                     'times, steps and values of scalars in NumPy arrays, '
+                     'which uses less memory for runs with many scalars.')
+
+flags.DEFINE_string('directory_monitor', '', 'How to detect changes in local '
+                    'log directories, so that unchanged directories are not '
+                    'listed on every reload: "inotify", "polling", or empty '
+                    'to list every directory on every reload. inotify does '
+                    'not see files written by other hosts to a network '
+                    'filesystem, so use polling for those.')
+
+flags.DEFINE_string('cache_dir', '', 'An optional local directory in which '
+                    'to save the data loaded from each run, so that after a '
+                    'restart TensorBoard resumes reading event files where it '
+                    'stopped instead of from the start. Use a directory that '
+                    'only you can write to.')
+
+flags.DEFINE_string('gcs_endpoint', '', 'If set, event files on Google Cloud '
+                    'Storage are read with HTTP range requests to this URL, '
+                    'e.g. https://storage.googleapis.com, over reused '
+                    'connections, with access tokens from gcloud. Otherwise '
+                    'they are read with gsutil.')
+
+flags.DEFINE_string('summary_types', '', 'An optional comma-separated list of '
+                    'the kinds of data to load: scalars, histograms, '
+                    'compressedHistograms, images and graph. The other '
+                    'summaries in the event files are skipped without being '
+                    'parsed. By default all of them are loaded.')
+
+flags.DEFINE_string('tag_regex', '', 'If set, only the summaries whose tags '
+                    'contain a match of this regular expression are loaded.')
+
+flags.DEFINE_boolean('lazy_images', False, 'Whether to keep only the locations '
+                     'of images in memory, and read the images from the event '
+                     'files when they are requested.')
+
 FLAGS = flags.FLAGS
 
+_SUMMARY_TYPES = (event_accumulator.SCALARS, event_accumulator.HISTOGRAMS,
+                  event_accumulator.COMPRESSED_HISTOGRAMS,
+                  event_accumulator.IMAGES, event_accumulator.GRAPH)
+
+
+def _TagFilter(summary_types, tag_regex):
+  """Returns the tag filter for the flags, or None to load everything.
+
+  Raises:
+    ValueError: If a summary type or the regular expression is invalid.
+  """
+  if not summary_types and not tag_regex:
+    return None
+  if summary_types:
+    types = [t.strip() for t in summary_types.split(',') if t.strip()]
+  else:
+    types = _SUMMARY_TYPES
+  for summary_type in types:
+    if summary_type not in _SUMMARY_TYPES:
+      raise ValueError('--summary_types must only list %s, not "%s".' %
+                       (', '.join(_SUMMARY_TYPES), summary_type))
+  try:
+    re.compile(tag_regex)
+  except re.error as e:
+    raise ValueError('--tag_regex is not a valid regular expression: %s' % e)
+  return {summary_type: tag_regex for summary_type in types}
+
 
 def main(unused_argv=None):
   if FLAGS.debug:
@@ -73,13 +147,43 @@ def main(unused_argv=None):
     print(msg)
     return -1
 
+  if FLAGS.directory_monitor not in ('', 'inotify', 'polling'):
+    msg = ('--directory_monitor must be "inotify", "polling" or empty, not '
+           '"%s".' % FLAGS.directory_monitor)
+    logging.error(msg)
+    print(msg)
+    return -1
+
+  try:
+    tag_filter = _TagFilter(FLAGS.summary_types, FLAGS.tag_regex)
+  except ValueError as e:
+    logging.error(str(e))
+    print(e)
+    return -1
+
   logging.info('Starting TensorBoard in directory %s', os.getcwd())
   path_to_run = server.ParseEventFilesSpec(FLAGS.logdir)
   logging.info('TensorBoard path_to_run is: %s', path_to_run)
 
+  monitor = None
+  if FLAGS.directory_monitor:
+    monitor = directory_monitor.NewDirectoryMonitor(
+        use_inotify=FLAGS.directory_monitor == 'inotify')
+  client = None
+  if FLAGS.gcs_endpoint:
+    client = gcs_client.GCSClient(
+        FLAGS.gcs_endpoint, access_token_fn=gcs_client.GcloudAccessTokens())
   multiplexer = event_multiplexer.EventMultiplexer(
       size_guidance=server.TENSORBOARD_SIZE_GUIDANCE,
-      purge_orphaned_data=FLAGS.purge_orphaned_data)
+      purge_orphaned_data=FLAGS.purge_orphaned_data,
+      reload_threads=FLAGS.reload_threads,
+      max_reload_backoff=FLAGS.max_reload_backoff,
+      columnar_scalars=FLAGS.columnar_scalars,
+      directory_monitor=monitor,
+      cache_dir=FLAGS.cache_dir or None,
+      gcs_client=client,
+      tag_filter=tag_filter,
+      lazy_images=FLAGS.lazy_images)
   server.StartMultiplexerReloadingThread(multiplexer, path_to_run)
   try:
     tb_server = server.BuildServer(multiplexer, FLAGS.host, FLAGS.port)
@@ -105,7 +209,10 @@ def main(unused_argv=None):
   status_bar.SetupStatusBarInsideGoogle('TensorBoard %s' % tag, FLAGS.port)
   print('Starting TensorBoard %s on port %d' % (tag, FLAGS.port))
   print('(You can navigate to http://%s:%d)' % (FLAGS.host, FLAGS.port))
-  tb_server.serve_forever()
+  try:
+    tb_server.serve_forever()
+  finally:
+    multiplexer.SaveCaches()
 
 
 if __name__ == '__main__':